@@ -2,111 +2,170 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import io
 import json
 import re
+import sys
 from dataclasses import dataclass
 from html.parser import HTMLParser
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 import nodriver as uc
 
-from gpt_web_driver.nodriver_dom import wait_for_selector
+from gpt_web_driver.nodriver_dom import _cdp_caller, wait_for_selector
 from gpt_web_driver.stealth import stealth_init
 
+try:
+    # Optional: lxml parses and walks the tree in C, much faster than html.parser on large messages.
+    from lxml import etree as _lxml_etree
+    from lxml import html as _lxml_html
+except ImportError:  # pragma: no cover - depends on the local environment
+    _lxml_etree = None
+    _lxml_html = None
+
+try:
+    # Optional: orjson serializes large conversations much faster than the stdlib encoder.
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on the local environment
+    _orjson = None
+
+# Upper bound on message nodes read concurrently over the CDP websocket.
+_MAX_INFLIGHT_NODES = 32
+
+# Matches sample-body.html (ChatGPT-like) and any similar pages that tag messages.
+_MESSAGE_SELECTOR = "[data-message-author-role]"
+# Try common containers within a message node first. The same string object is sent for every
+# node; Chromium keeps a per-document cache of parsed selectors keyed by that text, so it is
+# only parsed once per page.
+_CONTENT_SELECTOR = ".whitespace-pre-wrap, .markdown"
+
+_SKIP_TAGS = frozenset({"script", "style", "noscript"})
+_BLOCK_OPEN_TAGS = frozenset({"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"})
+_BLOCK_CLOSE_TAGS = frozenset({"p", "div", "li", "tr"})
+
+# Applied in order: trailing-whitespace removal can create new runs of blank lines.
+_TRAILING_WS_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
 
 class _HTMLToText(HTMLParser):
     def __init__(self) -> None:
         super().__init__(convert_charrefs=True)
-        self._chunks: list[str] = []
+        # C-backed accumulator: no list of fragments to grow and then copy again in "".join().
+        self._buf = io.StringIO()
         self._skip_depth = 0
 
+    # html.parser already lowercases tag names before invoking these callbacks.
     def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
-        tag = tag.lower()
-        if tag in {"script", "style", "noscript"}:
+        if tag in _SKIP_TAGS:
             self._skip_depth += 1
             return
         if self._skip_depth:
             return
-        if tag in {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}:
-            self._chunks.append("\n")
+        if tag in _BLOCK_OPEN_TAGS:
+            self._buf.write("\n")
 
     def handle_endtag(self, tag: str) -> None:
-        tag = tag.lower()
-        if tag in {"script", "style", "noscript"}:
+        if tag in _SKIP_TAGS:
             if self._skip_depth:
                 self._skip_depth -= 1
             return
         if self._skip_depth:
             return
-        if tag in {"p", "div", "li", "tr"}:
-            self._chunks.append("\n")
+        if tag in _BLOCK_CLOSE_TAGS:
+            self._buf.write("\n")
 
     def handle_data(self, data: str) -> None:
         if self._skip_depth:
             return
         if data:
-            self._chunks.append(data)
+            self._buf.write(data)
 
     def text(self) -> str:
-        s = "".join(self._chunks)
-        # Normalize whitespace without destroying intentional newlines.
-        s = re.sub(r"[ \t]+\n", "\n", s)
-        s = re.sub(r"\n{3,}", "\n\n", s)
-        return s.strip()
+        return _normalize_text(self._buf.getvalue())
+
+
+def _normalize_text(s: str) -> str:
+    # Normalize whitespace without destroying intentional newlines.
+    s = _TRAILING_WS_RE.sub("\n", s)
+    s = _BLANK_LINES_RE.sub("\n\n", s)
+    return s.strip()
+
+
+def _lxml_html_to_text(html: str) -> str:
+    # Mirrors _HTMLToText: same skipped tags and the same newline placement around block tags.
+    root = _lxml_html.fragment_fromstring(html, create_parent="div")
+    _lxml_etree.strip_elements(
+        root,
+        _lxml_etree.Comment,
+        _lxml_etree.ProcessingInstruction,
+        *_SKIP_TAGS,
+        with_tail=False,
+    )
+    chunks: list[str] = []
+    for event, el in _lxml_etree.iterwalk(root, events=("start", "end")):
+        if event == "start":
+            if el.tag in _BLOCK_OPEN_TAGS:
+                chunks.append("\n")
+            if el.text:
+                chunks.append(el.text)
+        else:
+            if el.tag in _BLOCK_CLOSE_TAGS:
+                chunks.append("\n")
+            if el.tail:
+                chunks.append(el.tail)
+    return _normalize_text("".join(chunks))
+
+
+def _html_to_text(html: str) -> str:
+    if _lxml_html is not None and html.strip():
+        try:
+            return _lxml_html_to_text(html)
+        except Exception:
+            pass
+    parser = _HTMLToText()
+    parser.feed(html)
+    return parser.text()
+
+
+def _dumps(obj: Any) -> str:
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
 
 
-def _attrs_list_to_dict(attrs: list[str]) -> dict[str, str]:
-    out: dict[str, str] = {}
+def _attrs_list_to_dict(attrs: Iterable[str]) -> dict[str, str]:
+    # CDP returns a flat [name1, value1, name2, value2, ...] list of strings. Zipping one
+    # iterator with itself pairs consecutive items (a dangling trailing name is dropped).
     it = iter(attrs)
-    for k in it:
-        try:
-            v = next(it)
-        except StopIteration:
-            break
-        out[str(k)] = str(v)
-    return out
+    return dict(zip(it, it))
+
+
+_GET_DOCUMENT = _cdp_caller(uc.cdp.dom.get_document, "depth", "pierce", args_optional=True)
+_QUERY_SELECTOR_ALL = _cdp_caller(uc.cdp.dom.query_selector_all, "node_id", "selector")
+_QUERY_SELECTOR = _cdp_caller(uc.cdp.dom.query_selector, "node_id", "selector")
+_GET_ATTRIBUTES = _cdp_caller(uc.cdp.dom.get_attributes, "node_id")
+_GET_OUTER_HTML = _cdp_caller(uc.cdp.dom.get_outer_html, "node_id")
 
 
 async def _dom_get_document(page: Any, *, depth: int = 1, pierce: bool = True) -> Any:
-    # nodriver CDP API can differ across versions; be defensive about call signatures.
-    try:
-        return await page.send(uc.cdp.dom.get_document(int(depth), bool(pierce)))
-    except TypeError:
-        try:
-            return await page.send(uc.cdp.dom.get_document(depth=int(depth), pierce=bool(pierce)))
-        except TypeError:
-            return await page.send(uc.cdp.dom.get_document())
+    return await page.send(_GET_DOCUMENT(int(depth), bool(pierce)))
 
 
 async def _dom_query_selector_all(page: Any, root_node_id: Any, selector: str) -> list[Any]:
-    try:
-        res = await page.send(uc.cdp.dom.query_selector_all(root_node_id, str(selector)))
-    except TypeError:
-        res = await page.send(uc.cdp.dom.query_selector_all(node_id=root_node_id, selector=str(selector)))
-    return list(res or [])
+    return list(await page.send(_QUERY_SELECTOR_ALL(root_node_id, str(selector))) or [])
 
 
 async def _dom_query_selector(page: Any, root_node_id: Any, selector: str) -> Any:
-    try:
-        return await page.send(uc.cdp.dom.query_selector(root_node_id, str(selector)))
-    except TypeError:
-        return await page.send(uc.cdp.dom.query_selector(node_id=root_node_id, selector=str(selector)))
+    return await page.send(_QUERY_SELECTOR(root_node_id, str(selector)))
 
 
 async def _dom_get_attributes(page: Any, node_id: Any) -> dict[str, str]:
-    try:
-        attrs_list = await page.send(uc.cdp.dom.get_attributes(node_id))
-    except TypeError:
-        attrs_list = await page.send(uc.cdp.dom.get_attributes(node_id=node_id))
-    return _attrs_list_to_dict(list(attrs_list or []))
+    return _attrs_list_to_dict(await page.send(_GET_ATTRIBUTES(node_id)) or ())
 
 
 async def _dom_get_outer_html(page: Any, node_id: Any) -> str:
-    try:
-        res = await page.send(uc.cdp.dom.get_outer_html(node_id))
-    except TypeError:
-        res = await page.send(uc.cdp.dom.get_outer_html(node_id=node_id))
-    return str(res or "")
+    return str(await page.send(_GET_OUTER_HTML(node_id)) or "")
 
 
 @dataclass(frozen=True)
@@ -138,27 +197,34 @@ async def extract_messages(
 
     node_ids = await _dom_query_selector_all(page, root_id, message_selector)
 
-    messages: list[ChatMessage] = []
-    for node_id in node_ids:
-        attrs = await _dom_get_attributes(page, node_id)
-        role = attrs.get("data-message-author-role", "unknown")
-        message_id = attrs.get("data-message-id", "")
+    # A single Runtime.evaluate could serialize every message in one round-trip, but this
+    # script follows the project's read-only doctrine (see CONTRIBUTING.md): DOM reads go
+    # through DOM.* commands only, and stealth_init() keeps the Runtime domain disabled.
+    # Instead, pipeline the per-node reads: CDP accepts many in-flight commands on one socket.
+    sem = asyncio.Semaphore(_MAX_INFLIGHT_NODES)
 
-        # Prefer the "inner" content area for text extraction.
-        try:
-            content_node_id = await _dom_query_selector(page, node_id, content_selector)
-        except Exception:
-            content_node_id = None
+    async def _one(node_id: Any) -> ChatMessage | None:
+        async with sem:
+            attrs = await _dom_get_attributes(page, node_id)
+            role = attrs.get("data-message-author-role", "unknown")
+            message_id = attrs.get("data-message-id", "")
+
+            # Prefer the "inner" content area for text extraction.
+            try:
+                content_node_id = await _dom_query_selector(page, node_id, content_selector)
+            except Exception:
+                content_node_id = None
+
+            target_node_id = content_node_id or node_id
+            outer_html = await _dom_get_outer_html(page, target_node_id)
 
-        target_node_id = content_node_id or node_id
-        outer_html = await _dom_get_outer_html(page, target_node_id)
+        text = _html_to_text(outer_html)
+        if not text:
+            return None
+        return ChatMessage(role=role, message_id=message_id, text=text)
 
-        parser = _HTMLToText()
-        parser.feed(outer_html)
-        text = parser.text()
-        if text:
-            messages.append(ChatMessage(role=role, message_id=message_id, text=text))
-    return messages
+    results = await asyncio.gather(*(_one(n) for n in node_ids))
+    return [m for m in results if m is not None]
 
 
 async def _run(url: str, *, timeout_s: float) -> int:
@@ -166,22 +232,20 @@ async def _run(url: str, *, timeout_s: float) -> int:
     # "no headless" doctrine.
     browser = await uc.start(headless=False)
     try:
-        page = await browser.get(url)
+        # Disable the noisy CDP domains on a blank tab first, so the real page loads with them
+        # already off and wait_for_selector can start as soon as navigation returns.
+        page = await browser.get("about:blank")
         await stealth_init(page, uc_module=uc)
-
-        # Matches sample-body.html (ChatGPT-like) and any similar pages that tag messages.
-        message_selector = "[data-message-author-role]"
-        # Try common containers within a message node first.
-        content_selector = ".whitespace-pre-wrap, .markdown"
+        await page.get(url)
 
         msgs = await extract_messages(
             page,
-            message_selector=message_selector,
-            content_selector=content_selector,
+            message_selector=_MESSAGE_SELECTOR,
+            content_selector=_CONTENT_SELECTOR,
             timeout_s=timeout_s,
         )
 
-        print(json.dumps([m.__dict__ for m in msgs], indent=2))
+        print(_dumps([m.__dict__ for m in msgs]))
         return 0
     finally:
         # nodriver's Browser.stop() is synchronous.
@@ -197,7 +261,16 @@ def main() -> int:
     ap.add_argument("--timeout", type=float, default=20.0)
     args = ap.parse_args()
 
-    return asyncio.run(_run(str(args.url), timeout_s=float(args.timeout)))
+    coro = _run(str(args.url), timeout_s=float(args.timeout))
+    if sys.platform != "win32":
+        try:
+            import uvloop  # type: ignore
+        except ImportError:
+            pass
+        else:
+            # Optional: libuv-backed loop cuts per-await overhead on the CDP websocket traffic.
+            return uvloop.run(coro)
+    return asyncio.run(coro)
 
 
 if __name__ == "__main__":
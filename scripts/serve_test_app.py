@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import signal
 import sys
-import time
+import threading
 from pathlib import Path
 
 
@@ -28,11 +29,21 @@ def main() -> int:
     url = f"{srv.base_url}/index.html"
     print(url, flush=True)
 
+    stop = threading.Event()
+
+    def _request_stop(signum, frame) -> None:
+        stop.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
     try:
-        while True:
-            time.sleep(0.5)
-    except KeyboardInterrupt:
-        pass
+        if sys.platform == "win32":
+            # Lock waits are not interruptible by Ctrl-C on Windows; wake up periodically there.
+            while not stop.wait(0.5):
+                pass
+        else:
+            # Block until a signal arrives instead of waking up on a timer.
+            stop.wait()
     finally:
         srv.close()
     return 0
@@ -1,19 +1,59 @@
 from __future__ import annotations
 
+from importlib import import_module
 from importlib.metadata import PackageNotFoundError, version as _pkg_version
-
-from .flow import FlowResult, FlowSpecError, load_flow, run_flow
-from .nibs import ChatUIConfig, NibsConfig, NibsSession, default_shadow_profile_dir
-from .runner import FlowRunner, RunConfig, default_dry_run, run_demo, run_single
-from .stealth import stealth_init
+from typing import TYPE_CHECKING, Any
 
 try:
     __version__ = _pkg_version("gpt-web-driver")
 except PackageNotFoundError:  # pragma: no cover - only hit in editable/dev without metadata
     __version__ = "0.0.0"
 
-# Friendlier public name. Keep FlowRunner as the implementation name.
-Driver = FlowRunner
+if TYPE_CHECKING:
+    from .flow import FlowResult, FlowSpecError, load_flow, run_flow
+    from .nibs import ChatUIConfig, NibsConfig, NibsSession, default_shadow_profile_dir
+    from .runner import FlowRunner, RunConfig, default_dry_run, run_demo, run_single
+    from .stealth import stealth_init
+
+    Driver = FlowRunner
+
+# Public name -> (submodule, attribute). Submodules are imported on first attribute access
+# (PEP 562) so that e.g. `from gpt_web_driver.demo_server import ...` or `--version` does not
+# pay for the flow engine, nodriver helpers, etc.
+_LAZY_EXPORTS: dict[str, tuple[str, str]] = {
+    # Friendlier public name. Keep FlowRunner as the implementation name.
+    "Driver": (".runner", "FlowRunner"),
+    "ChatUIConfig": (".nibs", "ChatUIConfig"),
+    "FlowRunner": (".runner", "FlowRunner"),
+    "FlowResult": (".flow", "FlowResult"),
+    "FlowSpecError": (".flow", "FlowSpecError"),
+    "NibsConfig": (".nibs", "NibsConfig"),
+    "NibsSession": (".nibs", "NibsSession"),
+    "RunConfig": (".runner", "RunConfig"),
+    "default_dry_run": (".runner", "default_dry_run"),
+    "default_shadow_profile_dir": (".nibs", "default_shadow_profile_dir"),
+    "load_flow": (".flow", "load_flow"),
+    "run_demo": (".runner", "run_demo"),
+    "run_flow": (".flow", "run_flow"),
+    "run_single": (".runner", "run_single"),
+    "stealth_init": (".stealth", "stealth_init"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), attr)
+    # Cache on the package so later lookups bypass __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     "__version__",
@@ -33,4 +73,3 @@ __all__ = [
     "run_single",
     "stealth_init",
 ]
-
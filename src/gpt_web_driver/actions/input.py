@@ -4,14 +4,14 @@ import contextlib
 import random
 import sys
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 from ..os_input import OsInput
 from ..core.physics import CognitiveTyper, CognitiveTyperConfig
 
 
-def _paste_hotkey() -> tuple[str, str]:
-    return ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
+# The platform cannot change at runtime; resolve the paste chord once.
+_PASTE_HOTKEY: tuple[str, str] = ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
 
 
 @dataclass(frozen=True)
@@ -20,33 +20,52 @@ class HybridInputConfig:
     typer: CognitiveTyperConfig = CognitiveTyperConfig()
 
 
+def _import_clipboard() -> Any:
+    # Prefer pyclip: it talks to the native clipboard APIs on Windows/macOS, whereas pyperclip
+    # forks pbcopy/pbpaste (or xclip/xsel on Linux) for every copy and paste.
+    try:
+        import pyclip  # type: ignore
+
+        return pyclip
+    except Exception:
+        pass
+    import pyperclip  # type: ignore
+
+    return pyperclip
+
+
 class _ClipboardHygiene:
     def __init__(self) -> None:
         self._enabled = False
-        self._saved: Optional[str] = None
-        self._pyperclip = None
+        self._saved: Optional[str | bytes] = None
+        self._clipboard: Any = None
 
     def __enter__(self) -> "_ClipboardHygiene":
         try:
-            import pyperclip  # type: ignore
-
-            self._pyperclip = pyperclip
-            self._saved = pyperclip.paste()
+            clipboard = _import_clipboard()
+            saved = clipboard.paste()
+            # pyclip returns bytes by default and its copy() accepts them back, so keep them raw:
+            # decoding would corrupt clipboard contents that are not UTF-8 text. pyperclip
+            # returns str.
+            if saved is not None and not isinstance(saved, bytes):
+                saved = str(saved)
+            self._clipboard = clipboard
+            self._saved = saved
             self._enabled = True
         except Exception:
             self._enabled = False
         return self
 
     def copy(self, text: str) -> None:
-        if not self._enabled or self._pyperclip is None:
-            raise RuntimeError("pyperclip is unavailable; cannot use smart paste")
-        self._pyperclip.copy(str(text))
+        if not self._enabled or self._clipboard is None:
+            raise RuntimeError("no clipboard backend (pyclip/pyperclip) is available; cannot use smart paste")
+        self._clipboard.copy(str(text))
 
     def __exit__(self, exc_type, exc, tb) -> None:
-        if not self._enabled or self._pyperclip is None:
+        if not self._enabled or self._clipboard is None:
             return
         with contextlib.suppress(Exception):
-            self._pyperclip.copy("" if self._saved is None else str(self._saved))
+            self._clipboard.copy("" if self._saved is None else self._saved)
 
 
 class HybridInput:
@@ -74,7 +93,7 @@ class HybridInput:
             try:
                 with _ClipboardHygiene() as cb:
                     cb.copy(s)
-                    self._os.hotkey(*_paste_hotkey())
+                    self._os.hotkey(*_PASTE_HOTKEY)
                 return
             except Exception:
                 # Fall back to typing if clipboard tooling is unavailable.
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import logging
 import time
-import uuid
 from contextlib import asynccontextmanager
+from secrets import token_hex
 from typing import Any
 
 _LOG = logging.getLogger(__name__)
 
+_TRUTHY: frozenset[str] = frozenset({"1", "true", "yes", "y", "on"})
+
 
 def _now_epoch() -> int:
     return int(time.time())
@@ -19,12 +21,15 @@ def _coerce_bool(v: Any) -> bool:
     if isinstance(v, (int, float)):
         return bool(v)
     if isinstance(v, str):
-        return v.strip().lower() in {"1", "true", "yes", "y", "on"}
+        return v.strip().lower() in _TRUTHY
     return False
 
 
 def _coerce_content(c: Any) -> str:
     # OpenAI-style content can be a string or an array of parts; keep it simple.
+    # Plain strings are by far the common case (JSON bodies never yield str subclasses).
+    if type(c) is str:
+        return c
     if c is None:
         return ""
     if isinstance(c, str):
@@ -40,11 +45,31 @@ def _coerce_content(c: Any) -> str:
 
 def _prompt_from_messages(messages: list[dict[str, Any]]) -> str:
     # Minimal: send the last user message to the UI.
-    for m in reversed(messages or []):
-        if str(m.get("role") or "").strip().lower() == "user":
+    if not messages:
+        return ""
+    for i in range(len(messages) - 1, -1, -1):
+        m = messages[i]
+        role = m.get("role")
+        if type(role) is str and role.strip().lower() == "user":
             return _coerce_content(m.get("content"))
     # Fallback: concatenate all contents.
-    return "\n".join(_coerce_content(m.get("content")) for m in (messages or []))
+    return "\n".join(_coerce_content(m.get("content")) for m in messages)
+
+
+def _default_response_class() -> Any:
+    from fastapi.responses import JSONResponse  # type: ignore
+
+    try:
+        import orjson  # type: ignore
+    except ModuleNotFoundError:
+        return JSONResponse
+
+    # Same idea as fastapi.responses.ORJSONResponse, which newer FastAPI releases deprecate.
+    class _ORJSONResponse(JSONResponse):
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+    return _ORJSONResponse
 
 
 def create_app(*, session, default_model: str = "gpt-web-driver") -> Any:
@@ -66,7 +91,7 @@ def create_app(*, session, default_model: str = "gpt-web-driver") -> Any:
         finally:
             await session.close()
 
-    app = FastAPI(lifespan=lifespan)
+    app = FastAPI(lifespan=lifespan, default_response_class=_default_response_class())
     app.state.session = session
     app.state.default_model = str(default_model)
 
@@ -101,12 +126,12 @@ def create_app(*, session, default_model: str = "gpt-web-driver") -> Any:
         except HTTPException:
             raise
         except Exception:
-            error_id = uuid.uuid4().hex[:12]
+            error_id = token_hex(6)
             _LOG.exception("chat_completion failed (error_id=%s)", error_id)
             raise HTTPException(status_code=500, detail={"error": "internal_error", "error_id": error_id})
 
         created = _now_epoch()
-        rid = f"chatcmpl_{uuid.uuid4().hex[:24]}"
+        rid = f"chatcmpl_{token_hex(12)}"
         return {
             "id": rid,
             "object": "chat.completion",
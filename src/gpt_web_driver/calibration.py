@@ -1,77 +1,86 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
+import logging
+import operator
+import os
+import stat
 import sys
 import tempfile
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from importlib import resources
 from pathlib import Path
 from typing import Any, Callable, Optional
 
 from platformdirs import user_config_dir
 
-from .demo_server import serve_directory
+from .demo_server import serve_directory, serve_html
 from .runner import FlowRunner, RunConfig
 
+_LOG = logging.getLogger(__name__)
+
+
+try:
+    import orjson as _orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - depends on the local environment
+    _orjson = None
+
 
 class CalibrationError(RuntimeError):
     pass
 
 
-_CALIBRATE_HTML = """<!doctype html>
-<html lang="en">
-  <head>
-    <meta charset="utf-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1" />
-    <title>gpt-web-driver calibration</title>
-    <style>
-      body { margin: 0; height: 100vh; overflow: hidden; background: #0b1220; color: rgba(255,255,255,0.92); font: 14px/1.4 ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif; }
-      .panel { position: fixed; left: 18px; top: 18px; max-width: 520px; padding: 14px 16px; background: rgba(255,255,255,0.06); border: 1px solid rgba(255,255,255,0.16); border-radius: 12px; }
-      .panel h1 { margin: 0 0 8px 0; font-size: 16px; font-weight: 650; }
-      .panel p { margin: 0; color: rgba(255,255,255,0.72); }
-      .panel code { color: rgba(255,255,255,0.92); background: rgba(255,255,255,0.08); padding: 0 6px; border-radius: 6px; }
-      .target { position: fixed; width: 92px; height: 92px; border-radius: 18px; border: 2px solid rgba(255,255,255,0.25); display: grid; place-items: center; user-select: none; }
-      .target::before, .target::after { content: ""; position: absolute; left: 50%; top: 50%; transform: translate(-50%, -50%); background: rgba(255,255,255,0.8); }
-      .target::before { width: 56px; height: 2px; }
-      .target::after { width: 2px; height: 56px; }
-      .dot { position: absolute; left: 50%; top: 50%; width: 8px; height: 8px; transform: translate(-50%, -50%); border-radius: 999px; background: rgba(255,255,255,0.95); }
-      #calibrate-a { left: 120px; top: 160px; background: rgba(77,163,255,0.22); }
-      #calibrate-b { right: 120px; bottom: 120px; background: rgba(255,184,77,0.20); }
-      .label { font-size: 18px; font-weight: 750; letter-spacing: 0.6px; }
-    </style>
-  </head>
-  <body>
-    <div class="panel">
-      <h1>gpt-web-driver calibration</h1>
-      <p>Put your mouse on the center dot inside <code>#calibrate-a</code> and <code>#calibrate-b</code>.</p>
-    </div>
-    <div id="calibrate-a" class="target"><div class="dot"></div><div class="label">A</div></div>
-    <div id="calibrate-b" class="target"><div class="dot"></div><div class="label">B</div></div>
-  </body>
-</html>
-"""
-
-
-@dataclass(frozen=True)
+def _json_loads(raw: str) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    # Same layout either way: 2-space indent, sorted keys, UTF-8 bytes ready to write.
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2 | _orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, indent=2, sort_keys=True).encode("utf-8")
+
+
+def _calibrate_html() -> str:
+    # Built-in calibration page, shipped as package data and only read when it is served.
+    return (resources.files(__package__) / "calibrate.html").read_text(encoding="utf-8")
+
+
+@dataclass(frozen=True, slots=True)
 class Calibration:
     scale_x: float
     scale_y: float
     offset_x: float
     offset_y: float
+    # Cache for as_cli_args (cached_property needs a __dict__, which slotted classes lack).
+    _cli_args: tuple[str, ...] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Coerce once here so consumers (e.g. write_calibration) can rely on real floats.
+        for name in ("scale_x", "scale_y", "offset_x", "offset_y"):
+            object.__setattr__(self, name, float(getattr(self, name)))
 
     @property
-    def as_cli_args(self) -> list[str]:
-        return [
-            "--scale-x",
-            str(self.scale_x),
-            "--scale-y",
-            str(self.scale_y),
-            "--offset-x",
-            str(self.offset_x),
-            "--offset-y",
-            str(self.offset_y),
-        ]
+    def as_cli_args(self) -> tuple[str, ...]:
+        args = self._cli_args
+        if args is None:
+            args = (
+                "--scale-x",
+                str(self.scale_x),
+                "--scale-y",
+                str(self.scale_y),
+                "--offset-x",
+                str(self.offset_x),
+                "--offset-y",
+                str(self.offset_y),
+            )
+            object.__setattr__(self, "_cli_args", args)
+        return args
 
 
 def default_calibration_path() -> Path:
@@ -81,70 +90,200 @@ def default_calibration_path() -> Path:
     return Path(user_config_dir("gpt-web-driver")) / "calibration.json"
 
 
+# v1 schema: scale_x/scale_y/offset_x/offset_y plus optional metadata.
+_CALIBRATION_VALUES = operator.itemgetter("scale_x", "scale_y", "offset_x", "offset_y")
+
+
 def load_calibration(path: Path) -> Calibration:
     path = Path(path).expanduser()
-    raw = path.read_text(encoding="utf-8")
-    obj = json.loads(raw)
+    obj = _json_loads(path.read_text(encoding="utf-8"))
     if not isinstance(obj, dict):
         raise CalibrationError(f"calibration file must be a JSON object: {path}")
 
-    # v1 schema: scale_x/scale_y/offset_x/offset_y plus optional metadata.
-    for k in ("scale_x", "scale_y", "offset_x", "offset_y"):
-        if k not in obj:
-            raise CalibrationError(f"calibration file missing {k!r}: {path}")
+    try:
+        values = _CALIBRATION_VALUES(obj)
+    except KeyError as e:
+        raise CalibrationError(f"calibration file missing {e.args[0]!r}: {path}") from None
 
     try:
-        sx = float(obj["scale_x"])
-        sy = float(obj["scale_y"])
-        ox = float(obj["offset_x"])
-        oy = float(obj["offset_y"])
-    except Exception as e:
+        sx, sy, ox, oy = map(float, values)
+    except (TypeError, ValueError, OverflowError) as e:
         raise CalibrationError(f"calibration values must be numbers: {path}") from e
 
     return Calibration(scale_x=sx, scale_y=sy, offset_x=ox, offset_y=oy)
 
 
+def _target_mode(path: Path) -> int:
+    # mkstemp creates the temp file 0600; give it the mode the file has (or would get from a
+    # plain open()) so the rename does not tighten permissions.
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
 def write_calibration(cal: Calibration, path: Path) -> None:
-    path = Path(path).expanduser()
+    # Resolve symlinks first: renaming over a link would replace it with a regular file instead
+    # of updating the file it points to.
+    path = Path(path).expanduser().resolve()
     path.parent.mkdir(parents=True, exist_ok=True)
     payload = {
         "version": 1,
-        "scale_x": float(cal.scale_x),
-        "scale_y": float(cal.scale_y),
-        "offset_x": float(cal.offset_x),
-        "offset_y": float(cal.offset_y),
-        "created_at": int(time.time()),
+        "scale_x": cal.scale_x,
+        "scale_y": cal.scale_y,
+        "offset_x": cal.offset_x,
+        "offset_y": cal.offset_y,
+        "created_at": time.time_ns() // 1_000_000_000,
         "platform": sys.platform,
     }
-    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    # Write a sibling temp file and rename it over the target, so a crash mid-write never leaves
+    # a truncated calibration behind.
+    mode = _target_mode(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        if hasattr(os, "fchmod"):  # not available on Windows before 3.13
+            os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_json_dumps(payload))
+            f.write(b"\n")
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+# Imported on first use: pyautogui is an optional dependency (the [gui] extra).
+_pyautogui: Any = None
 
 
 def _get_mouse_position() -> tuple[float, float]:
     """
     Returns current mouse cursor position in the same coordinate space used by pyautogui.moveTo().
     """
-    try:
-        import pyautogui  # type: ignore
-    except ModuleNotFoundError as e:
-        raise CalibrationError(
-            "pyautogui is required for calibration. Install with: pip install 'gpt-web-driver[gui]'"
-        ) from e
-
-    p = pyautogui.position()
+    global _pyautogui
+    if _pyautogui is None:
+        try:
+            import pyautogui  # type: ignore
+        except ModuleNotFoundError as e:
+            raise CalibrationError(
+                "pyautogui is required for calibration. Install with: pip install 'gpt-web-driver[gui]'"
+            ) from e
+        _pyautogui = pyautogui
+
+    # position() is not wrapped by pyautogui's PAUSE/FAILSAFE checks, so it returns immediately.
+    p = _pyautogui.position()
     # pyautogui returns a Point with x/y attributes on most platforms.
     x = float(getattr(p, "x", p[0]))
     y = float(getattr(p, "y", p[1]))
     return (x, y)
 
 
-async def _wait_for_enter(prompt: str) -> None:
+class _StdinReader:
+    """
+    Line reader for stdin that stays on the event loop.
+
+    On POSIX, a piped stdin is attached to the loop with connect_read_pipe, so waiting for Enter
+    does not park an executor thread. Everything else falls back to a worker thread: Windows
+    consoles and regular files are not selectable, and a tty shares its open file description
+    with stdout/stderr, so the O_NONBLOCK that connect_read_pipe sets would make prompt and
+    jsonl writes fail with BlockingIOError under terminal flow control.
+    """
+
+    def __init__(self) -> None:
+        self._reader: asyncio.StreamReader | None = None
+        self._transport: asyncio.BaseTransport | None = None
+        self._fd: int | None = None
+        self._use_thread = sys.platform == "win32"
+
+    async def readline(self) -> str:
+        if self._reader is None and not self._use_thread:
+            await self._connect()
+        if self._reader is None:
+            return await asyncio.to_thread(sys.stdin.readline)
+        line = await self._reader.readline()
+        return line.decode("utf-8", errors="replace")
+
+    async def _connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        try:
+            fd = sys.stdin.fileno()
+            if not stat.S_ISFIFO(os.fstat(fd).st_mode):
+                self._use_thread = True
+                return
+            # Read through a duplicate so closing the transport leaves sys.stdin open.
+            pipe = os.fdopen(os.dup(fd), "rb", buffering=0)
+        except (AttributeError, OSError, ValueError):
+            self._use_thread = True
+            return
+        try:
+            transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+        except (OSError, ValueError, NotImplementedError):
+            pipe.close()
+            os.set_blocking(fd, True)
+            self._use_thread = True
+            return
+        self._fd = fd
+        self._reader = reader
+        self._transport = transport
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+            self._reader = None
+        if self._fd is not None:
+            # O_NONBLOCK is shared with the duplicated descriptor; put stdin back the way it was
+            # so later blocking reads (input(), the shell) do not hit EAGAIN/EOFError.
+            with contextlib.suppress(OSError):
+                os.set_blocking(self._fd, True)
+            self._fd = None
+
+
+async def _wait_for_enter(prompt: str, stdin: _StdinReader, *, optional: bool = False) -> str:
     # Keep prompts off stdout so users can redirect stdout cleanly (and jsonl stays valid).
     sys.stderr.write(prompt)
     if not prompt.endswith("\n"):
         sys.stderr.write("\n")
-    sys.stderr.write("Press Enter to capture the current mouse position...\n")
+    if optional:
+        sys.stderr.write("Press Enter to capture the current mouse position, or type 's' + Enter to finish now...\n")
+    else:
+        sys.stderr.write("Press Enter to capture the current mouse position...\n")
     sys.stderr.flush()
-    await asyncio.to_thread(sys.stdin.readline)
+    return await stdin.readline()
+
+
+# (target label, prompt). The first two are required; the rest are optional extra samples that
+# turn the exact two-point solve into a least-squares fit.
+_CALIBRATION_TARGETS: tuple[tuple[str, str], ...] = (
+    ("A", "1) Focus the browser window\n2) Put your mouse cursor on the CENTER DOT inside the blue A target\n"),
+    ("B", "1) Put your mouse cursor on the CENTER DOT inside the orange B target\n"),
+    ("C", "Optional: put your mouse cursor on the CENTER DOT inside the green C target (top right)\n"),
+    ("D", "Optional: put your mouse cursor on the CENTER DOT inside the purple D target (bottom left)\n"),
+    ("E", "Optional: put your mouse cursor on the CENTER DOT inside the E target (center)\n"),
+)
+_REQUIRED_TARGETS = 2
+
+
+def _fit_axis(viewport: list[float], screen: list[float]) -> tuple[float, float]:
+    """
+    Least-squares fit of `screen = viewport * scale + offset` along one axis.
+
+    Points are centered on their mean first, which keeps the 2x2 normal equations well
+    conditioned. With exactly two points this is the exact two-point solve.
+    """
+    n = len(viewport)
+    mean_v = sum(viewport) / n
+    mean_s = sum(screen) / n
+    var_v = sum((v - mean_v) ** 2 for v in viewport)
+    if var_v == 0.0:
+        raise CalibrationError("Calibration points were degenerate (no delta). Try resizing the window and retry.")
+    cov = sum((v - mean_v) * (s - mean_s) for v, s in zip(viewport, screen))
+    scale = cov / var_v
+    return scale, mean_s - scale * mean_v
 
 
 async def run_calibrate(
@@ -160,80 +299,77 @@ async def run_calibrate(
         screen_x = viewport_x * scale_x + offset_x
         screen_y = viewport_y * scale_y + offset_y
 
-    The calibration page provides two targets (A/B). We capture the OS mouse
-    position for each target, and solve for scale and offset.
+    The calibration page provides two required targets (A/B) and three optional ones (C/D/E).
+    We capture the OS mouse position for each target the user confirms, and solve for scale and
+    offset per axis in the least-squares sense.
     """
-    tmp: tempfile.TemporaryDirectory[str] | None = None
-
     web_root: Path | None = None
     if repo_root is not None:
         candidate = (Path(repo_root) / "webapp").resolve()
         if (candidate / "calibrate.html").exists():
             web_root = candidate
 
-    # Fall back to an ephemeral page so `calibrate` also works from an installed package.
-    if web_root is None:
-        tmp = tempfile.TemporaryDirectory(prefix="gpt-web-driver-calibrate-")
-        web_root = Path(tmp.name)
-        (web_root / "calibrate.html").write_text(_CALIBRATE_HTML, encoding="utf-8")
-
-    assert web_root is not None
-    srv = serve_directory(web_root)
+    if web_root is not None:
+        srv = serve_directory(web_root)
+    else:
+        # Serve the built-in page from memory so `calibrate` also works from an installed package.
+        srv = serve_html(_calibrate_html(), "calibrate.html")
+    stdin = _StdinReader()
     try:
         url = f"{srv.base_url}/calibrate.html"
         if emit is not None:
             emit({"event": "calibrate.start", "url": url})
 
+        # (label, viewport x, viewport y, screen x, screen y)
+        points: list[tuple[str, float, float, float, float]] = []
         async with FlowRunner(config, emit=emit) as runner:
-            await runner.navigate(url)
-
-            a = await runner.locate_point("#calibrate-a")
-            b = await runner.locate_point("#calibrate-b")
-
-            await _wait_for_enter(
-                "Calibration point A:\n"
-                "1) Focus the browser window\n"
-                "2) Put your mouse cursor on the CENTER DOT inside the blue A target\n"
-            )
-            ax, ay = _get_mouse_position()
-
-            await _wait_for_enter(
-                "Calibration point B:\n"
-                "1) Put your mouse cursor on the CENTER DOT inside the orange B target\n"
-            )
-            bx, by = _get_mouse_position()
+            try:
+                await runner.navigate(url)
+
+                targets = []
+                for i, (label, prompt) in enumerate(_CALIBRATION_TARGETS):
+                    # The static page is fully parsed once the required targets are found, so the
+                    # optional ones are probed once instead of waited for.
+                    timeout_s = None if i < _REQUIRED_TARGETS else 0.0
+                    try:
+                        vp = await runner.locate_point(f"#calibrate-{label.lower()}", timeout_s=timeout_s)
+                    except Exception:
+                        if i < _REQUIRED_TARGETS:
+                            raise
+                        # e.g. a repo webapp/calibrate.html that only has the A/B targets.
+                        _LOG.debug("optional calibration target %s not found; skipping", label, exc_info=True)
+                        continue
+                    targets.append((i, label, prompt, vp))
+            finally:
+                # Lifetime contract: the page is static and fully parsed once every target has
+                # been located, so the server is not kept listening through the (slow) manual
+                # prompts. Reloading the tab after this point will fail; calibration is one-shot.
+                srv.close()
+
+            for i, label, prompt, vp in targets:
+                optional = i >= _REQUIRED_TARGETS
+                answer = await _wait_for_enter(f"Calibration point {label}:\n{prompt}", stdin, optional=optional)
+                # EOF (no more input) also ends the optional points.
+                if optional and (not answer or answer.strip().lower() in ("s", "skip")):
+                    break
+                sx, sy = _get_mouse_position()
+                points.append((label, float(vp.x), float(vp.y), float(sx), float(sy)))
 
         if emit is not None:
-            emit(
-                {
-                    "event": "calibrate.point",
-                    "point": "A",
-                    "viewport_x": float(a.x),
-                    "viewport_y": float(a.y),
-                    "screen_x": float(ax),
-                    "screen_y": float(ay),
-                }
-            )
-            emit(
-                {
-                    "event": "calibrate.point",
-                    "point": "B",
-                    "viewport_x": float(b.x),
-                    "viewport_y": float(b.y),
-                    "screen_x": float(bx),
-                    "screen_y": float(by),
-                }
-            )
-
-        dx_v = float(b.x - a.x)
-        dy_v = float(b.y - a.y)
-        if dx_v == 0.0 or dy_v == 0.0:
-            raise CalibrationError("Calibration points were degenerate (no delta). Try resizing the window and retry.")
-
-        scale_x = float((bx - ax) / dx_v)
-        scale_y = float((by - ay) / dy_v)
-        offset_x = float(ax - scale_x * float(a.x))
-        offset_y = float(ay - scale_y * float(a.y))
+            for label, vx, vy, sx, sy in points:
+                emit(
+                    {
+                        "event": "calibrate.point",
+                        "point": label,
+                        "viewport_x": vx,
+                        "viewport_y": vy,
+                        "screen_x": sx,
+                        "screen_y": sy,
+                    }
+                )
+
+        scale_x, offset_x = _fit_axis([p[1] for p in points], [p[3] for p in points])
+        scale_y, offset_y = _fit_axis([p[2] for p in points], [p[4] for p in points])
 
         cal = Calibration(scale_x=scale_x, scale_y=scale_y, offset_x=offset_x, offset_y=offset_y)
         if emit is not None:
@@ -244,6 +380,7 @@ async def run_calibrate(
                     "scale_y": float(cal.scale_y),
                     "offset_x": float(cal.offset_x),
                     "offset_y": float(cal.offset_y),
+                    "points": len(points),
                 }
             )
 
@@ -253,6 +390,6 @@ async def run_calibrate(
                 emit({"event": "calibrate.write", "path": str(Path(write_path).expanduser())})
         return cal
     finally:
+        stdin.close()
+        # No-op if already closed above; covers failures before navigation.
         srv.close()
-        if tmp is not None:
-            tmp.cleanup()
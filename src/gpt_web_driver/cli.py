@@ -2,56 +2,269 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import json
-import logging
 import os
 import platform
 import sys
 import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional
 
 from . import __version__
-from .calibration import default_calibration_path, load_calibration, run_calibrate
-from .browser import (
-    BrowserNotFoundError,
-    default_browser_cache_dir,
-    default_browser_channel,
-    default_browser_sandbox,
-    default_download_browser,
-    is_wsl,
-    resolve_browser_executable_path,
-)
-from .flow import load_flow, run_flow
-from .geometry import Noise
-from .os_input import MouseProfile, TypingProfile
-from .runner import RunConfig, default_dry_run, run_demo, run_single
+
+if TYPE_CHECKING:
+    from .runner import RunConfig
+
+# Subcommand implementations (runner/flow/calibration/os_input, and through them nodriver, the
+# DOM helpers, etc.) are imported inside the branch that needs them, so `--help`, `--version`
+# and `doctor` do not pay for them.
 
 
 def _path_or_none(s: Optional[str]) -> Optional[Path]:
     if s is None:
         return None
+    return _expand_path(s)
+
+
+@functools.lru_cache(maxsize=64)
+def _expand_path(s: str) -> Path:
+    # The same handful of path options are expanded several times per command (config, doctor,
+    # calibrate); Path objects are immutable, so share the result.
     return Path(s).expanduser()
 
 
+@functools.cache
+def _repo_root() -> Path:
+    # Source checkout root (webapp/, sample-body.html); resolved once, and only by the
+    # subcommands that need it.
+    return Path(__file__).resolve().parents[2]
+
+
 def _parse_vars(pairs: list[str] | None) -> dict[str, str]:
     out: dict[str, str] = {}
     for raw in pairs or []:
-        s = str(raw)
-        if "=" not in s:
-            raise SystemExit(f"--var must be KEY=VALUE (got: {raw!r})")
-        k, v = s.split("=", 1)
-        k = k.strip()
-        if not k:
+        k, sep, v = raw.partition("=")
+        if not sep or not (k := k.strip()):
             raise SystemExit(f"--var must be KEY=VALUE (got: {raw!r})")
         out[k] = v
     return out
 
 
-def build_parser() -> argparse.ArgumentParser:
+# Option groups as (args, kwargs) pairs. Subcommands compose the groups they need (see
+# build_parser); defaults that depend on the subcommand or environment are applied there with
+# set_defaults() or resolved when the command runs.
+_ArgSpecs = tuple[tuple[tuple[str, ...], dict[str, Any]], ...]
+
+# What to interact with (run/demo/flow/serve).
+_INTERACTION_ARG_SPECS: _ArgSpecs = (
+    (("--selector",), {"default": "#prompt-textarea"}),
+    (("--text",), {"default": "Hello, this is a test prompt."}),
+    (("--no-enter",), {"action": "store_true", "help": "Do not press Enter after typing."}),
+    (("--timeout",), {"type": float}),
+)
+
+# Browser discovery and launch.
+_BROWSER_ARG_SPECS: _ArgSpecs = (
+    (
+        ("--browser-path",),
+        {
+            "default": None,
+            "help": "Path to a Chrome/Chromium executable (overrides auto-detection and auto-download).",
+        },
+    ),
+    (
+        ("--browser-channel",),
+        {
+            "choices": ("stable", "beta", "dev", "canary"),
+            "help": "Channel to download when auto-downloading Chrome for Testing.",
+        },
+    ),
+    (
+        ("--download-browser",),
+        {
+            "action": argparse.BooleanOptionalAction,
+            "help": "Allow automatic download of Chrome for Testing when no browser is found.",
+        },
+    ),
+    (
+        ("--sandbox",),
+        {
+            "action": argparse.BooleanOptionalAction,
+            "help": "Enable the Chrome sandbox (disable with --no-sandbox if Chrome fails to launch in WSL/containers).",
+        },
+    ),
+    (
+        ("--browser-cache-dir",),
+        {
+            "default": None,
+            "help": "Override browser cache directory (defaults to the OS user cache dir, honoring XDG_CACHE_HOME on Linux).",
+        },
+    ),
+)
+
+# Attaching to an already-running browser.
+_CDP_ARG_SPECS: _ArgSpecs = (
+    (
+        ("--cdp-host",),
+        {
+            "default": None,
+            "help": "Connect to an existing Chrome instance via CDP (host). Requires --cdp-port. "
+            "When set, gpt-web-driver will not launch a local browser.",
+        },
+    ),
+    (
+        ("--cdp-port",),
+        {
+            "default": None,
+            "type": int,
+            "help": "Connect to an existing Chrome instance via CDP (port). Requires --cdp-host.",
+        },
+    ),
+)
+
+# Viewport->screen mapping, noise and OS input timing.
+_MAPPING_ARG_SPECS: _ArgSpecs = (
+    (
+        ("--calibration",),
+        {
+            "default": None,
+            "help": "Path to a calibration JSON file produced by `gpt-web-driver calibrate` (applies scale + offsets).",
+        },
+    ),
+    (("--scale-x",), {"type": float, "default": None, "help": "Viewport->screen X scale (default: 1.0)."}),
+    (("--scale-y",), {"type": float, "default": None, "help": "Viewport->screen Y scale (default: 1.0)."}),
+    (("--offset-x",), {"type": float, "default": None, "help": "Viewport->screen X offset (default: 0)."}),
+    (("--offset-y",), {"type": float, "default": None, "help": "Viewport->screen Y offset (default: 80)."}),
+    (("--noise-x",), {"type": int, "default": 12}),
+    (("--noise-y",), {"type": int, "default": 5}),
+    (("--move-min",), {"type": float, "default": 0.2}),
+    (("--move-max",), {"type": float, "default": 0.6}),
+    (("--type-min",), {"type": float, "default": 0.05}),
+    (("--type-max",), {"type": float, "default": 0.15}),
+    (
+        ("--seed",),
+        {
+            "type": int,
+            "default": None,
+            "help": "Deterministic seed for noise + OS timing (useful for reproducible runs).",
+        },
+    ),
+    (
+        ("--pre-interact-delay",),
+        {
+            "type": float,
+            "default": 0.0,
+            "help": "Sleep this many seconds right before OS-level interaction (gives you time to focus the browser).",
+        },
+    ),
+    (
+        ("--post-click-delay",),
+        {
+            "type": float,
+            "default": 0.5,
+            "help": "Sleep this many seconds after click and before typing.",
+        },
+    ),
+)
+
+_DRY_RUN_ARG_SPECS: _ArgSpecs = (
+    (
+        ("--dry-run",),
+        {
+            "action": argparse.BooleanOptionalAction,
+            "help": "Do not execute OS-level input; log intended actions instead.",
+        },
+    ),
+)
+
+_OUTPUT_ARG_SPECS: _ArgSpecs = (
+    (
+        ("--output",),
+        {
+            "choices": ("text", "jsonl"),
+            "default": "text",
+            "help": "Output format. Use jsonl for machine-readable event stream on stdout.",
+        },
+    ),
+    (
+        ("--log-level",),
+        {
+            "choices": ("debug", "info", "warning", "error"),
+            "default": "info",
+            "help": "Logging verbosity (logs go to stderr).",
+        },
+    ),
+)
+
+_EVENT_TEXT_ARG_SPECS: _ArgSpecs = (
+    (
+        ("--include-text-in-output",),
+        {
+            "action": "store_true",
+            "help": "Include typed text in jsonl output (may leak secrets).",
+        },
+    ),
+)
+
+_PROFILE_ARG_SPECS: _ArgSpecs = (
+    (("--real-profile",), {"default": None}),
+    (("--shim-profile",), {"default": None}),
+)
+
+# Subcommand -> one-line help, in display order.
+_SUBCOMMAND_HELP: dict[str, str] = {
+    "run": "Navigate to a URL and interact with one selector.",
+    "demo": "Serve sample-body.html locally and run the hybrid flow.",
+    "flow": "Run a multi-step JSON flow file.",
+    "serve": "Run a local OpenAI-compatible API server backed by a headed browser session.",
+    "doctor": "Print environment diagnostics (no browser automation).",
+    "calibrate": "Interactively calibrate viewport->screen mapping (scale + offset).",
+}
+_SUBCOMMANDS = frozenset(_SUBCOMMAND_HELP)
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    """
+    Return the subcommand named in `argv`, or None if there is none (or it is unknown).
+
+    Top-level options (`-h`, `--version`) take no values, so the first non-option token is the
+    subcommand. A top-level `-h`/`--help` is handled before argparse reaches the subcommand and
+    lists every subcommand, so it also yields None.
+    """
+    for tok in argv:
+        if tok in ("-h", "--help"):
+            return None
+        if not tok.startswith("-"):
+            return tok if tok in _SUBCOMMANDS else None
+    return None
+
+
+def _add_arg_specs(
+    sp: argparse.ArgumentParser,
+    *groups: _ArgSpecs,
+    overrides: Optional[Mapping[str, Mapping[str, Any]]] = None,
+) -> None:
+    """Add each option in `groups` to `sp`; `overrides` patches kwargs by option string."""
+    for group in groups:
+        for args, kwargs in group:
+            extra = overrides.get(args[0]) if overrides else None
+            sp.add_argument(*args, **({**kwargs, **extra} if extra else kwargs))
+
+
+def build_parser(only: str | None = None) -> argparse.ArgumentParser:
+    """
+    Build the CLI parser. With `only`, just that subcommand's parser is constructed (the other
+    subcommands are not registered); None builds the full tree. `only=""` registers every
+    subcommand without its options, which is all top-level help and usage errors need.
+    """
     p = argparse.ArgumentParser(prog="gpt-web-driver")
     p.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     sub = p.add_subparsers(dest="cmd", required=True)
+    if only == "":
+        for name, text in _SUBCOMMAND_HELP.items():
+            sub.add_parser(name, help=text)
+        return p
 
     def add_common(
         sp: argparse.ArgumentParser,
@@ -59,341 +272,293 @@ def build_parser() -> argparse.ArgumentParser:
         dry_run_default: bool | None = None,
         timeout_default: float = 20.0,
     ) -> None:
-        sp.add_argument("--selector", default="#prompt-textarea")
-        sp.add_argument("--text", default="Hello, this is a test prompt.")
-        sp.add_argument("--no-enter", action="store_true", help="Do not press Enter after typing.")
-        sp.add_argument("--timeout", type=float, default=float(timeout_default))
-
-        sp.add_argument(
-            "--browser-path",
-            default=None,
-            help="Path to a Chrome/Chromium executable (overrides auto-detection and auto-download).",
+        _add_arg_specs(
+            sp,
+            _INTERACTION_ARG_SPECS,
+            _BROWSER_ARG_SPECS,
+            _CDP_ARG_SPECS,
+            _MAPPING_ARG_SPECS,
+            _DRY_RUN_ARG_SPECS,
+            _OUTPUT_ARG_SPECS,
+            _EVENT_TEXT_ARG_SPECS,
+            _PROFILE_ARG_SPECS,
         )
-        sp.add_argument(
-            "--browser-channel",
-            choices=["stable", "beta", "dev", "canary"],
-            default=default_browser_channel(),
-            help="Channel to download when auto-downloading Chrome for Testing.",
+        # Subcommand-specific defaults. Environment-based defaults (browser channel/download/
+        # sandbox, dry-run) stay None here and are resolved when the command runs.
+        sp.set_defaults(
+            timeout=float(timeout_default),
+            dry_run=(None if dry_run_default is None else bool(dry_run_default)),
         )
-        sp.add_argument(
-            "--download-browser",
-            action=argparse.BooleanOptionalAction,
-            default=default_download_browser(),
-            help="Allow automatic download of Chrome for Testing when no browser is found.",
+
+    if only in (None, "run"):
+        run = sub.add_parser("run", help=_SUBCOMMAND_HELP["run"])
+        run.add_argument("--url", required=True)
+        add_common(run)
+
+    if only in (None, "demo"):
+        demo = sub.add_parser("demo", help=_SUBCOMMAND_HELP["demo"])
+        add_common(demo)
+
+    if only in (None, "flow"):
+        flow = sub.add_parser("flow", help=_SUBCOMMAND_HELP["flow"])
+        flow.add_argument("--flow", required=True, help="Path to a JSON flow file.")
+        flow.add_argument(
+            "--var",
+            action="append",
+            default=[],
+            help="Set/override a flow variable (repeatable): --var KEY=VALUE",
         )
-        sp.add_argument(
-            "--sandbox",
-            action=argparse.BooleanOptionalAction,
-            default=default_browser_sandbox(),
-            help="Enable the Chrome sandbox (disable with --no-sandbox if Chrome fails to launch in WSL/containers).",
+        add_common(flow)
+
+    if only in (None, "serve"):
+        serve = sub.add_parser("serve", help=_SUBCOMMAND_HELP["serve"])
+        serve.add_argument("--url", required=True, help="Target chat UI URL (e.g., https://chat.openai.com/).")
+        serve.add_argument("--host", default="127.0.0.1")
+        serve.add_argument("--port", type=int, default=8000)
+        serve.add_argument(
+            "--message-selector",
+            default="[data-message-author-role]",
+            help="CSS selector for chat message nodes (default matches ChatGPT-like DOM).",
         )
-        sp.add_argument(
-            "--browser-cache-dir",
-            default=None,
-            help="Override browser cache directory (defaults to the OS user cache dir, honoring XDG_CACHE_HOME on Linux).",
+        serve.add_argument(
+            "--content-selector",
+            default=".whitespace-pre-wrap, .markdown",
+            help="CSS selector for message content inside a message node (best-effort).",
         )
-        sp.add_argument(
-            "--calibration",
+        serve.add_argument(
+            "--virtual-desktop",
+            type=int,
             default=None,
-            help="Path to a calibration JSON file produced by `gpt-web-driver calibrate` (applies scale + offsets).",
+            help="Best-effort: move the browser window to this virtual desktop index on startup.",
         )
-        sp.add_argument(
-            "--cdp-host",
-            default=None,
-            help="Connect to an existing Chrome instance via CDP (host). Requires --cdp-port. "
-            "When set, gpt-web-driver will not launch a local browser.",
+        serve.add_argument(
+            "--paste-threshold",
+            type=int,
+            default=300,
+            help="Use smart paste for text >= this many characters (clipboard is preserved/restored).",
+        )
+        # Server should be real OS-input by default; users can opt into --dry-run explicitly.
+        # Also give it a longer default timeout than run/demo.
+        add_common(serve, dry_run_default=False, timeout_default=90.0)
+
+    if only in (None, "doctor"):
+        doctor = sub.add_parser("doctor", help=_SUBCOMMAND_HELP["doctor"])
+        _add_arg_specs(
+            doctor,
+            _BROWSER_ARG_SPECS,
+            _CDP_ARG_SPECS,
+            _DRY_RUN_ARG_SPECS,
+            _OUTPUT_ARG_SPECS,
+            overrides={
+                "--browser-path": {"help": "Path to a Chrome/Chromium executable (overrides auto-detection)."},
+                "--download-browser": {
+                    "help": "Allow doctor to auto-download Chrome for Testing if no browser is found (off by default).",
+                },
+                "--dry-run": {"help": "Show/override the dry-run default that run/demo will use in this environment."},
+            },
         )
-        sp.add_argument(
-            "--cdp-port",
+        doctor.set_defaults(download_browser=False)
+
+    if only in (None, "calibrate"):
+        calibrate = sub.add_parser("calibrate", help=_SUBCOMMAND_HELP["calibrate"])
+        calibrate.add_argument("--timeout", type=float, default=20.0)
+        _add_arg_specs(calibrate, _BROWSER_ARG_SPECS, _CDP_ARG_SPECS, _PROFILE_ARG_SPECS)
+        calibrate.add_argument(
+            "--write-calibration",
+            nargs="?",
+            # Bare flag: resolved to default_calibration_path() when the command runs.
+            const=True,
             default=None,
-            type=int,
-            help="Connect to an existing Chrome instance via CDP (port). Requires --cdp-host.",
+            help="Write calibration JSON (default: calibration.json in the gpt-web-driver user config directory).",
         )
+        _add_arg_specs(calibrate, _OUTPUT_ARG_SPECS)
 
-        sp.add_argument("--scale-x", type=float, default=None, help="Viewport->screen X scale (default: 1.0).")
-        sp.add_argument("--scale-y", type=float, default=None, help="Viewport->screen Y scale (default: 1.0).")
-        sp.add_argument("--offset-x", type=float, default=None, help="Viewport->screen X offset (default: 0).")
-        sp.add_argument("--offset-y", type=float, default=None, help="Viewport->screen Y offset (default: 80).")
-
-        sp.add_argument("--noise-x", type=int, default=12)
-        sp.add_argument("--noise-y", type=int, default=5)
+    return p
 
-        sp.add_argument("--move-min", type=float, default=0.2)
-        sp.add_argument("--move-max", type=float, default=0.6)
 
-        sp.add_argument("--type-min", type=float, default=0.05)
-        sp.add_argument("--type-max", type=float, default=0.15)
+# main() reuses parsers across in-process invocations (tests, embedding). Parsers are not
+# mutated after construction; parse_args() only reads them, and no parser default depends on the
+# environment, so a cached parser never goes stale.
+_build_parser_cached = functools.lru_cache(maxsize=8)(build_parser)
 
-        sp.add_argument(
-            "--seed",
-            type=int,
-            default=None,
-            help="Deterministic seed for noise + OS timing (useful for reproducible runs).",
-        )
-        sp.add_argument(
-            "--pre-interact-delay",
-            type=float,
-            default=0.0,
-            help="Sleep this many seconds right before OS-level interaction (gives you time to focus the browser).",
-        )
-        sp.add_argument(
-            "--post-click-delay",
-            type=float,
-            default=0.5,
-            help="Sleep this many seconds after click and before typing.",
-        )
-
-        sp.add_argument(
-            "--dry-run",
-            action=argparse.BooleanOptionalAction,
-            default=(default_dry_run() if dry_run_default is None else bool(dry_run_default)),
-            help="Do not execute OS-level input; log intended actions instead.",
-        )
-
-        sp.add_argument(
-            "--output",
-            choices=["text", "jsonl"],
-            default="text",
-            help="Output format. Use jsonl for machine-readable event stream on stdout.",
-        )
-        sp.add_argument(
-            "--include-text-in-output",
-            action="store_true",
-            help="Include typed text in jsonl output (may leak secrets).",
-        )
-        sp.add_argument(
-            "--log-level",
-            choices=["debug", "info", "warning", "error"],
-            default="info",
-            help="Logging verbosity (logs go to stderr).",
-        )
 
-        sp.add_argument("--real-profile", default=None)
-        sp.add_argument("--shim-profile", default=None)
+# Events after which buffered jsonl output is flushed right away.
+_FLUSH_EVENTS = frozenset({"result", "error", "doctor"})
+_EMIT_BATCH = 16
 
-    run = sub.add_parser("run", help="Navigate to a URL and interact with one selector.")
-    run.add_argument("--url", required=True)
-    add_common(run)
 
-    demo = sub.add_parser("demo", help="Serve sample-body.html locally and run the hybrid flow.")
-    add_common(demo)
+def _jsonl_emitter(stream: Any, *, batch: int = _EMIT_BATCH) -> tuple[Callable[[dict], None], Callable[[], None]]:
+    """
+    Return (emit, flush) writing one compact JSON object per line to the text stream `stream`.
 
-    flow = sub.add_parser("flow", help="Run a multi-step JSON flow file.")
-    flow.add_argument("--flow", required=True, help="Path to a JSON flow file.")
-    flow.add_argument(
-        "--var",
-        action="append",
-        default=[],
-        help="Set/override a flow variable (repeatable): --var KEY=VALUE",
-    )
-    add_common(flow)
-
-    serve = sub.add_parser("serve", help="Run a local OpenAI-compatible API server backed by a headed browser session.")
-    serve.add_argument("--url", required=True, help="Target chat UI URL (e.g., https://chat.openai.com/).")
-    serve.add_argument("--host", default="127.0.0.1")
-    serve.add_argument("--port", type=int, default=8000)
-    serve.add_argument(
-        "--message-selector",
-        default="[data-message-author-role]",
-        help="CSS selector for chat message nodes (default matches ChatGPT-like DOM).",
-    )
-    serve.add_argument(
-        "--content-selector",
-        default=".whitespace-pre-wrap, .markdown",
-        help="CSS selector for message content inside a message node (best-effort).",
-    )
-    serve.add_argument(
-        "--virtual-desktop",
-        type=int,
-        default=None,
-        help="Best-effort: move the browser window to this virtual desktop index on startup.",
-    )
-    serve.add_argument(
-        "--paste-threshold",
-        type=int,
-        default=300,
-        help="Use smart paste for text >= this many characters (clipboard is preserved/restored).",
-    )
-    # Server should be real OS-input by default; users can opt into --dry-run explicitly.
-    # Also give it a longer default timeout than run/demo.
-    add_common(serve, dry_run_default=False, timeout_default=90.0)
-
-    doctor = sub.add_parser("doctor", help="Print environment diagnostics (no browser automation).")
-    doctor.add_argument(
-        "--browser-path",
-        default=None,
-        help="Path to a Chrome/Chromium executable (overrides auto-detection).",
-    )
-    doctor.add_argument(
-        "--browser-channel",
-        choices=["stable", "beta", "dev", "canary"],
-        default=default_browser_channel(),
-        help="Channel to download when auto-downloading Chrome for Testing.",
-    )
-    doctor.add_argument(
-        "--download-browser",
-        action=argparse.BooleanOptionalAction,
-        default=False,
-        help="Allow doctor to auto-download Chrome for Testing if no browser is found (off by default).",
-    )
-    doctor.add_argument(
-        "--sandbox",
-        action=argparse.BooleanOptionalAction,
-        default=default_browser_sandbox(),
-        help="Enable the Chrome sandbox (disable with --no-sandbox if Chrome fails to launch in WSL/containers).",
-    )
-    doctor.add_argument(
-        "--browser-cache-dir",
-        default=None,
-        help="Override browser cache directory (defaults to the OS user cache dir, honoring XDG_CACHE_HOME on Linux).",
-    )
-    doctor.add_argument(
-        "--cdp-host",
-        default=None,
-        help="Connect to an existing Chrome instance via CDP (host). Requires --cdp-port.",
-    )
-    doctor.add_argument(
-        "--cdp-port",
-        default=None,
-        type=int,
-        help="Connect to an existing Chrome instance via CDP (port). Requires --cdp-host.",
-    )
-    doctor.add_argument(
-        "--dry-run",
-        action=argparse.BooleanOptionalAction,
-        default=default_dry_run(),
-        help="Show/override the dry-run default that run/demo will use in this environment.",
-    )
-    doctor.add_argument(
-        "--output",
-        choices=["text", "jsonl"],
-        default="text",
-        help="Output format. Use jsonl for machine-readable event stream on stdout.",
-    )
-    doctor.add_argument(
-        "--log-level",
-        choices=["debug", "info", "warning", "error"],
-        default="info",
-        help="Logging verbosity (logs go to stderr).",
+    Lines go to the underlying binary buffer as UTF-8 and are flushed on result/error/doctor
+    events or every `batch` events; callers must flush() before exiting.
+    """
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - depends on the local environment
+        orjson = None
+
+    def _dumps(ev: dict) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(ev)
+            except TypeError:
+                # e.g. non-str keys or out-of-range ints; the stdlib encoder is more lenient.
+                pass
+        return json.dumps(ev, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    # Anything already written through the text layer must come first.
+    stream.flush()
+    out = getattr(stream, "buffer", None)
+    pending = 0
+    # Timestamps are wall-clock seconds derived from the monotonic clock: read the epoch offset
+    # once so a clock adjustment mid-run cannot reorder events.
+    epoch_offset_ns = time.time_ns() - time.monotonic_ns()
+
+    def flush() -> None:
+        nonlocal pending
+        pending = 0
+        (stream if out is None else out).flush()
+
+    def emit(ev: dict) -> None:
+        nonlocal pending
+        if "ts" not in ev:
+            ev = {**ev, "ts": (epoch_offset_ns + time.monotonic_ns()) / 1e9}
+        line = _dumps(ev) + b"\n"
+        if out is None:
+            stream.write(line.decode("utf-8"))
+        else:
+            out.write(line)
+        pending += 1
+        if pending >= batch or ev.get("event") in _FLUSH_EVENTS:
+            flush()
+
+    return emit, flush
+
+
+def _browser_settings(ns: argparse.Namespace, env: Mapping[str, str]) -> tuple[str, bool, bool]:
+    """
+    (channel, download, sandbox) from the parsed options, using the environment-based defaults
+    for anything the user did not pass.
+    """
+    from .browser import default_browser_channel, default_browser_sandbox, default_download_browser
+
+    channel = getattr(ns, "browser_channel", None)
+    download = getattr(ns, "download_browser", None)
+    sandbox = getattr(ns, "sandbox", None)
+    return (
+        str(channel or default_browser_channel(env)),
+        default_download_browser(env) if download is None else bool(download),
+        default_browser_sandbox(env) if sandbox is None else bool(sandbox),
     )
 
-    calibrate = sub.add_parser("calibrate", help="Interactively calibrate viewport->screen mapping (scale + offset).")
-    calibrate.add_argument("--timeout", type=float, default=20.0)
-    calibrate.add_argument(
-        "--browser-path",
-        default=None,
-        help="Path to a Chrome/Chromium executable (overrides auto-detection and auto-download).",
-    )
-    calibrate.add_argument(
-        "--browser-channel",
-        choices=["stable", "beta", "dev", "canary"],
-        default=default_browser_channel(),
-        help="Channel to download when auto-downloading Chrome for Testing.",
-    )
-    calibrate.add_argument(
-        "--download-browser",
-        action=argparse.BooleanOptionalAction,
-        default=default_download_browser(),
-        help="Allow automatic download of Chrome for Testing when no browser is found.",
-    )
-    calibrate.add_argument(
-        "--sandbox",
-        action=argparse.BooleanOptionalAction,
-        default=default_browser_sandbox(),
-        help="Enable the Chrome sandbox (disable with --no-sandbox if Chrome fails to launch in WSL/containers).",
-    )
-    calibrate.add_argument(
-        "--browser-cache-dir",
-        default=None,
-        help="Override browser cache directory (defaults to platformdirs/user cache dir).",
-    )
-    calibrate.add_argument(
-        "--cdp-host",
-        default=None,
-        help="Connect to an existing Chrome instance via CDP (host). Requires --cdp-port.",
-    )
-    calibrate.add_argument(
-        "--cdp-port",
-        default=None,
-        type=int,
-        help="Connect to an existing Chrome instance via CDP (port). Requires --cdp-host.",
-    )
-    calibrate.add_argument("--real-profile", default=None)
-    calibrate.add_argument("--shim-profile", default=None)
-    calibrate.add_argument(
-        "--write-calibration",
-        nargs="?",
-        const=str(default_calibration_path()),
-        default=None,
-        help=f"Write calibration JSON (default: {default_calibration_path()}).",
-    )
-    calibrate.add_argument(
-        "--output",
-        choices=["text", "jsonl"],
-        default="text",
-        help="Output format. Use jsonl for machine-readable event stream on stdout.",
-    )
-    calibrate.add_argument(
-        "--log-level",
-        choices=["debug", "info", "warning", "error"],
-        default="info",
-        help="Logging verbosity (logs go to stderr).",
-    )
 
-    return p
+# RunConfig field -> (namespace attribute, converter). Missing or None attributes map to None
+# without calling the converter.
+_RUN_CONFIG_FIELDS: tuple[tuple[str, str, Callable[[Any], Any]], ...] = (
+    ("selector", "selector", str),
+    ("timeout_s", "timeout", float),
+    ("browser_path", "browser_path", _path_or_none),
+    ("browser_cache_dir", "browser_cache_dir", _path_or_none),
+    ("real_profile", "real_profile", _path_or_none),
+    ("shim_profile", "shim_profile", _path_or_none),
+    ("seed", "seed", int),
+    ("pre_interact_delay_s", "pre_interact_delay", float),
+    ("post_click_delay_s", "post_click_delay", float),
+)
+
+# Screen-mapping defaults, overridden by --calibration and then by the explicit flags.
+_MAPPING_DEFAULTS: dict[str, float] = {"scale_x": 1.0, "scale_y": 1.0, "offset_x": 0.0, "offset_y": 80.0}
 
 
 def _make_config(ns: argparse.Namespace) -> RunConfig:
-    cdp_host = getattr(ns, "cdp_host", None)
-    cdp_port = getattr(ns, "cdp_port", None)
+    from .geometry import Noise
+    from .os_input import MouseProfile, TypingProfile
+    from .runner import RunConfig, default_dry_run
+
+    get = ns.__dict__.get
+    cdp_host = get("cdp_host")
+    cdp_port = get("cdp_port")
     if (cdp_host is None) ^ (cdp_port is None):
         raise SystemExit("--cdp-host and --cdp-port must be provided together")
 
-    base_scale_x = 1.0
-    base_scale_y = 1.0
-    base_offset_x = 0.0
-    base_offset_y = 80.0
-    cal_path = _path_or_none(getattr(ns, "calibration", None))
+    kwargs: dict[str, Any] = {
+        field: (None if (v := get(attr)) is None else conv(v)) for field, attr, conv in _RUN_CONFIG_FIELDS
+    }
+
+    mapping = dict(_MAPPING_DEFAULTS)
+    cal_path = _path_or_none(get("calibration"))
     if cal_path is not None:
+        from .calibration import load_calibration
+
         try:
             cal = load_calibration(cal_path)
         except Exception as e:
             raise SystemExit(f"Failed to load calibration file {str(cal_path)!r}: {e}") from e
-        base_scale_x = float(cal.scale_x)
-        base_scale_y = float(cal.scale_y)
-        base_offset_x = float(cal.offset_x)
-        base_offset_y = float(cal.offset_y)
+        mapping.update(scale_x=cal.scale_x, scale_y=cal.scale_y, offset_x=cal.offset_x, offset_y=cal.offset_y)
+    for name, base in mapping.items():
+        v = get(name)
+        kwargs[name] = float(base if v is None else v)
 
+    dry_run = get("dry_run")
+    kwargs["browser_channel"], kwargs["download_browser"], kwargs["sandbox"] = _browser_settings(ns, os.environ)
     return RunConfig(
-        url=getattr(ns, "url", ""),
-        selector=ns.selector,
-        text=(ns.text or None),
-        press_enter=not ns.no_enter,
-        dry_run=bool(ns.dry_run),
-        timeout_s=float(ns.timeout),
-        browser_path=_path_or_none(ns.browser_path),
-        browser_channel=str(ns.browser_channel),
-        download_browser=bool(ns.download_browser),
-        sandbox=bool(ns.sandbox),
-        browser_cache_dir=_path_or_none(ns.browser_cache_dir),
+        url=get("url", ""),
+        text=(get("text") or None),
+        press_enter=not get("no_enter"),
+        dry_run=(default_dry_run() if dry_run is None else bool(dry_run)),
         cdp_host=(str(cdp_host) if cdp_host else None),
         cdp_port=(int(cdp_port) if cdp_port is not None else None),
-        scale_x=float(base_scale_x if getattr(ns, "scale_x", None) is None else ns.scale_x),
-        scale_y=float(base_scale_y if getattr(ns, "scale_y", None) is None else ns.scale_y),
-        offset_x=float(base_offset_x if getattr(ns, "offset_x", None) is None else ns.offset_x),
-        offset_y=float(base_offset_y if getattr(ns, "offset_y", None) is None else ns.offset_y),
         noise=Noise(x_px=int(ns.noise_x), y_px=int(ns.noise_y)),
         mouse=MouseProfile(min_move_duration_s=float(ns.move_min), max_move_duration_s=float(ns.move_max)),
         typing=TypingProfile(min_delay_s=float(ns.type_min), max_delay_s=float(ns.type_max)),
-        real_profile=_path_or_none(ns.real_profile),
-        shim_profile=_path_or_none(ns.shim_profile),
-        seed=(int(ns.seed) if ns.seed is not None else None),
-        pre_interact_delay_s=float(ns.pre_interact_delay),
-        post_click_delay_s=float(ns.post_click_delay),
+        **kwargs,
     )
 
 
+def _event_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """uvloop's loop factory when the `speedups` extra is installed (not on Windows), else None."""
+    if sys.platform == "win32":
+        return None
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def _run_async(coro: Any) -> Any:
+    # A fresh loop per command: browser/CDP connections are bound to the loop that opened them,
+    # so nothing is kept around for a later in-process invocation.
+    with asyncio.Runner(loop_factory=_event_loop_factory()) as runner:
+        return runner.run(coro)
+
+
+def _write_stdout(text: str) -> None:
+    """Write `text` to stdout in one call, through the binary buffer when there is one."""
+    out = sys.stdout
+    buf = getattr(out, "buffer", None)
+    if buf is None:
+        out.write(text)
+        return
+    out.flush()
+    buf.write(text.encode(out.encoding or "utf-8", out.errors or "strict"))
+    buf.flush()
+
+
 def _doctor(ns: argparse.Namespace, *, emit=None) -> None:
+    from .browser import (
+        BrowserNotFoundError,
+        default_browser_cache_dir,
+        default_browser_channel,
+        default_browser_sandbox,
+        default_download_browser,
+        is_wsl,
+        resolve_browser_executable_path,
+    )
+    from .runner import default_dry_run
+
     cdp_host = getattr(ns, "cdp_host", None)
     cdp_port = getattr(ns, "cdp_port", None)
     if (cdp_host is None) ^ (cdp_port is None):
@@ -408,7 +573,7 @@ def _doctor(ns: argparse.Namespace, *, emit=None) -> None:
         p = resolve_browser_executable_path(
             explicit_path=_path_or_none(getattr(ns, "browser_path", None)),
             download=bool(getattr(ns, "download_browser", False)),
-            channel=str(getattr(ns, "browser_channel", default_browser_channel(env))),
+            channel=_browser_settings(ns, env)[0],
             cache_dir=browser_cache_dir,
             env=env,
         )
@@ -416,75 +581,86 @@ def _doctor(ns: argparse.Namespace, *, emit=None) -> None:
     except (BrowserNotFoundError, FileNotFoundError, ValueError) as e:
         browser_error = str(e)
 
-    payload = {
-        "event": "doctor",
-        "python": sys.version.split()[0],
-        "platform": sys.platform,
-        "machine": platform.machine(),
-        "is_wsl": bool(is_wsl(env)),
-        "display": {
-            "DISPLAY": env.get("DISPLAY"),
-            "WAYLAND_DISPLAY": env.get("WAYLAND_DISPLAY"),
-        },
-        "effective_dry_run": bool(getattr(ns, "dry_run", default_dry_run())),
-        "default_download_browser": bool(default_download_browser(env)),
-        "default_browser_channel": str(default_browser_channel(env)),
-        "default_browser_sandbox": bool(default_browser_sandbox(env)),
-        "browser_cache_dir": str(browser_cache_dir),
-        "browser_resolved": resolved_browser,
-        "browser_error": browser_error,
-        "cdp": (
-            {"host": str(cdp_host), "port": int(cdp_port)} if (cdp_host and (cdp_port is not None)) else None
-        ),
-    }
+    is_wsl_env = bool(is_wsl(env))
+    display = env.get("DISPLAY")
+    wayland_display = env.get("WAYLAND_DISPLAY")
+    effective_dry_run = default_dry_run() if getattr(ns, "dry_run", None) is None else bool(ns.dry_run)
+    download_default = bool(default_download_browser(env))
+    sandbox_default = bool(default_browser_sandbox(env))
+    cdp = (str(cdp_host), int(cdp_port)) if (cdp_host and (cdp_port is not None)) else None
 
     if emit is not None:
-        emit(payload)
+        emit(
+            {
+                "event": "doctor",
+                "python": sys.version.split()[0],
+                "platform": sys.platform,
+                "machine": platform.machine(),
+                "is_wsl": is_wsl_env,
+                "display": {"DISPLAY": display, "WAYLAND_DISPLAY": wayland_display},
+                "effective_dry_run": effective_dry_run,
+                "default_download_browser": download_default,
+                "default_browser_channel": str(default_browser_channel(env)),
+                "default_browser_sandbox": sandbox_default,
+                "browser_cache_dir": str(browser_cache_dir),
+                "browser_resolved": resolved_browser,
+                "browser_error": browser_error,
+                "cdp": (None if cdp is None else {"host": cdp[0], "port": cdp[1]}),
+            }
+        )
         return
 
     lines = [
         "gpt-web-driver doctor",
-        f"python:   {payload['python']}",
-        f"platform: {payload['platform']} ({payload['machine']})",
-        f"wsl:      {str(payload['is_wsl']).lower()}",
-        f"display:  DISPLAY={payload['display']['DISPLAY']!r} WAYLAND_DISPLAY={payload['display']['WAYLAND_DISPLAY']!r}",
-        f"dry-run:  {str(payload['effective_dry_run']).lower()}",
-        f"sandbox:  {str(payload['default_browser_sandbox']).lower()} (default; override with --sandbox/--no-sandbox)",
-        f"download: {str(payload['default_download_browser']).lower()} (default for run/demo; doctor uses --download-browser)",
-        f"cache:    {payload['browser_cache_dir']}",
+        f"python:   {sys.version.split()[0]}",
+        f"platform: {sys.platform} ({platform.machine()})",
+        f"wsl:      {str(is_wsl_env).lower()}",
+        f"display:  DISPLAY={display!r} WAYLAND_DISPLAY={wayland_display!r}",
+        f"dry-run:  {str(effective_dry_run).lower()}",
+        f"sandbox:  {str(sandbox_default).lower()} (default; override with --sandbox/--no-sandbox)",
+        f"download: {str(download_default).lower()} (default for run/demo; doctor uses --download-browser)",
+        f"cache:    {browser_cache_dir}",
     ]
-    if payload["cdp"] is not None:
-        lines.append(f"cdp:      {payload['cdp']['host']}:{payload['cdp']['port']}")
-
-    if payload["browser_resolved"]:
-        lines.append(f"browser:  {payload['browser_resolved']}")
+    if cdp is not None:
+        lines.append(f"cdp:      {cdp[0]}:{cdp[1]}")
+    if resolved_browser:
+        lines.append(f"browser:  {resolved_browser}")
     else:
         lines.append("browser:  (not found)")
-        if payload["browser_error"]:
-            lines.append(f"error:    {payload['browser_error']}")
-
-    sys.stdout.write("\n".join(lines) + "\n")
+        if browser_error:
+            lines.append(f"error:    {browser_error}")
+    lines.append("")
+    _write_stdout("\n".join(lines))
 
 
 def main(argv: Optional[list[str]] = None) -> int:
-    ns = build_parser().parse_args(argv)
-
-    log_level = getattr(logging, str(ns.log_level).upper(), logging.INFO)
-    logging.basicConfig(
-        level=log_level,
-        stream=sys.stderr,
-        format="%(levelname)s %(name)s: %(message)s",
-    )
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv == ["--version"]:
+        # Answer the most common no-op invocation before building any parser.
+        sys.stdout.write(f"gpt-web-driver {__version__}\n")
+        return 0
+    cmd = _sniff_subcommand(argv)
+    # Without a known subcommand argparse can only print top-level help or a usage error, and
+    # those only need the subcommand names.
+    ns = _build_parser_cached("" if cmd is None else cmd).parse_args(argv)
+
+    # In jsonl mode at the default level the event stream carries the progress information;
+    # leave logging unconfigured (warnings still reach stderr via logging's last-resort handler).
+    if ns.output != "jsonl" or ns.log_level != "info":
+        import logging
+
+        logging.basicConfig(
+            level=getattr(logging, str(ns.log_level).upper(), logging.INFO),
+            stream=sys.stderr,
+            format="%(levelname)s %(name)s: %(message)s",
+        )
 
     emit = None
+    flush_events = None
     if ns.output == "jsonl":
-        def _emit(ev: dict) -> None:
-            if "ts" not in ev:
-                ev = {**ev, "ts": time.time()}
-            sys.stdout.write(json.dumps(ev, separators=(",", ":")) + "\n")
-            sys.stdout.flush()
-
-        emit = _emit
+        # Interactive commands stream each event as it happens; the others batch their writes.
+        emit, flush_events = _jsonl_emitter(sys.stdout, batch=(1 if ns.cmd in ("serve", "calibrate") else _EMIT_BATCH))
 
     try:
         if ns.cmd == "doctor":
@@ -492,11 +668,17 @@ def main(argv: Optional[list[str]] = None) -> int:
             return 0
 
         if ns.cmd == "calibrate":
+            from .calibration import default_calibration_path, run_calibrate
+            from .geometry import Noise
+            from .os_input import MouseProfile, TypingProfile
+            from .runner import RunConfig
+
             cdp_host = getattr(ns, "cdp_host", None)
             cdp_port = getattr(ns, "cdp_port", None)
             if (cdp_host is None) ^ (cdp_port is None):
                 raise SystemExit("--cdp-host and --cdp-port must be provided together")
 
+            browser_channel, download_browser, sandbox = _browser_settings(ns, os.environ)
             cfg = RunConfig(
                 url="",
                 selector="#calibrate-a",
@@ -506,9 +688,9 @@ def main(argv: Optional[list[str]] = None) -> int:
                 dry_run=False,
                 timeout_s=float(getattr(ns, "timeout", 20.0)),
                 browser_path=_path_or_none(getattr(ns, "browser_path", None)),
-                browser_channel=str(getattr(ns, "browser_channel", default_browser_channel())),
-                download_browser=bool(getattr(ns, "download_browser", default_download_browser())),
-                sandbox=bool(getattr(ns, "sandbox", default_browser_sandbox())),
+                browser_channel=browser_channel,
+                download_browser=download_browser,
+                sandbox=sandbox,
                 browser_cache_dir=_path_or_none(getattr(ns, "browser_cache_dir", None)),
                 cdp_host=(str(cdp_host) if cdp_host else None),
                 cdp_port=(int(cdp_port) if cdp_port is not None else None),
@@ -525,12 +707,14 @@ def main(argv: Optional[list[str]] = None) -> int:
                 pre_interact_delay_s=0.0,
                 post_click_delay_s=0.0,
             )
-            repo_root = Path(__file__).resolve().parents[2]
-            write_path = _path_or_none(getattr(ns, "write_calibration", None))
-            cal = asyncio.run(
+            write_calibration = getattr(ns, "write_calibration", None)
+            write_path = (
+                default_calibration_path() if write_calibration is True else _path_or_none(write_calibration)
+            )
+            cal = _run_async(
                 run_calibrate(
                     cfg,
-                    repo_root=repo_root,
+                    repo_root=_repo_root(),
                     emit=emit,
                     write_path=write_path,
                 )
@@ -572,15 +756,15 @@ def main(argv: Optional[list[str]] = None) -> int:
                         f"Recommended path: {default_calibration_path()}",
                     ]
                 )
-                sys.stdout.write(
-                    "\n".join(lines) + "\n"
-                )
+                _write_stdout("\n".join(lines) + "\n")
             return 0
 
         cfg = _make_config(ns)
 
         if ns.cmd == "run":
-            asyncio.run(
+            from .runner import run_single
+
+            _run_async(
                 run_single(
                     cfg,
                     emit=emit,
@@ -590,11 +774,12 @@ def main(argv: Optional[list[str]] = None) -> int:
             return 0
 
         if ns.cmd == "demo":
-            repo_root = Path(__file__).resolve().parents[2]
-            asyncio.run(
+            from .runner import run_demo
+
+            _run_async(
                 run_demo(
                     cfg,
-                    repo_root=repo_root,
+                    repo_root=_repo_root(),
                     emit=emit,
                     include_text_in_events=bool(ns.include_text_in_output),
                 )
@@ -602,11 +787,13 @@ def main(argv: Optional[list[str]] = None) -> int:
             return 0
 
         if ns.cmd == "flow":
+            from .flow import load_flow, run_flow
+
             spec = load_flow(Path(str(ns.flow)).expanduser())
             flow_vars = _parse_vars(getattr(ns, "var", None))
             # In text mode, keep stdout clean for the final result (avoid dry-run prints).
             emit_for_flow = emit if emit is not None else (lambda _ev: None)
-            res = asyncio.run(
+            res = _run_async(
                 run_flow(
                     cfg,
                     spec,
@@ -648,6 +835,9 @@ def main(argv: Optional[list[str]] = None) -> int:
         else:
             print(f"error: {e}", file=sys.stderr)
         return 1
+    finally:
+        if flush_events is not None:
+            flush_events()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import sys
+from functools import lru_cache
 from typing import Any, Iterable, Optional
 from urllib.parse import urlparse
 
-from ..stealth import stealth_init
-
 
+@lru_cache(maxsize=256)
 def origin_from_url(url: str) -> Optional[str]:
     """
     Extract a CDP "origin" (scheme://host[:port]) from a URL.
+
+    Results are cached: flows typically revisit the same few URLs.
     """
     try:
         p = urlparse(str(url))
@@ -19,6 +22,29 @@ def origin_from_url(url: str) -> Optional[str]:
     return f"{p.scheme}://{p.netloc}"
 
 
+# (uc.cdp.browser.grant_permissions, takes keyword arguments) for the helper last seen. The
+# generated helper's signature has differed across nodriver versions; probe it once.
+_GRANT_CALL: tuple[Any, bool] | None = None
+
+
+def _grant_permissions_msg(fn: Any, perms: list[str], origin: str) -> Any:
+    global _GRANT_CALL
+    cached = _GRANT_CALL
+    if cached is not None and cached[0] is fn:
+        return fn(permissions=perms, origin=origin) if cached[1] else fn(perms, origin)
+    try:
+        msg = fn(perms, origin)
+        keyword = False
+    except TypeError:
+        try:
+            msg = fn(permissions=perms, origin=origin)
+            keyword = True
+        except TypeError:
+            return None
+    _GRANT_CALL = (fn, keyword)
+    return msg
+
+
 async def grant_permissions(
     page: Any,
     *,
@@ -34,7 +60,7 @@ async def grant_permissions(
     if not hasattr(page, "send"):
         return
 
-    uc = uc_module
+    uc = uc_module if uc_module is not None else sys.modules.get("nodriver")
     if uc is None:
         try:
             import nodriver as uc  # type: ignore[assignment]
@@ -50,14 +76,7 @@ async def grant_permissions(
             browser = getattr(getattr(uc, "cdp", None), "browser", None)
             fn = getattr(browser, "grant_permissions", None) if browser is not None else None
             if callable(fn):
-                msg = None
-                try:
-                    msg = fn(perms, origin_s)
-                except TypeError:
-                    try:
-                        msg = fn(permissions=perms, origin=origin_s)
-                    except TypeError:
-                        msg = None
+                msg = _grant_permissions_msg(fn, perms, origin_s)
                 if msg is not None:
                     try:
                         await page.send(msg)
@@ -85,6 +104,8 @@ async def optimize_connection(
     """
     "Silence protocol" + best-effort permission pre-approval.
     """
+    from ..stealth import stealth_init
+
     await stealth_init(page, uc_module=uc_module)
     if url_for_permissions:
         origin = origin_from_url(url_for_permissions)
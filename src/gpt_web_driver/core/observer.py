@@ -1,51 +1,133 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+import logging
+import sys
+import weakref
+from dataclasses import dataclass, field
 from typing import Any, Callable, Iterable, Optional
 
-from ..nodriver_dom import dom_get_outer_html, html_to_text, wait_for_selector
+from ..nodriver_dom import DomChangeWatcher, dom_get_outer_html, html_to_text, wait_for_selector
+from .safety import DeadManSwitch
 
+_LOG = logging.getLogger(__name__)
 
-def _attrs_list_to_dict(attrs: list[str]) -> dict[str, str]:
-    out: dict[str, str] = {}
+# Upper bound on message nodes read concurrently over the CDP websocket.
+_MAX_INFLIGHT_NODES = 32
+# Upper bound on DOM commands in flight per page, shared by every concurrent reader of it.
+_MAX_INFLIGHT_CDP = 64
+
+# page -> (loop, semaphore). A semaphore is tied to the loop it is used on; pages can outlive one.
+_PAGE_SEMAPHORES: weakref.WeakKeyDictionary[Any, tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = (
+    weakref.WeakKeyDictionary()
+)
+
+# While waiting on DOM events, still re-read this often: runs on_poll and covers mutations
+# the page never reported (e.g. in subtrees the DOM agent has not pushed to us).
+_EVENT_RECHECK_S = 1.0
+
+
+def _attrs_list_to_dict(attrs: Iterable[str]) -> dict[str, str]:
+    # CDP returns a flat [name1, value1, name2, value2, ...] list of strings. Zipping one
+    # iterator with itself pairs consecutive items (a dangling trailing name is dropped).
     it = iter(attrs)
-    for k in it:
-        try:
-            v = next(it)
-        except StopIteration:
-            break
-        out[str(k)] = str(v)
-    return out
+    return dict(zip(it, it))
+
+
+def _page_semaphore(page: Any) -> asyncio.Semaphore | None:
+    loop = asyncio.get_running_loop()
+    try:
+        entry = _PAGE_SEMAPHORES.get(page)
+        if entry is None or entry[0] is not loop:
+            entry = _PAGE_SEMAPHORES[page] = (loop, asyncio.Semaphore(_MAX_INFLIGHT_CDP))
+        return entry[1]
+    except TypeError:
+        # Unhashable or not weak-referenceable page objects go unbounded.
+        return None
+
+
+async def _send(page: Any, msg: Any) -> Any:
+    """
+    page.send() under the page's in-flight window: CDP pipelines commands on one socket, so
+    many may be outstanding, but not unboundedly many.
+    """
+    sem = _page_semaphore(page)
+    if sem is None:
+        return await page.send(msg)
+    async with sem:
+        return await page.send(msg)
 
 
 async def _dom_get_document(page: Any, uc: Any) -> Any:
-    # Prefer shallow document since we only need root nodeId.
+    # Shallow document only: we need the root nodeId, never the full (pierced) tree.
     try:
-        return await page.send(uc.cdp.dom.get_document(1, True))
+        msg = uc.cdp.dom.get_document(1, True)
     except TypeError:
-        return await page.send(uc.cdp.dom.get_document(-1, True))
+        msg = uc.cdp.dom.get_document(depth=1, pierce=True)
+    return await _send(page, msg)
+
+
+async def _dom_root_node_id(page: Any, uc: Any) -> Any:
+    doc = await _dom_get_document(page, uc)
+    root_id = getattr(doc, "node_id", None)
+    if root_id is None:
+        root = getattr(doc, "root", None)
+        root_id = getattr(root, "node_id", None) if root is not None else None
+    if root_id is None:
+        # Extremely defensive; in practice nodriver returns a document/root node with node_id.
+        raise RuntimeError("DOM.getDocument returned no root node_id")
+    return root_id
 
 
 async def _dom_query_selector_all(page: Any, uc: Any, root_node_id: Any, selector: str) -> list[Any]:
     try:
-        res = await page.send(uc.cdp.dom.query_selector_all(root_node_id, selector))
+        msg = uc.cdp.dom.query_selector_all(root_node_id, selector)
     except TypeError:
-        res = await page.send(uc.cdp.dom.query_selector_all(node_id=root_node_id, selector=selector))
+        msg = uc.cdp.dom.query_selector_all(node_id=root_node_id, selector=selector)
+    res = await _send(page, msg)
     # nodriver returns a list of NodeId-like values.
     return list(res or [])
 
 
 async def _dom_get_attributes(page: Any, uc: Any, node_id: Any) -> dict[str, str]:
-    attrs_list = await page.send(uc.cdp.dom.get_attributes(node_id))
-    return _attrs_list_to_dict(list(attrs_list or []))
+    attrs_list = await _send(page, uc.cdp.dom.get_attributes(node_id))
+    # Paired straight off the response; no intermediate list copy.
+    return _attrs_list_to_dict(attrs_list or ())
 
 
 async def _dom_query_selector(page: Any, uc: Any, root_node_id: Any, selector: str) -> Any:
     try:
-        return await page.send(uc.cdp.dom.query_selector(root_node_id, selector))
+        msg = uc.cdp.dom.query_selector(root_node_id, selector)
     except TypeError:
-        return await page.send(uc.cdp.dom.query_selector(node_id=root_node_id, selector=selector))
+        msg = uc.cdp.dom.query_selector(node_id=root_node_id, selector=selector)
+    return await _send(page, msg)
+
+
+async def _content_node_ids(
+    page: Any, uc: Any, root_node_id: Any, node_ids: list[Any], message_selector: str, content_selector: str
+) -> dict[Any, Any] | None:
+    """
+    Map each message node to its first content descendant using one DOM.querySelectorAll.
+
+    Matches of a selector list come back in document order, so every content match belongs to
+    the closest message node before it (for non-nested messages this is exactly what a scoped
+    DOM.querySelector per message returns). Message nodes without content are left out.
+    Returns None if the combined query is rejected.
+    """
+    combined = f":is({message_selector}), :is({message_selector}) :is({content_selector})"
+    try:
+        ordered = await _dom_query_selector_all(page, uc, root_node_id, combined)
+    except Exception:
+        return None
+    messages = set(node_ids)
+    out: dict[Any, Any] = {}
+    current = None
+    for n in ordered:
+        if n in messages:
+            current = n
+        elif current is not None and current not in out:
+            out[current] = n
+    return out
 
 
 @dataclass(frozen=True)
@@ -69,40 +151,54 @@ async def extract_chat_messages(
     if float(timeout_s) > 0:
         await wait_for_selector(page, message_selector, timeout_s=float(timeout_s))
 
-    uc = uc_module
+    # Already-imported module first: skips the import machinery on every call.
+    uc = uc_module if uc_module is not None else sys.modules.get("nodriver")
     if uc is None:
         import nodriver as uc  # type: ignore[assignment]
 
-    doc = await _dom_get_document(page, uc)
-    root_id = getattr(doc, "node_id", None)
-    if root_id is None:
-        root = getattr(doc, "root", None)
-        root_id = getattr(root, "node_id", None) if root is not None else None
-    if root_id is None:
-        # Extremely defensive; in practice nodriver returns a document/root node with node_id.
-        raise RuntimeError("DOM.getDocument returned no root node_id")
-
+    root_id = await _dom_root_node_id(page, uc)
     node_ids = await _dom_query_selector_all(page, uc, root_id, str(message_selector))
-    messages: list[ChatMessage] = []
-    for node_id in node_ids:
-        attrs = await _dom_get_attributes(page, uc, node_id)
+    content_ids = await _content_node_ids(page, uc, root_id, node_ids, str(message_selector), str(content_selector))
+
+    # Per-node reads are independent; keep several in flight on the CDP socket at once.
+    sem = asyncio.Semaphore(_MAX_INFLIGHT_NODES)
+
+    async def _one(node_id: Any) -> ChatMessage | None:
+        async with sem:
+            if content_ids is not None:
+                # The text node is already known, so the two reads do not depend on each other.
+                attrs, outer_html = await asyncio.gather(
+                    _dom_get_attributes(page, uc, node_id),
+                    dom_get_outer_html(page, int(content_ids.get(node_id, node_id))),
+                )
+            else:
+                attrs = await _dom_get_attributes(page, uc, node_id)
+                # Prefer an inner content node for text extraction.
+                target_node_id = node_id
+                try:
+                    inner = await _dom_query_selector(page, uc, node_id, str(content_selector))
+                    if inner:
+                        target_node_id = inner
+                except Exception:
+                    pass
+                outer_html = await dom_get_outer_html(page, int(target_node_id))
         role = attrs.get("data-message-author-role", "unknown")
         message_id = attrs.get("data-message-id", "")
-
-        # Prefer an inner content node for text extraction.
-        target_node_id = node_id
-        try:
-            inner = await _dom_query_selector(page, uc, node_id, str(content_selector))
-            if inner:
-                target_node_id = inner
-        except Exception:
-            pass
-
-        outer_html = await dom_get_outer_html(page, int(target_node_id))
         text = html_to_text(outer_html)
-        if text:
-            messages.append(ChatMessage(role=str(role), message_id=str(message_id), text=str(text)))
-    return messages
+        if not text:
+            return None
+        return ChatMessage(role=str(role), message_id=str(message_id), text=str(text))
+
+    # A message node can be replaced while a streaming reply re-renders ("No node with given
+    # id"); drop just that node instead of failing the whole read. If every node failed, the
+    # problem is not node churn, so surface it.
+    results = await asyncio.gather(*(_one(n) for n in node_ids), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
+    for err in errors:
+        _LOG.debug("dropped message node that failed to read", exc_info=err)
+    return [m for m in results if isinstance(m, ChatMessage)]
 
 
 async def last_assistant_message_text(
@@ -129,6 +225,64 @@ async def last_assistant_message_text(
     return None
 
 
+@dataclass
+class _ChatCache:
+    """
+    DOM state reused across wait_for_assistant_reply polls.
+
+    Every DOM.getDocument call invalidates previously returned nodeIds, so the root is fetched
+    once and kept; node ids (and the roles read for them) then stay valid until the document is
+    replaced, which shows up as a failing read and resets the cache.
+    """
+
+    root_id: Any = None
+    roles: dict[Any, str] = field(default_factory=dict)
+    # Message node the last returned text came from.
+    reply_node: Any = None
+
+    def reset(self) -> None:
+        self.root_id = None
+        self.roles.clear()
+        self.reply_node = None
+
+
+async def _last_assistant_text_cached(
+    page: Any, uc: Any, cache: _ChatCache, *, message_selector: str, content_selector: str
+) -> Optional[str]:
+    """
+    Same result as last_assistant_message_text, reading only from the newest message backwards.
+
+    Steady state is three reads per poll (message list, content node, HTML) regardless of the
+    conversation length.
+    """
+    try:
+        if cache.root_id is None:
+            cache.root_id = await _dom_root_node_id(page, uc)
+        node_ids = await _dom_query_selector_all(page, uc, cache.root_id, message_selector)
+        for node_id in reversed(node_ids):
+            role = cache.roles.get(node_id)
+            if role is None:
+                attrs = await _dom_get_attributes(page, uc, node_id)
+                role = cache.roles[node_id] = attrs.get("data-message-author-role", "unknown")
+            if role != "assistant":
+                continue
+            target_node_id = node_id
+            try:
+                inner = await _dom_query_selector(page, uc, node_id, content_selector)
+                if inner:
+                    target_node_id = inner
+            except Exception:
+                pass
+            text = html_to_text(await dom_get_outer_html(page, int(target_node_id)))
+            if text:
+                cache.reply_node = node_id
+                return str(text)
+        return None
+    except Exception:
+        cache.reset()
+        raise
+
+
 async def wait_for_assistant_reply(
     page: Any,
     *,
@@ -141,46 +295,78 @@ async def wait_for_assistant_reply(
     uc_module: Optional[Any] = None,
     on_poll: Callable[[], None] | None = None,
     interruption_keywords: Iterable[str] = ("challenge", "verify", "captcha"),
+    deadman: DeadManSwitch | None = None,
 ) -> str:
     """
     Wait for an assistant reply to appear and stop changing for `stable_s`.
+
+    On pages that deliver CDP DOM events (nodriver tabs), reads happen on DOM mutations rather
+    than every `poll_s`; `poll_s` then only bounds how often a busy page is re-read.
+
+    `deadman` takes precedence over `interruption_keywords` when both are given.
     """
+    if deadman is None:
+        deadman = DeadManSwitch(keywords=tuple(interruption_keywords))
+
+    # Already-imported module first: skips the import machinery on every call.
+    uc = uc_module if uc_module is not None else sys.modules.get("nodriver")
+    if uc is None:
+        import nodriver as uc  # type: ignore[assignment]
+
     loop = asyncio.get_running_loop()
     deadline = loop.time() + float(timeout_s)
     stable_deadline: float | None = None
+    cache = _ChatCache()
+    watcher = DomChangeWatcher(page, uc, on_document_updated=cache.reset)
+    event_driven = watcher.start()
 
     last: str | None = None
-    while True:
-        if loop.time() >= deadline:
-            raise TimeoutError("Timed out waiting for assistant reply.")
-
-        txt = await last_assistant_message_text(
-            page,
-            message_selector=message_selector,
-            content_selector=content_selector,
-            timeout_s=0.0,
-            uc_module=uc_module,
-        )
-
-        if baseline_text is not None and txt == baseline_text:
-            txt = None
-
-        # Dead man's switch: detect interruption keywords anywhere in the assistant output.
-        blob = (txt or "").lower()
-        if any(str(k).lower() in blob for k in interruption_keywords):
-            raise RuntimeError("Automation interrupted: potential verification/challenge detected.")
-
-        if txt and txt != last:
-            last = txt
-            stable_deadline = loop.time() + float(stable_s)
-
-        if txt and stable_deadline is not None and loop.time() >= stable_deadline:
-            return str(txt)
-
-        if on_poll is not None:
+    try:
+        while True:
+            if loop.time() >= deadline:
+                raise TimeoutError("Timed out waiting for assistant reply.")
+
+            # Cleared before reading: a mutation during the read makes the next wait return at once.
+            watcher.changed.clear()
             try:
-                on_poll()
+                txt = await _last_assistant_text_cached(
+                    page, uc, cache, message_selector=str(message_selector), content_selector=str(content_selector)
+                )
             except Exception:
-                pass
-
-        await asyncio.sleep(float(poll_s))
+                # Stale ids (navigation or re-render) reset the cache; retry once from a fresh document.
+                txt = await _last_assistant_text_cached(
+                    page, uc, cache, message_selector=str(message_selector), content_selector=str(content_selector)
+                )
+
+            if baseline_text is not None and txt == baseline_text:
+                txt = None
+
+            if txt and txt != last:
+                # Dead man's switch: detect interruption keywords anywhere in the assistant output.
+                # Text that has not changed since the last poll was already scanned.
+                if deadman.triggered_by(txt):
+                    raise RuntimeError("Automation interrupted: potential verification/challenge detected.")
+                last = txt
+                stable_deadline = loop.time() + float(stable_s)
+
+            if txt and stable_deadline is not None and loop.time() >= stable_deadline:
+                return str(txt)
+
+            if on_poll is not None:
+                try:
+                    on_poll()
+                except Exception:
+                    pass
+
+            # poll_s stays the minimum spacing between reads, so a streaming reply (one event per
+            # token) is not re-read any more often than with plain polling.
+            await asyncio.sleep(float(poll_s))
+            if event_driven:
+                if txt:
+                    await watcher.watch(cache.reply_node)
+                wake = loop.time() + _EVENT_RECHECK_S
+                if txt and stable_deadline is not None:
+                    wake = min(wake, stable_deadline)
+                await watcher.wait(min(wake, deadline) - loop.time())
+    finally:
+        watcher.stop()
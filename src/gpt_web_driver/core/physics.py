@@ -3,11 +3,18 @@ from __future__ import annotations
 import asyncio
 import math
 import random
+import string
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 from ..os_input import MouseProfile, OsInput
 
+try:
+    import numpy as _np  # type: ignore
+except ImportError:  # pragma: no cover - depends on the local environment
+    _np = None
+
 
 def _min_jerk_quintic(t: float) -> float:
     """
@@ -27,6 +34,11 @@ def _min_jerk_quintic_vel(t: float) -> float:
     return (30.0 * t**2) - (60.0 * t**3) + (30.0 * t**4)
 
 
+# Upper bound on key-release tasks kept alive while typing; releases normally finish within
+# hold_s, so only a stalled loop ever reaches it.
+_MAX_PENDING_RELEASES = 256
+
+
 def _clamp(v: float, lo: float, hi: float) -> float:
     return lo if v < lo else (hi if v > hi else v)
 
@@ -58,35 +70,51 @@ class NeuromotorMouse:
         self._os = os_input
         self._rng = rng or random.Random()
         self._cfg = cfg or NeuromotorMouseConfig()
+        # numpy Generator seeded once from self._rng on first use, and 1/f filter gains keyed
+        # by sample count (move lengths repeat a lot).
+        self._np_rng: Any = None
+        self._scale_cache: dict[int, Any] = {}
 
     def _generate_pink_noise(self, samples: int) -> list[float]:
         """
-        1/f-ish noise using an FFT filter when numpy is available.
-        Falls back to a simple low-pass filtered noise when numpy is missing.
+        One channel of unit-variance 1/f-ish noise (see _pink_noise_channels).
+        """
+        return [float(x) for x in self._pink_noise_channels(samples, 1)[0]]
+
+    def _pink_noise_channels(self, samples: int, channels: int) -> Any:
+        """
+        `channels` independent rows of 1/f-ish noise, each zero-mean and unit-variance.
+
+        Uses one batched FFT filter over a (channels, samples) array when numpy is available
+        (returned as that array); falls back to a simple low-pass filtered noise per channel
+        (a list of lists) when numpy is missing.
         """
         n = max(2, int(samples))
-        try:
-            import numpy as np  # type: ignore
-
-            seed = int(self._rng.getrandbits(32))
-            np_rng = np.random.default_rng(seed)
-            white = np_rng.standard_normal(n)
-            f = np.fft.rfft(white)
-            freqs = np.fft.rfftfreq(n)
-            scale = np.ones_like(freqs)
-            # Avoid div-by-zero; suppress DC component.
-            scale[0] = 0.0
-            # 1/sqrt(f) shaping yields ~1/f power spectrum.
-            scale[1:] = 1.0 / np.sqrt(freqs[1:])
-            f = f * scale
-            pink = np.fft.irfft(f, n=n)
-            pink = pink - float(np.mean(pink))
-            std = float(np.std(pink)) or 1.0
-            pink = pink / std
-            return [float(x) for x in pink.tolist()]
-        except Exception:
-            # Fallback: leaky integrator (low-pass) over white noise.
-            alpha = 0.92
+        if _np is not None:
+            if self._np_rng is None:
+                self._np_rng = _np.random.default_rng(int(self._rng.getrandbits(64)))
+            white = self._np_rng.standard_normal((int(channels), n))
+            f = _np.fft.rfft(white, axis=1)
+            scale = self._scale_cache.get(n)
+            if scale is None:
+                freqs = _np.fft.rfftfreq(n)
+                scale = _np.ones_like(freqs)
+                # Avoid div-by-zero; suppress DC component.
+                scale[0] = 0.0
+                # 1/sqrt(f) shaping yields ~1/f power spectrum.
+                scale[1:] = 1.0 / _np.sqrt(freqs[1:])
+                self._scale_cache[n] = scale
+            pink = _np.fft.irfft(f * scale, n=n, axis=1)
+            pink -= pink.mean(axis=1, keepdims=True)
+            std = pink.std(axis=1, keepdims=True)
+            std[std == 0.0] = 1.0
+            pink /= std
+            return pink
+
+        # Fallback: leaky integrator (low-pass) over white noise.
+        alpha = 0.92
+        rows: list[list[float]] = []
+        for _ in range(int(channels)):
             out: list[float] = []
             x = 0.0
             for _ in range(n):
@@ -96,7 +124,8 @@ class NeuromotorMouse:
             out = [v - mean for v in out]
             var = sum(v * v for v in out) / max(1, len(out) - 1)
             std = math.sqrt(var) or 1.0
-            return [v / std for v in out]
+            rows.append([v / std for v in out])
+        return rows
 
     async def move_to(self, target_x: float, target_y: float, *, duration_s: float | None = None) -> None:
         """
@@ -118,28 +147,50 @@ class NeuromotorMouse:
         steps = max(2, int(math.ceil(dur * hz)))
         dt = dur / float(steps - 1)
 
-        noise_x = self._generate_pink_noise(steps)
-        noise_y = self._generate_pink_noise(steps)
+        noise_x, noise_y = self._pink_noise_channels(steps, 2)
         step_profile = MouseProfile(min_move_duration_s=0.0, max_move_duration_s=0.0)
 
-        # Normalize velocity profile peak for scaling tremor.
-        # For the quintic, peak is around t ~= 0.5; compute a conservative max.
-        vmax = max(_min_jerk_quintic_vel(i / (steps - 1)) for i in range(steps)) or 1.0
-
+        xs, ys = self._trajectory(steps, float(sx), float(sy), dx, dy, noise_x, noise_y)
         for i in range(1, steps):
-            t = float(i) / float(steps - 1)
-            s = _min_jerk_quintic(t)
-            vx = _min_jerk_quintic_vel(t) / vmax
-            vel_factor = abs(float(vx))
-
-            tremor = float(self._cfg.tremor_base_px + vel_factor * self._cfg.tremor_vel_gain_px)
-            x = float(sx + dx * s + tremor * noise_x[i])
-            y = float(sy + dy * s + tremor * noise_y[i])
-
             # Use duration=0 for stepwise control (pyautogui will still synthesize OS events).
-            self._os.move_to(x, y, profile=step_profile)
+            self._os.move_to(xs[i], ys[i], profile=step_profile)
             await asyncio.sleep(dt)
 
+    def _trajectory(
+        self, steps: int, sx: float, sy: float, dx: float, dy: float, noise_x: Any, noise_y: Any
+    ) -> tuple[list[float], list[float]]:
+        """
+        Screen points for every sample of a move: minimum-jerk path plus velocity-scaled tremor.
+
+        Computed for all samples at once with numpy when the noise came from numpy; the pure
+        Python path is the numpy-free fallback.
+        """
+        cfg = self._cfg
+        if not isinstance(noise_x, list):
+            t = _np.linspace(0.0, 1.0, steps)
+            t2 = t * t
+            t3 = t2 * t
+            s = t3 * (10.0 + t * (-15.0 + 6.0 * t))
+            v = t2 * (30.0 + t * (-60.0 + 30.0 * t))
+            # Normalize velocity profile peak for scaling tremor.
+            vmax = float(v.max()) or 1.0
+            tremor = cfg.tremor_base_px + _np.abs(v / vmax) * cfg.tremor_vel_gain_px
+            xs = sx + dx * s + tremor * noise_x
+            ys = sy + dy * s + tremor * noise_y
+            return xs.tolist(), ys.tolist()
+
+        ts = [i / (steps - 1) for i in range(steps)]
+        vel = [_min_jerk_quintic_vel(t) for t in ts]
+        vmax = max(vel) or 1.0
+        xs_l: list[float] = []
+        ys_l: list[float] = []
+        for t, v, nx, ny in zip(ts, vel, noise_x, noise_y):
+            s = _min_jerk_quintic(t)
+            tremor = cfg.tremor_base_px + abs(v / vmax) * cfg.tremor_vel_gain_px
+            xs_l.append(sx + dx * s + tremor * nx)
+            ys_l.append(sy + dy * s + tremor * ny)
+        return xs_l, ys_l
+
 
 @dataclass(frozen=True)
 class CognitiveTyperConfig:
@@ -217,6 +268,7 @@ class CognitiveTyper:
         self._rng = rng or random.Random()
         self._cfg = cfg or CognitiveTyperConfig()
         self._key_xy = self._build_key_xy()
+        self._char_table = {ch: self._char_entry(ch) for ch in string.printable}
 
     @classmethod
     def _build_key_xy(cls) -> dict[str, tuple[float, float]]:
@@ -256,8 +308,17 @@ class CognitiveTyper:
         # Fall back to write_char for anything we can't reliably keyDown/keyUp.
         return ([], ch)
 
+    def _char_entry(self, ch: str) -> tuple[tuple[str, ...], str, tuple[float, float] | None, bool]:
+        """
+        (modifiers, key, key position, needs write_char) for one character.
+        """
+        mods, key = self._char_to_key(ch)
+        xy = self._key_xy.get(key)
+        # Unknown/surprising characters go through pyautogui's write path instead of keyDown/keyUp.
+        return (tuple(mods), key, xy, xy is None and key not in {"space", "enter"})
+
     async def type_text(self, text: str) -> None:
-        pending: list[asyncio.Task[None]] = []
+        pending: deque[asyncio.Task[None]] = deque()
 
         async def _release_after(delay_s: float, keys: list[str]) -> None:
             try:
@@ -269,22 +330,28 @@ class CognitiveTyper:
                     except Exception:
                         pass
 
-        prev_key: str | None = None
+        table = self._char_table
+        cfg = self._cfg
+        sigma = float(cfg.lognormal_sigma)
+        jitter_scale = float(cfg.lognormal_scale_s)
+        lognormvariate = self._rng.lognormvariate
+        prev_xy: tuple[float, float] | None = None
         for ch in str(text):
-            mods, key = self._char_to_key(ch)
+            entry = table.get(ch)
+            if entry is None:
+                entry = self._char_entry(ch)
+            mods, key, xy, use_write = entry
 
-            dist = self._distance(prev_key, key)
-            jitter = float(self._rng.lognormvariate(0.0, float(self._cfg.lognormal_sigma))) * float(
-                self._cfg.lognormal_scale_s
-            )
-            delay = float(self._cfg.base_delay_s + dist * self._cfg.dist_coeff_s + jitter)
+            dist = 0.0 if prev_xy is None or xy is None else math.hypot(xy[0] - prev_xy[0], xy[1] - prev_xy[1])
+            jitter = lognormvariate(0.0, sigma) * jitter_scale
+            delay = float(cfg.base_delay_s + dist * cfg.dist_coeff_s + jitter)
 
             # Press modifiers first.
             for m in mods:
                 self._os.key_down(m)
 
             # For unknown/surprising characters, fall back to pyautogui's write path.
-            if (key not in self._key_xy) and key not in {"space", "enter"}:
+            if use_write:
                 self._os.write_char(ch)
             else:
                 self._os.key_down(key)
@@ -295,7 +362,14 @@ class CognitiveTyper:
                 pending.append(asyncio.create_task(_release_after(self._cfg.hold_s, list(mods))))
 
             await asyncio.sleep(delay)
-            prev_key = key
+            prev_xy = xy
+
+            # Releases finish roughly in scheduling order; drop the finished ones so long texts
+            # do not accumulate a task per character, and wait if too many are outstanding.
+            while pending and pending[0].done():
+                pending.popleft()
+            if len(pending) > _MAX_PENDING_RELEASES:
+                await asyncio.gather(pending.popleft(), return_exceptions=True)
 
         if pending:
             await asyncio.gather(*pending, return_exceptions=True)
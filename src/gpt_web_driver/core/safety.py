@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import re
 import subprocess
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Iterable, Optional
 
 
@@ -34,14 +35,20 @@ class DeadManSwitch:
     """
 
     keywords: tuple[str, ...] = ("challenge", "verify", "captcha", "are you human", "unusual traffic")
+    # All keywords as one alternation, so a check is a single scan of the text in C.
+    _pattern: Optional[re.Pattern[str]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Longest first: at a given position the regex takes the first alternative that matches.
+        words = sorted({ks for k in self.keywords if (ks := str(k).lower())}, key=len, reverse=True)
+        if words:
+            object.__setattr__(self, "_pattern", re.compile("|".join(map(re.escape, words))))
 
     def triggered_by(self, text: str) -> Optional[str]:
-        blob = str(text or "").lower()
-        for k in self.keywords:
-            ks = str(k).lower()
-            if ks and ks in blob:
-                return ks
-        return None
+        if self._pattern is None:
+            return None
+        m = self._pattern.search(str(text or "").lower())
+        return m.group(0) if m else None
 
 
 def maybe_move_active_window_to_virtual_desktop(desktop_index: int) -> None:
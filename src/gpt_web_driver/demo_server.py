@@ -20,6 +20,7 @@ class DemoServer:
     _thread: threading.Thread
 
     def close(self) -> None:
+        # Safe to call more than once: shutdown() returns immediately once serve_forever exited.
         self._server.shutdown()
         self._server.server_close()
         self._thread.join(timeout=2)
@@ -31,6 +32,41 @@ def serve_directory(directory: Path, *, host: str = "127.0.0.1", port: int = 0)
     def handler(*args, **kwargs):
         return _QuietHandler(*args, directory=str(directory), **kwargs)
 
+    return _start(handler, host=host, port=port)
+
+
+def serve_html(body: str, name: str, *, host: str = "127.0.0.1", port: int = 0) -> DemoServer:
+    """
+    Serve a single in-memory HTML document at `/<name>` (no files are written).
+    """
+    payload = body.encode("utf-8")
+    route = "/" + name.lstrip("/")
+
+    class _MemoryHandler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            return
+
+        def _send_headers(self) -> bool:
+            if self.path.split("?", 1)[0].split("#", 1)[0] != route:
+                self.send_error(404)
+                return False
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            return True
+
+        def do_HEAD(self) -> None:
+            self._send_headers()
+
+        def do_GET(self) -> None:
+            if self._send_headers():
+                self.wfile.write(payload)
+
+    return _start(_MemoryHandler, host=host, port=port)
+
+
+def _start(handler, *, host: str, port: int) -> DemoServer:
     class _TCPServer(socketserver.TCPServer):
         allow_reuse_address = True
 
@@ -40,4 +76,3 @@ def serve_directory(directory: Path, *, host: str = "127.0.0.1", port: int = 0)
 
     actual_port = httpd.server_address[1]
     return DemoServer(base_url=f"http://{host}:{actual_port}", _server=httpd, _thread=t)
-
@@ -2,13 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import json
+import mmap
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from .runner import FlowRunner, RunConfig
 
+try:
+    import orjson as _orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - depends on the local environment
+    _orjson = None
+
 
 class FlowSpecError(ValueError):
     pass
@@ -45,15 +51,84 @@ def render_obj(obj: Any, vars: dict[str, Any]) -> Any:
     return obj
 
 
+def compile_template(s: str) -> Callable[[dict[str, Any]], str]:
+    """
+    Prepare `{{var}}` templating for `s` once; the returned function renders it like
+    render_template without re-scanning the string.
+    """
+    s = str(s)
+    # split() with one group alternates literal text and variable names.
+    parts = _TEMPLATE_RE.split(s)
+    if len(parts) == 1:
+        return lambda _vars: s
+    literals = parts[0::2]
+    names = parts[1::2]
+
+    def _render(vars: dict[str, Any]) -> str:
+        out = [literals[0]]
+        for name, lit in zip(names, literals[1:]):
+            if name not in vars:
+                raise FlowSpecError(f"unknown variable in template: {name!r}")
+            v = vars[name]
+            out.append("" if v is None else str(v))
+            out.append(lit)
+        return "".join(out)
+
+    return _render
+
+
+def compile_obj(obj: Any) -> Callable[[dict[str, Any]], Any]:
+    """
+    Prepare render_obj for a JSON-ish object once. Strings without templates and scalars are
+    returned as-is when rendered; lists and dicts are rebuilt on every render.
+    """
+    if isinstance(obj, str):
+        if "{{" not in obj:
+            return lambda _vars: obj
+        return compile_template(obj)
+    if isinstance(obj, list):
+        items = [compile_obj(v) for v in obj]
+        return lambda vars: [f(vars) for f in items]
+    if isinstance(obj, dict):
+        fields = [(str(k), compile_obj(v)) for k, v in obj.items()]
+        return lambda vars: {k: f(vars) for k, f in fields}
+    return lambda _vars: obj
+
+
+def template_names(obj: Any) -> frozenset[str]:
+    """
+    Names of every `{{var}}` referenced by strings inside a JSON-ish object.
+    """
+    if isinstance(obj, str):
+        return frozenset(_TEMPLATE_RE.findall(obj)) if "{{" in obj else frozenset()
+    if isinstance(obj, list):
+        return frozenset().union(*(template_names(v) for v in obj))
+    if isinstance(obj, dict):
+        return frozenset().union(*(template_names(v) for v in obj.values()))
+    return frozenset()
+
+
+def _read_json(path: Path) -> Any:
+    if _orjson is None:
+        return json.loads(path.read_text(encoding="utf-8"))
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped; let the parser report them.
+            return _orjson.loads(f.read())
+        # orjson parses straight from the mapped pages: no str decode, no heap copy of the file.
+        with mm, memoryview(mm) as view:
+            return _orjson.loads(view)
+
+
 def load_flow(path: Path) -> dict[str, Any]:
     try:
-        raw = path.read_text(encoding="utf-8")
+        obj = _read_json(path)
     except FileNotFoundError as e:
         raise FlowSpecError(f"flow file not found: {path}") from e
-
-    try:
-        obj = json.loads(raw)
     except json.JSONDecodeError as e:
+        # orjson.JSONDecodeError subclasses this too.
         raise FlowSpecError(f"invalid JSON in flow file: {path}: {e}") from e
 
     if not isinstance(obj, dict):
@@ -67,6 +142,166 @@ class FlowResult:
     vars: dict[str, Any]
 
 
+# Step field validation. Values are checked after templates are rendered, so every run of a
+# step is validated against what will actually be used.
+
+
+def _required_str(step: dict[str, Any], idx: int, action: str, key: str) -> str:
+    v = step.get(key)
+    if not isinstance(v, str) or not v:
+        raise FlowSpecError(f"step {idx} {action} requires {key!r}")
+    return v
+
+
+def _optional_str(step: dict[str, Any], idx: int, action: str, key: str, default: Any = None) -> Any:
+    v = step.get(key, default)
+    if v is not None and (not isinstance(v, str) or not v):
+        raise FlowSpecError(f"step {idx} {action} {key!r} must be a non-empty string")
+    return v
+
+
+def _optional_number(step: dict[str, Any], idx: int, action: str, key: str) -> Optional[float]:
+    v = step.get(key)
+    if v is None:
+        return None
+    if not isinstance(v, (int, float)):
+        raise FlowSpecError(f"step {idx} {action} {key!r} must be a number")
+    return float(v)
+
+
+def _bool(step: dict[str, Any], idx: int, action: str, key: str, default: bool) -> bool:
+    v = step.get(key, default)
+    if not isinstance(v, bool):
+        raise FlowSpecError(f"step {idx} {action} {key!r} must be a boolean")
+    return v
+
+
+# Step handlers: (runner, rendered step, ctx, step index). Handlers validate their own fields.
+_StepHandler = Callable[[FlowRunner, dict[str, Any], dict[str, Any], int], Awaitable[None]]
+
+
+async def _step_navigate(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    url = _required_str(step, idx, "navigate", "url")
+    await runner.navigate(url)
+
+
+async def _step_click(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    selector = _required_str(step, idx, "click", "selector")
+    within = _optional_str(step, idx, "click", "within")
+    await runner.click(selector, within_selector=within)
+
+
+async def _step_type(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    selector = _required_str(step, idx, "type", "selector")
+    text = step.get("text")
+    if text is not None and not isinstance(text, str):
+        raise FlowSpecError(f"step {idx} type 'text' must be a string or null")
+    within = _optional_str(step, idx, "type", "within")
+    click_first = _bool(step, idx, "type", "click_first", True)
+    press_enter = _bool(step, idx, "type", "press_enter", False)
+    post_click_delay_s = _optional_number(step, idx, "type", "post_click_delay_s")
+    await runner.type(
+        selector,
+        (text or ""),
+        within_selector=within,
+        click_first=click_first,
+        press_enter=press_enter,
+        post_click_delay_s=post_click_delay_s,
+    )
+
+
+async def _step_press(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    key = _required_str(step, idx, "press", "key")
+    await runner.press(key)
+
+
+async def _step_sleep(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    seconds = step.get("seconds")
+    if not isinstance(seconds, (int, float)):
+        raise FlowSpecError(f"step {idx} sleep requires 'seconds' (number)")
+    await asyncio.sleep(float(seconds))
+
+
+async def _step_wait_for_selector(
+    runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int
+) -> None:
+    selector = _required_str(step, idx, "wait_for_selector", "selector")
+    within = _optional_str(step, idx, "wait_for_selector", "within")
+    timeout_s = _optional_number(step, idx, "wait_for_selector", "timeout_s")
+    await runner.wait_for_selector(selector, within_selector=within, timeout_s=timeout_s)
+
+
+async def _step_wait_for_text(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    selector = _required_str(step, idx, "wait_for_text", "selector")
+    contains = _required_str(step, idx, "wait_for_text", "contains")
+    within = _optional_str(step, idx, "wait_for_text", "within")
+    timeout_s = _optional_number(step, idx, "wait_for_text", "timeout_s")
+    poll_s = _optional_number(step, idx, "wait_for_text", "poll_s")
+    text = await runner.wait_for_text(
+        selector,
+        contains=contains,
+        within_selector=within,
+        timeout_s=timeout_s,
+        poll_s=poll_s,
+    )
+    into = _optional_str(step, idx, "wait_for_text", "into")
+    if into is not None:
+        ctx[into] = text
+
+
+async def _step_extract_text(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    selector = _required_str(step, idx, "extract_text", "selector")
+    within = _optional_str(step, idx, "extract_text", "within")
+    timeout_s = _optional_number(step, idx, "extract_text", "timeout_s")
+    into = step.get("into", "result")
+    if not isinstance(into, str) or not into:
+        raise FlowSpecError(f"step {idx} extract_text 'into' must be a non-empty string")
+    ctx[into] = await runner.extract_text(selector, within_selector=within, timeout_s=timeout_s)
+
+
+async def _step_set(runner: FlowRunner, step: dict[str, Any], ctx: dict[str, Any], idx: int) -> None:
+    ctx[_required_str(step, idx, "set", "name")] = step.get("value")
+
+
+_STEP_HANDLERS: dict[str, _StepHandler] = {
+    "navigate": _step_navigate,
+    "click": _step_click,
+    "type": _step_type,
+    "press": _step_press,
+    "sleep": _step_sleep,
+    "wait_for_selector": _step_wait_for_selector,
+    "wait_for_text": _step_wait_for_text,
+    "extract_text": _step_extract_text,
+    "set": _step_set,
+}
+
+# Actions that only poll the DOM (retrying through transient CDP errors) and at most record
+# their result under `into`. Consecutive runs of these may be awaited concurrently when the
+# later steps opt in with `"parallel": true` (or the flow sets it as the default): a step's
+# `timeout_s` then starts with the window rather than when the previous step finishes, which
+# breaks waits that are ordered preconditions of one another.
+# extract_text is left out: its final read is not retried, so a DOM.getDocument issued by a
+# concurrent step (which invalidates node ids) could fail it spuriously.
+_READ_ONLY_ACTIONS = frozenset({"wait_for_selector", "wait_for_text"})
+
+
+def _render_step(
+    render_step: Optional[Callable[[dict[str, Any]], Any]], idx: int, ctx: dict[str, Any]
+) -> tuple[dict[str, Any], str]:
+    if render_step is None:
+        raise FlowSpecError(f"step {idx} must be an object")
+    step = render_step(ctx)
+    action = step.get("action")
+    if not isinstance(action, str) or not action.strip():
+        raise FlowSpecError(f"step {idx} missing 'action'")
+    return step, action.strip()
+
+
+def _step_writes(step: dict[str, Any]) -> frozenset[str]:
+    into = step.get("into")
+    return frozenset((into,)) if isinstance(into, str) and into else frozenset()
+
+
 async def run_flow(
     config: RunConfig,
     flow_spec: dict[str, Any],
@@ -90,157 +325,68 @@ async def run_flow(
     if not isinstance(steps, list):
         raise FlowSpecError("'steps' must be a list")
 
-    async with FlowRunner(config, emit=emit, include_text_in_events=include_text_in_events) as runner:
-        for idx, raw_step in enumerate(steps):
-            if not isinstance(raw_step, dict):
-                raise FlowSpecError(f"step {idx} must be an object")
-
-            step = render_obj(raw_step, ctx)
-            action = step.get("action")
-            if not isinstance(action, str) or not action.strip():
-                raise FlowSpecError(f"step {idx} missing 'action'")
-            action = action.strip()
-
-            if emit is not None:
-                emit({"event": "flow.step.start", "i": int(idx), "action": str(action)})
-
-            if action == "navigate":
-                url = step.get("url")
-                if not isinstance(url, str) or not url:
-                    raise FlowSpecError(f"step {idx} navigate requires 'url'")
-                await runner.navigate(url)
-
-            elif action == "click":
-                selector = step.get("selector")
-                if not isinstance(selector, str) or not selector:
-                    raise FlowSpecError(f"step {idx} click requires 'selector'")
-                within = step.get("within")
-                if within is not None and (not isinstance(within, str) or not within):
-                    raise FlowSpecError(f"step {idx} click 'within' must be a non-empty string")
-                await runner.click(selector, within_selector=within)
-
-            elif action == "type":
-                selector = step.get("selector")
-                text = step.get("text")
-                if not isinstance(selector, str) or not selector:
-                    raise FlowSpecError(f"step {idx} type requires 'selector'")
-                if text is not None and not isinstance(text, str):
-                    raise FlowSpecError(f"step {idx} type 'text' must be a string or null")
-
-                within = step.get("within")
-                if within is not None and (not isinstance(within, str) or not within):
-                    raise FlowSpecError(f"step {idx} type 'within' must be a non-empty string")
-
-                click_first = step.get("click_first", True)
-                press_enter = step.get("press_enter", False)
-                post_click_delay_s = step.get("post_click_delay_s", None)
-                if not isinstance(click_first, bool):
-                    raise FlowSpecError(f"step {idx} type 'click_first' must be a boolean")
-                if not isinstance(press_enter, bool):
-                    raise FlowSpecError(f"step {idx} type 'press_enter' must be a boolean")
-                if post_click_delay_s is not None and not isinstance(post_click_delay_s, (int, float)):
-                    raise FlowSpecError(f"step {idx} type 'post_click_delay_s' must be a number")
-
-                await runner.type(
-                    selector,
-                    (text or ""),
-                    within_selector=within,
-                    click_first=bool(click_first),
-                    press_enter=bool(press_enter),
-                    post_click_delay_s=(float(post_click_delay_s) if post_click_delay_s is not None else None),
-                )
-
-            elif action == "press":
-                key = step.get("key")
-                if not isinstance(key, str) or not key:
-                    raise FlowSpecError(f"step {idx} press requires 'key'")
-                await runner.press(key)
-
-            elif action == "sleep":
-                seconds = step.get("seconds")
-                if not isinstance(seconds, (int, float)):
-                    raise FlowSpecError(f"step {idx} sleep requires 'seconds' (number)")
-                await asyncio.sleep(float(seconds))
-
-            elif action == "wait_for_selector":
-                selector = step.get("selector")
-                if not isinstance(selector, str) or not selector:
-                    raise FlowSpecError(f"step {idx} wait_for_selector requires 'selector'")
-                within = step.get("within")
-                if within is not None and (not isinstance(within, str) or not within):
-                    raise FlowSpecError(f"step {idx} wait_for_selector 'within' must be a non-empty string")
-                timeout_s = step.get("timeout_s")
-                if timeout_s is not None and not isinstance(timeout_s, (int, float)):
-                    raise FlowSpecError(f"step {idx} wait_for_selector 'timeout_s' must be a number")
-                await runner.wait_for_selector(
-                    selector,
-                    within_selector=within,
-                    timeout_s=(float(timeout_s) if timeout_s is not None else None),
-                )
-
-            elif action == "wait_for_text":
-                selector = step.get("selector")
-                contains = step.get("contains")
-                if not isinstance(selector, str) or not selector:
-                    raise FlowSpecError(f"step {idx} wait_for_text requires 'selector'")
-                if not isinstance(contains, str) or not contains:
-                    raise FlowSpecError(f"step {idx} wait_for_text requires 'contains'")
-                within = step.get("within")
-                if within is not None and (not isinstance(within, str) or not within):
-                    raise FlowSpecError(f"step {idx} wait_for_text 'within' must be a non-empty string")
-                timeout_s = step.get("timeout_s")
-                poll_s = step.get("poll_s", None)
-                if timeout_s is not None and not isinstance(timeout_s, (int, float)):
-                    raise FlowSpecError(f"step {idx} wait_for_text 'timeout_s' must be a number")
-                if poll_s is not None and not isinstance(poll_s, (int, float)):
-                    raise FlowSpecError(f"step {idx} wait_for_text 'poll_s' must be a number")
-
-                text = await runner.wait_for_text(
-                    selector,
-                    contains=str(contains),
-                    within_selector=within,
-                    timeout_s=(float(timeout_s) if timeout_s is not None else None),
-                    poll_s=(float(poll_s) if poll_s is not None else None),
-                )
-                into = step.get("into")
-                if into is not None:
-                    if not isinstance(into, str) or not into:
-                        raise FlowSpecError(f"step {idx} wait_for_text 'into' must be a non-empty string")
-                    ctx[str(into)] = text
-
-            elif action == "extract_text":
-                selector = step.get("selector")
-                if not isinstance(selector, str) or not selector:
-                    raise FlowSpecError(f"step {idx} extract_text requires 'selector'")
-                within = step.get("within")
-                if within is not None and (not isinstance(within, str) or not within):
-                    raise FlowSpecError(f"step {idx} extract_text 'within' must be a non-empty string")
-                timeout_s = step.get("timeout_s")
-                if timeout_s is not None and not isinstance(timeout_s, (int, float)):
-                    raise FlowSpecError(f"step {idx} extract_text 'timeout_s' must be a number")
-
-                into = step.get("into", "result")
-                if not isinstance(into, str) or not into:
-                    raise FlowSpecError(f"step {idx} extract_text 'into' must be a non-empty string")
-
-                text = await runner.extract_text(
-                    selector,
-                    within_selector=within,
-                    timeout_s=(float(timeout_s) if timeout_s is not None else None),
-                )
-                ctx[str(into)] = text
-
-            elif action == "set":
-                name = step.get("name")
-                if not isinstance(name, str) or not name:
-                    raise FlowSpecError(f"step {idx} set requires 'name'")
-                ctx[str(name)] = step.get("value")
+    parallel = flow_spec.get("parallel", False)
+    if not isinstance(parallel, bool):
+        raise FlowSpecError("'parallel' must be a boolean if provided")
 
-            else:
-                raise FlowSpecError(f"step {idx} has unknown action: {action!r}")
+    # Parse every step's templates once up front; rendering a step is then just lookups.
+    compiled_steps = [compile_obj(raw_step) if isinstance(raw_step, dict) else None for raw_step in steps]
+    step_names = [template_names(raw_step) if isinstance(raw_step, dict) else frozenset() for raw_step in steps]
+
+    async def _run_step(runner: FlowRunner, idx: int, step: dict[str, Any], action: str) -> None:
+        if emit is not None:
+            emit({"event": "flow.step.start", "i": int(idx), "action": str(action)})
 
-            if emit is not None:
-                emit({"event": "flow.step.end", "i": int(idx), "action": str(action)})
+        handler = _STEP_HANDLERS.get(action)
+        if handler is None:
+            raise FlowSpecError(f"step {idx} has unknown action: {action!r}")
+        await handler(runner, step, ctx, idx)
+
+        if emit is not None:
+            emit({"event": "flow.step.end", "i": int(idx), "action": str(action)})
+
+    async with FlowRunner(config, emit=emit, include_text_in_events=include_text_in_events) as runner:
+        idx = 0
+        while idx < len(compiled_steps):
+            step, action = _render_step(compiled_steps[idx], idx, ctx)
+            _bool(step, idx, action, "parallel", parallel)
+            window = [(idx, step, action)]
+
+            if action in _READ_ONLY_ACTIONS:
+                # Extend the window with following read-only steps that opted in to running
+                # alongside it and neither read nor overwrite a variable an earlier step in the
+                # window stores.
+                written = _step_writes(step)
+                for j in range(idx + 1, len(compiled_steps)):
+                    if step_names[j] & written:
+                        break
+                    try:
+                        nxt, nxt_action = _render_step(compiled_steps[j], j, ctx)
+                        joins = _bool(nxt, j, nxt_action, "parallel", parallel)
+                    except FlowSpecError:
+                        # Raised again, in order, once the window has run.
+                        break
+                    nxt_writes = _step_writes(nxt)
+                    if not joins or nxt_action not in _READ_ONLY_ACTIONS or (nxt_writes & written):
+                        break
+                    written |= nxt_writes
+                    window.append((j, nxt, nxt_action))
+
+            if len(window) == 1:
+                await _run_step(runner, idx, step, action)
+            else:
+                tasks: list[asyncio.Task[None]] = []
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        for i, s, a in window:
+                            tasks.append(tg.create_task(_run_step(runner, i, s, a)))
+                except ExceptionGroup as eg:
+                    # Surface the failure of the earliest step, like a serial run would.
+                    for t in tasks:
+                        if t.done() and not t.cancelled() and (exc := t.exception()) is not None:
+                            raise exc
+                    raise eg.exceptions[0]
+            idx += len(window)
 
     result_tmpl = flow_spec.get("result")
     if result_tmpl is None:
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import random
 from typing import Iterable, Sequence, Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Noise:
     x_px: int = 12
     y_px: int = 5
+    # Precomputed for apply_noise: number of offsets (2 * px + 1) and bits drawn per attempt.
+    _x_width: int = field(default=1, init=False, repr=False, compare=False)
+    _x_bits: int = field(default=0, init=False, repr=False, compare=False)
+    _y_width: int = field(default=1, init=False, repr=False, compare=False)
+    _y_bits: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        for axis in ("x", "y"):
+            px = getattr(self, f"{axis}_px")
+            if px < 0:
+                raise ValueError(f"Noise.{axis}_px must be >= 0, got {px!r}")
+            width = 2 * px + 1
+            object.__setattr__(self, f"_{axis}_width", width)
+            # Same bit count as random.randint, so seeded runs draw identical offsets.
+            object.__setattr__(self, f"_{axis}_bits", width.bit_length())
 
 
 def quad_center(quad: Sequence[float]) -> Tuple[float, float]:
@@ -17,9 +32,11 @@ def quad_center(quad: Sequence[float]) -> Tuple[float, float]:
     """
     if len(quad) < 8:
         raise ValueError("quad must have at least 8 numbers")
-    xs = quad[0::2][:4]
-    ys = quad[1::2][:4]
-    return (sum(xs) / 4.0, sum(ys) / 4.0)
+    # Straight-line sums (same left-to-right order as sum()); * 0.25 is exact.
+    return (
+        (quad[0] + quad[2] + quad[4] + quad[6]) * 0.25,
+        (quad[1] + quad[3] + quad[5] + quad[7]) * 0.25,
+    )
 
 
 def rect_center(x: float, y: float, w: float, h: float) -> Tuple[float, float]:
@@ -38,6 +55,19 @@ def viewport_to_screen(
     return (viewport_x * scale_x + offset_x, viewport_y * scale_y + offset_y)
 
 
+def viewport_to_screen_fast(
+    viewport_x: float,
+    viewport_y: float,
+    scale_x: float,
+    scale_y: float,
+    offset_x: float,
+    offset_y: float,
+    /,
+) -> Tuple[float, float]:
+    # Positional-only twin of viewport_to_screen for callers that precompute the affine once.
+    return (viewport_x * scale_x + offset_x, viewport_y * scale_y + offset_y)
+
+
 def apply_noise(
     screen_x: float,
     screen_y: float,
@@ -45,9 +75,23 @@ def apply_noise(
     noise: Noise,
     rng: random.Random | None = None,
 ) -> Tuple[float, float]:
-    r = rng or random
-    return (
-        screen_x + r.randint(-noise.x_px, noise.x_px),
-        screen_y + r.randint(-noise.y_px, noise.y_px),
-    )
+    # randint(-px, px) without its argument checks and dispatch: rejection-sample
+    # getrandbits() into [0, width) directly. Zero noise draws nothing.
+    getrandbits = (rng or random).getrandbits
+    dx = dy = 0
+    width = noise._x_width
+    if width > 1:
+        bits = noise._x_bits
+        v = getrandbits(bits)
+        while v >= width:
+            v = getrandbits(bits)
+        dx = v - noise.x_px
+    width = noise._y_width
+    if width > 1:
+        bits = noise._y_bits
+        v = getrandbits(bits)
+        while v >= width:
+            v = getrandbits(bits)
+        dy = v - noise.y_px
+    return (screen_x + dx, screen_y + dy)
 
@@ -1,41 +1,56 @@
 from __future__ import annotations
 
 import asyncio
+import math
 import random
-import shutil
-from dataclasses import dataclass, replace as _dc_replace
+from dataclasses import dataclass, field
+from dataclasses import replace as _dc_replace
 from pathlib import Path
-from typing import Any, Callable, Optional
-
-from platformdirs import user_cache_dir
-
-from .actions.input import HybridInput, HybridInputConfig
-from .core.driver import optimize_connection
-from .core.observer import last_assistant_message_text, wait_for_assistant_reply
-from .core.physics import NeuromotorMouse, NeuromotorMouseConfig
-from .core.safety import DeadManSwitch, beep, maybe_move_active_window_to_virtual_desktop
-from .geometry import apply_noise, viewport_to_screen
-from .nodriver_dom import (
-    dom_get_outer_html,
-    dom_query_selector_node_id,
-    html_to_text,
-    maybe_bring_to_front,
-    selector_viewport_gaussian_point,
-    wait_for_selector,
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .core.safety import (
+    DeadManSwitch,
+    beep,
+    maybe_move_active_window_to_virtual_desktop,
 )
-from .profile import ProfileConfig, ensure_profile
-from .runner import FlowRunner, RunConfig
+from .geometry import apply_noise, viewport_to_screen_fast
+
+if TYPE_CHECKING:
+    from .core.physics import NeuromotorMouseConfig
+    from .runner import FlowRunner, RunConfig
+
+# The runner, DOM helpers, input physics (numpy) and profile tooling are imported where a
+# session actually uses them, so config-only callers do not pay for them at import time.
+
+# Flick gaps pre-drawn per chat turn; later flicks in a long wait draw one at a time.
+_FLICK_BATCH = 32
+
+
+def _flick_steps(mag: int = -520, delay_s: float = 0.02, n: int = 7) -> tuple[tuple[int, float], ...]:
+    # Decaying scroll burst: magnitude x0.55 (truncated each step), delay x1.35.
+    steps = []
+    for _ in range(n):
+        steps.append((mag, delay_s))
+        mag = int(mag * 0.55)
+        delay_s = delay_s * 1.35
+    return tuple(steps)
+
+
+# (scroll clicks, pause after) for one inertial flick; fixed, so computed once.
+_FLICK_STEPS = _flick_steps()
 
 
 def default_shadow_profile_dir() -> Path:
     """
     Default shadow profile directory (persistent across runs).
     """
+    from platformdirs import user_cache_dir
+
     # Spec suggests "~/.nibs-profile"; use the cache dir to avoid cluttering $HOME.
     return Path(user_cache_dir("gpt-web-driver")) / "nibs-profile"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChatUIConfig:
     url: str
     input_selector: str = "#prompt-textarea"
@@ -49,14 +64,46 @@ class ChatUIConfig:
     deadman: DeadManSwitch = DeadManSwitch()
 
 
-@dataclass(frozen=True)
+def _default_mouse_config() -> NeuromotorMouseConfig:
+    from .core.physics import NeuromotorMouseConfig
+
+    return NeuromotorMouseConfig()
+
+
+@dataclass(frozen=True, slots=True)
 class NibsConfig:
     run: RunConfig
     ui: ChatUIConfig
     # Hybrid input gate.
     paste_threshold_chars: int = 300
     # Neuromotor mouse.
-    mouse: NeuromotorMouseConfig = NeuromotorMouseConfig()
+    mouse: NeuromotorMouseConfig = field(default_factory=_default_mouse_config)
+
+
+@dataclass(frozen=True, slots=True)
+class _MouseTurn:
+    """
+    Mouse randomness for one chat turn (see NibsSession._draw_mouse_params).
+    """
+
+    hover: bool
+    hover_t: float
+    hover_bend: float
+    hover_duration_s: float
+    hover_pause_s: float
+    first_flick_s: float
+    flick_gaps_s: tuple[float, ...]
+
+
+def _hover_waypoint(mx: float, my: float, fx: float, fy: float, t: float, bend: float) -> tuple[float, float]:
+    """
+    Point a fraction `t` along the straight path from (mx, my) to (fx, fy), pushed `bend` px
+    off it along the unit perpendicular, for a gently curved approach.
+    """
+    dx = fx - mx
+    dy = fy - my
+    inv = 1.0 / (math.hypot(dx, dy) or 1.0)
+    return (mx + dx * t - dy * inv * bend, my + dy * t + dx * inv * bend)
 
 
 class NibsSession:
@@ -64,6 +111,18 @@ class NibsSession:
     A long-lived headed browser session intended for the OpenAI-compatible API server.
     """
 
+    __slots__ = (
+        "_affine",
+        "_cfg",
+        "_emit",
+        "_lock",
+        "_mouse_np",
+        "_mouse_rng",
+        "_paused_reason",
+        "_runner",
+        "_typing_rng",
+    )
+
     def __init__(
         self,
         cfg: NibsConfig,
@@ -73,6 +132,8 @@ class NibsSession:
         self._cfg = cfg
         self._emit = emit
         self._runner: FlowRunner | None = None
+        # (scale_x, scale_y, offset_x, offset_y) of the running config; set by start().
+        self._affine: tuple[float, float, float, float] = (1.0, 1.0, 0.0, 0.0)
         seed = cfg.run.seed
         if seed is None:
             # Default: non-deterministic "natural" variability.
@@ -82,6 +143,14 @@ class NibsSession:
             # Deterministic when explicitly seeded.
             self._mouse_rng = random.Random(int(seed))
             self._typing_rng = random.Random(int(seed) ^ 0x1234ABCD)
+        # Per-turn scalars come from one batched numpy draw when numpy is available; the
+        # random.Random above still feeds the APIs that take one (mouse, noise, targeting).
+        try:
+            import numpy as np  # type: ignore
+        except ImportError:
+            self._mouse_np: Any = None
+        else:
+            self._mouse_np = np.random.default_rng(None if seed is None else int(seed))
         self._lock = asyncio.Lock()
         self._paused_reason: str | None = None
 
@@ -96,6 +165,13 @@ class NibsSession:
         if self._runner is not None:
             return
 
+        import shutil
+
+        from .core.driver import optimize_connection
+        from .nodriver_dom import maybe_bring_to_front
+        from .profile import ProfileConfig, ensure_profile
+        from .runner import FlowRunner
+
         run_cfg = self._cfg.run
 
         # Ensure we always have a profile dir for session continuity.
@@ -117,6 +193,7 @@ class NibsSession:
         r = FlowRunner(run_cfg, emit=self._emit)
         await r.start()
         self._runner = r
+        self._affine = (run_cfg.scale_x, run_cfg.scale_y, run_cfg.offset_x, run_cfg.offset_y)
 
         # Navigate once; keep session/tab alive.
         await r.navigate(self._cfg.ui.url)
@@ -133,6 +210,27 @@ class NibsSession:
         await self._runner.close()
         self._runner = None
 
+    def _draw_mouse_params(self) -> _MouseTurn:
+        """
+        Draw every per-turn mouse scalar at once: one Generator call with numpy, otherwise
+        the same affine rescales of random.Random.random() that uniform() uses.
+        """
+        n = 6 + _FLICK_BATCH
+        if self._mouse_np is not None:
+            u = self._mouse_np.random(n).tolist()
+        else:
+            rnd = self._mouse_rng.random
+            u = [rnd() for _ in range(n)]
+        return _MouseTurn(
+            hover=u[0] < 0.30,
+            hover_t=0.25 + 0.40 * u[1],
+            hover_bend=-60.0 + 120.0 * u[2],
+            hover_duration_s=0.18 + 0.17 * u[3],
+            hover_pause_s=0.03 + 0.09 * u[4],
+            first_flick_s=0.2 + 0.4 * u[5],
+            flick_gaps_s=tuple(1.2 + 1.2 * v for v in u[6:]),
+        )
+
     async def _deadman_check(self) -> None:
         if self._paused_reason is not None:
             raise RuntimeError(f"paused: {self._paused_reason}")
@@ -145,11 +243,18 @@ class NibsSession:
             return ""
         page = self._runner.page
         try:
+            from .nodriver_dom import (
+                dom_get_outer_html,
+                dom_query_selector_node_id,
+                html_to_text,
+            )
+
             nid = await dom_query_selector_node_id(page, "body")
             if not nid:
                 return ""
             html = await dom_get_outer_html(page, int(nid))
-            return html_to_text(html)
+            # A whole-page parse can take a while on long transcripts; keep the loop responsive.
+            return await asyncio.to_thread(html_to_text, html)
         except Exception:
             return ""
 
@@ -157,6 +262,15 @@ class NibsSession:
         """
         Send a prompt and return the assistant reply text.
         """
+        from .actions.input import HybridInput, HybridInputConfig
+        from .core.observer import last_assistant_message_text, wait_for_assistant_reply
+        from .core.physics import NeuromotorMouse
+        from .nodriver_dom import (
+            maybe_bring_to_front,
+            selector_viewport_gaussian_point,
+            wait_for_selector,
+        )
+
         async with self._lock:
             await self._deadman_check()
             if self._runner is None:
@@ -188,14 +302,7 @@ class NibsSession:
             )
 
             run_cfg = r.config
-            sx, sy = viewport_to_screen(
-                pt.x,
-                pt.y,
-                scale_x=run_cfg.scale_x,
-                scale_y=run_cfg.scale_y,
-                offset_x=run_cfg.offset_x,
-                offset_y=run_cfg.offset_y,
-            )
+            sx, sy = viewport_to_screen_fast(pt.x, pt.y, *self._affine)
             fx, fy = apply_noise(sx, sy, noise=run_cfg.noise, rng=self._mouse_rng)
 
             # OS input path.
@@ -205,29 +312,18 @@ class NibsSession:
 
             os_in = r.os_input()
             mouse = NeuromotorMouse(os_in, rng=self._mouse_rng, cfg=self._cfg.mouse)
+            turn = self._draw_mouse_params()
             # Incidental hover: take a slightly "imperfect" path that can cross other UI elements.
             try:
-                if self._mouse_rng.random() < 0.30:
+                if turn.hover:
                     mx, my = os_in.position()
-                    dx = float(fx - mx)
-                    dy = float(fy - my)
-                    # Perpendicular offset for a gentle curve.
-                    px, py = -dy, dx
-                    plen = (px * px + py * py) ** 0.5 or 1.0
-                    px /= plen
-                    py /= plen
-
-                    t = float(self._mouse_rng.uniform(0.25, 0.65))
-                    bend = float(self._mouse_rng.uniform(-60.0, 60.0))
-                    ix = float(mx + dx * t + px * bend)
-                    iy = float(my + dy * t + py * bend)
-
-                    await mouse.move_to(ix, iy, duration_s=float(self._mouse_rng.uniform(0.18, 0.35)))
-                    await asyncio.sleep(float(self._mouse_rng.uniform(0.03, 0.12)))
+                    ix, iy = _hover_waypoint(mx, my, fx, fy, turn.hover_t, turn.hover_bend)
+                    await mouse.move_to(ix, iy, duration_s=turn.hover_duration_s)
+                    await asyncio.sleep(turn.hover_pause_s)
             except Exception:
                 pass
             await mouse.move_to(fx, fy)
-            os_in.click()
+            await os_in.click_async()
             if run_cfg.post_click_delay_s > 0:
                 await asyncio.sleep(run_cfg.post_click_delay_s)
 
@@ -238,34 +334,30 @@ class NibsSession:
             )
             await hybrid.smart_enter(str(prompt))
             # Always press Enter for a chat completion.
-            os_in.press("enter")
+            await os_in.press_async("enter")
 
             # While waiting for the response, inertial "flick" scrolling keeps the stream visible.
+            # One background task sleeps until each flick is due instead of checking the clock
+            # on every reply poll.
             loop = asyncio.get_running_loop()
-            next_flick_at = loop.time() + self._mouse_rng.uniform(0.2, 0.6)
-            flick_task: asyncio.Task[None] | None = None
 
-            async def _flick() -> None:
-                mag = -520
-                delay_s = 0.02
-                for _ in range(7):
-                    try:
-                        os_in.scroll(int(mag))
-                    except Exception:
-                        return
-                    await asyncio.sleep(delay_s)
-                    mag = int(mag * 0.55)
-                    delay_s = float(delay_s * 1.35)
-
-            def _on_poll() -> None:
-                nonlocal next_flick_at, flick_task
-                now = loop.time()
-                if now < next_flick_at:
-                    return
-                if flick_task is not None and not flick_task.done():
-                    return
-                flick_task = asyncio.create_task(_flick())
-                next_flick_at = now + self._mouse_rng.uniform(1.2, 2.4)
+            async def _flicks() -> None:
+                flick_gaps = iter(turn.flick_gaps_s)
+                next_flick_at = loop.time() + turn.first_flick_s
+                while True:
+                    await asyncio.sleep(max(0.0, next_flick_at - loop.time()))
+                    next_flick_at = loop.time()
+                    for mag, delay_s in _FLICK_STEPS:
+                        try:
+                            os_in.scroll(mag)
+                        except Exception:
+                            return
+                        await asyncio.sleep(delay_s)
+                    # Gaps are measured start to start, as before.
+                    gap = next(flick_gaps, None)
+                    next_flick_at += gap if gap is not None else self._mouse_rng.uniform(1.2, 2.4)
+
+            flick_task = asyncio.create_task(_flicks())
 
             try:
                 reply = await wait_for_assistant_reply(
@@ -276,20 +368,20 @@ class NibsSession:
                     timeout_s=float(self._cfg.ui.timeout_s),
                     stable_s=float(self._cfg.ui.stable_s),
                     poll_s=float(self._cfg.ui.poll_s),
-                    on_poll=_on_poll,
-                    interruption_keywords=self._cfg.ui.deadman.keywords,
+                    deadman=self._cfg.ui.deadman,
                 )
             except Exception as e:
                 # Dead man's switch triggers: pause and require operator intervention.
                 k = self._cfg.ui.deadman.triggered_by(str(e)) or self._cfg.ui.deadman.triggered_by(
                     await self._page_snapshot_text()
                 )
-                if k is not None or "challenge" in str(e).lower() or "verify" in str(e).lower():
+                err = str(e).lower()
+                if k is not None or "challenge" in err or "verify" in err:
                     self._paused_reason = str(e)
                     beep()
                 raise
             finally:
-                if flick_task is not None and not flick_task.done():
+                if not flick_task.done():
                     flick_task.cancel()
                     try:
                         await flick_task
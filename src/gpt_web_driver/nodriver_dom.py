@@ -1,19 +1,54 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import importlib.util
 import inspect
 import logging
 import re
 import random
-from dataclasses import dataclass
+import sys
+import weakref
+from dataclasses import dataclass, field
+from html import unescape
 from html.parser import HTMLParser
-from typing import Any
+from typing import Any, Callable
 
 from .geometry import quad_center, rect_center
 
 _LOG = logging.getLogger(__name__)
 
 
+# Set once importing nodriver has failed, so later calls skip the finder's filesystem search.
+_NODRIVER_UNAVAILABLE = False
+
+
+def _nodriver_module() -> Any:
+    """
+    The nodriver module, or None when it cannot be imported.
+
+    Looks in sys.modules first (a dict lookup, and it sees modules injected there) before
+    falling back to a real import.
+    """
+    global _NODRIVER_UNAVAILABLE
+    uc = sys.modules.get("nodriver")
+    if uc is not None or _NODRIVER_UNAVAILABLE:
+        return uc
+    try:
+        import nodriver as uc  # type: ignore[no-redef]
+    except Exception:
+        _LOG.debug("nodriver import failed", exc_info=True)
+        _NODRIVER_UNAVAILABLE = True
+        return None
+    return uc
+
+
+def _isawaitable(obj: Any) -> bool:
+    # Duck-typed stand-in for inspect.isawaitable (coroutines, futures, tasks, custom awaitables)
+    # that skips its type and Awaitable-ABC checks; nodriver helpers may be sync or async.
+    return hasattr(obj, "__await__")
+
+
 @dataclass(frozen=True)
 class ViewportPoint:
     x: float
@@ -21,10 +56,9 @@ class ViewportPoint:
 
 
 def _quad_center_xy(quad: list[float]) -> tuple[float, float]:
-    # quad is [x1,y1,x2,y2,x3,y3,x4,y4]
-    xs = quad[0::2]
-    ys = quad[1::2]
-    return (sum(xs) / len(xs), sum(ys) / len(ys))
+    # quad is [x1,y1,x2,y2,x3,y3,x4,y4]; unpack instead of slicing into two lists.
+    x1, y1, x2, y2, x3, y3, x4, y4 = quad
+    return ((x1 + x2 + x3 + x4) * 0.25, (y1 + y2 + y3 + y4) * 0.25)
 
 
 def _get(obj: Any, *names: str) -> Any:
@@ -77,6 +111,47 @@ def _root_node_id_obj_from_doc(doc: Any) -> Any:
     return _node_id_from(root)
 
 
+# CDP command builder -> adapter taking positional args (see _cdp_caller).
+_CDP_CALLERS: dict[Any, Callable[..., Any]] = {}
+
+
+def _cdp_caller(fn: Callable[..., Any], *names: str, args_optional: bool = False) -> Callable[..., Any]:
+    """
+    Return `fn` adapted to take its arguments positionally, in `names` order.
+
+    nodriver's generated CDP helpers have differed across versions (positional vs keyword-only
+    parameters). The calling convention is resolved from the signature once per helper instead
+    of probing with TypeError on every call. With `args_optional`, helpers that accept neither
+    form are called without arguments.
+    """
+    caller = _CDP_CALLERS.get(fn)
+    if caller is not None:
+        return caller
+    caller = fn
+    try:
+        sig = inspect.signature(fn)
+    except (TypeError, ValueError):
+        sig = None
+    if sig is not None:
+        placeholders = [None] * len(names)
+        try:
+            sig.bind(*placeholders)
+        except TypeError:
+
+            def caller(*args: Any) -> Any:
+                return fn(**dict(zip(names, args)))
+
+            if args_optional:
+                try:
+                    sig.bind(**dict(zip(names, placeholders)))
+                except TypeError:
+
+                    def caller(*_args: Any) -> Any:
+                        return fn()
+    _CDP_CALLERS[fn] = caller
+    return caller
+
+
 async def _dom_get_document_nodriver(page: Any, uc: Any, *, depth: int, pierce: bool) -> Any:
     dom = getattr(getattr(uc, "cdp", None), "dom", None)
     fn = getattr(dom, "get_document", None) if dom is not None else None
@@ -84,13 +159,8 @@ async def _dom_get_document_nodriver(page: Any, uc: Any, *, depth: int, pierce:
         raise AttributeError("nodriver uc.cdp.dom.get_document is not callable")
 
     # Prefer a shallow document (depth=1) since we only need the root nodeId to query.
-    try:
-        return await page.send(fn(int(depth), bool(pierce)))
-    except TypeError:
-        try:
-            return await page.send(fn(depth=int(depth), pierce=bool(pierce)))
-        except TypeError:
-            return await page.send(fn())
+    call = _cdp_caller(fn, "depth", "pierce", args_optional=True)
+    return await page.send(call(int(depth), bool(pierce)))
 
 
 async def _dom_get_root_node_id_obj_nodriver(page: Any, uc: Any) -> Any:
@@ -117,10 +187,181 @@ async def _dom_query_selector_nodriver(page: Any, uc: Any, root_id_obj: Any, sel
     if not callable(fn):
         raise AttributeError("nodriver uc.cdp.dom.query_selector is not callable")
 
+    return await page.send(_cdp_caller(fn, "node_id", "selector")(root_id_obj, selector))
+
+
+@dataclass
+class _DomScope:
+    """
+    Document root and resolved `within` containers, reused across DOM queries on one page.
+
+    Chromium never reuses nodeIds, so stale entries (after navigation, a re-render, or another
+    DOM.getDocument caller) fail loudly instead of pointing at the wrong node; lookups then start
+    over from a fresh document.
+    """
+
+    root: Any = None
+    within: dict[str, Any] = field(default_factory=dict)
+
+    def reset(self, root: Any = None) -> None:
+        self.root = root
+        self.within.clear()
+
+
+_DOM_SCOPES: weakref.WeakKeyDictionary[Any, _DomScope] = weakref.WeakKeyDictionary()
+
+
+def _dom_scope(page: Any) -> _DomScope | None:
     try:
-        return await page.send(fn(root_id_obj, selector))
+        scope = _DOM_SCOPES.get(page)
+        if scope is None:
+            scope = _DOM_SCOPES[page] = _DomScope()
+        return scope
     except TypeError:
-        return await page.send(fn(node_id=root_id_obj, selector=selector))
+        # Unhashable or not weak-referenceable page objects simply go uncached.
+        return None
+
+
+def forget_dom_scope(page: Any) -> None:
+    """
+    Drop cached node ids for `page`; call after actions that may re-render it.
+    """
+    try:
+        _DOM_SCOPES.pop(page, None)
+    except TypeError:
+        pass
+
+
+# CDP DOM events (nodriver uc.cdp.dom class names) after which text read from the page may
+# differ. DocumentUpdated additionally invalidates every nodeId.
+_DOM_CHANGE_EVENTS = (
+    "ChildNodeInserted",
+    "ChildNodeRemoved",
+    "ChildNodeCountUpdated",
+    "CharacterDataModified",
+    "DocumentUpdated",
+)
+# A selector can also start matching when an attribute (class, id, ...) changes.
+_SELECTOR_CHANGE_EVENTS = (*_DOM_CHANGE_EVENTS, "AttributeModified")
+# While waiting on DOM events, still re-query this often: covers mutations the page never
+# reported (e.g. in subtrees the DOM agent has not pushed to us).
+_EVENT_RECHECK_S = 1.0
+
+
+class DomChangeWatcher:
+    """
+    Signals DOM mutations so waiters can sleep until something changes instead of re-reading
+    on a fixed interval.
+
+    Chromium only reports mutations under nodes it has pushed to the client; watch() requests a
+    subtree so changes inside it are reported. Only usable with pages that expose nodriver's
+    add_handler(); start() returns False otherwise.
+    """
+
+    def __init__(
+        self,
+        page: Any,
+        uc: Any,
+        *,
+        events: tuple[str, ...] = _DOM_CHANGE_EVENTS,
+        on_document_updated: Callable[[], None] | None = None,
+    ) -> None:
+        self.changed = asyncio.Event()
+        self._page = page
+        self._uc = uc
+        self._events = events
+        self._on_document_updated_cb = on_document_updated
+        self._handlers: list[tuple[Any, Callable[..., None]]] = []
+        self._watched: Any = None
+
+    def start(self) -> bool:
+        add_handler = getattr(self._page, "add_handler", None)
+        dom = getattr(getattr(self._uc, "cdp", None), "dom", None)
+        if not callable(add_handler) or dom is None:
+            return False
+        for name in self._events:
+            event_type = getattr(dom, name, None)
+            if event_type is None:
+                continue
+            handler = self._on_document_updated if name == "DocumentUpdated" else self._on_change
+            try:
+                add_handler(event_type, handler)
+            except Exception:
+                continue
+            self._handlers.append((event_type, handler))
+        return bool(self._handlers)
+
+    def stop(self) -> None:
+        remove_handler = getattr(self._page, "remove_handler", None)
+        if callable(remove_handler):
+            for event_type, handler in self._handlers:
+                try:
+                    remove_handler(event_type, handler)
+                except Exception:
+                    pass
+        self._handlers.clear()
+
+    @property
+    def watched(self) -> Any:
+        return self._watched
+
+    def _on_change(self, *_args: Any) -> None:
+        self.changed.set()
+
+    def _on_document_updated(self, *_args: Any) -> None:
+        if self._on_document_updated_cb is not None:
+            self._on_document_updated_cb()
+        self._watched = None
+        self.changed.set()
+
+    async def watch(self, node_id: Any) -> None:
+        """
+        Ask for the whole subtree of `node_id`, so edits inside it are reported.
+        """
+        if node_id is None or node_id == self._watched:
+            return
+        fn = getattr(getattr(getattr(self._uc, "cdp", None), "dom", None), "request_child_nodes", None)
+        if not callable(fn):
+            return
+        try:
+            await self._page.send(_cdp_caller(fn, "node_id", "depth")(node_id, -1))
+        except Exception:
+            # Best-effort: the periodic recheck still picks up changes.
+            return
+        self._watched = node_id
+
+    async def wait(self, timeout_s: float) -> None:
+        try:
+            await asyncio.wait_for(self.changed.wait(), max(0.0, float(timeout_s)))
+        except TimeoutError:
+            pass
+
+
+async def _dom_query_selector_scoped_nodriver(
+    page: Any, uc: Any, scope: _DomScope, selector: str, within_selector: str | None
+) -> Any:
+    if scope.root is None:
+        scope.reset(await _dom_get_root_node_id_obj_nodriver(page, uc) or None)
+    query_root = scope.root
+    if not query_root:
+        return 0
+
+    # If a scope selector is provided, resolve it once under the document root and then query
+    # within that subtree. Each step needs the node id returned by the previous one, so the
+    # round-trips cannot be overlapped; the scope cache is what keeps repeat lookups to one.
+    # Folding the scope into a descendant selector ("within selector") is not equivalent: it
+    # can match under a later container, and comma lists or combinators in `selector` change
+    # meaning.
+    if within_selector:
+        query_root = scope.within.get(within_selector)
+        if not query_root:
+            query_root = await _dom_query_selector_nodriver(page, uc, scope.root, within_selector)
+            if not query_root:
+                return 0
+            scope.within[within_selector] = query_root
+
+    q_resp = await _dom_query_selector_nodriver(page, uc, query_root, selector)
+    return q_resp if q_resp else 0
 
 
 async def _dom_query_selector_int_dict(page: Any, root_node_id: int, selector: str) -> int:
@@ -131,40 +372,22 @@ async def _dom_query_selector_int_dict(page: Any, root_node_id: int, selector: s
 
 async def _send_dict(page: Any, method: str, params: dict[str, Any] | None = None) -> Any:
     """Send a raw dict-based CDP message via ``page.send``."""
-    # Some dict-CDP shims expect a "params" key even when it's empty.
+    # Some dict-CDP shims expect a "params" key even when it's empty. Messages are built fresh
+    # on purpose: JSON-RPC layers commonly stamp an "id" into the dict they are handed, so a
+    # shared template could carry state between sends. Selector and method strings are passed
+    # by reference, never copied.
     msg: dict[str, Any] = {"method": str(method), "params": params or {}}
     return await page.send(msg)
 
 
-async def _get_box_model_and_viewport_offset(
-    page: Any, node_id: Any, selector: str
-) -> tuple[list[float], float, float]:
-    """Shared pipeline: get box-model quad and visual-viewport offset for *node_id*.
-
-    Returns ``(quad_floats, page_x, page_y)`` where *page_x*/*page_y* are the
-    visual viewport origin (for converting page coords to viewport coords).
-    """
-    uc = None
-    try:
-        import nodriver as uc  # type: ignore[assignment]
-    except Exception:
-        _LOG.debug("nodriver import failed in _get_box_model_and_viewport_offset", exc_info=True)
-        uc = None
-
-    # --- box model ---
+async def _box_model_quad(page: Any, uc: Any, node_id: Any, selector: str) -> list[float]:
     bm: Any = None
     nodriver_exc: Exception | None = None
     if uc is not None:
         fn = getattr(getattr(getattr(uc, "cdp", None), "dom", None), "get_box_model", None)
         if callable(fn):
             try:
-                bm = await page.send(fn(node_id))
-            except TypeError:
-                try:
-                    bm = await page.send(fn(node_id=node_id))
-                except Exception as e:
-                    nodriver_exc = e
-                    bm = None
+                bm = await page.send(_cdp_caller(fn, "node_id")(node_id))
             except Exception as e:
                 nodriver_exc = e
                 bm = None
@@ -177,7 +400,6 @@ async def _get_box_model_and_viewport_offset(
                 raise nodriver_exc
             raise
 
-    # --- extract quad ---
     quad: Any = None
     if isinstance(bm, dict):
         model = (bm.get("model") or {}) if isinstance(bm.get("model"), dict) else {}
@@ -192,9 +414,11 @@ async def _get_box_model_and_viewport_offset(
     if not quad:
         raise RuntimeError(f"DOM.getBoxModel returned no quad for selector: {selector}")
 
-    quad_f = [float(v) for v in quad]
+    return [float(v) for v in quad]
+
 
-    # --- layout metrics (viewport offset) ---
+async def _visual_viewport_offset(page: Any, uc: Any) -> tuple[float, float]:
+    # Best-effort: (0, 0) when layout metrics are unavailable.
     page_x = 0.0
     page_y = 0.0
     try:
@@ -227,9 +451,41 @@ async def _get_box_model_and_viewport_offset(
     except Exception:
         _LOG.debug("layout-metrics unavailable, assuming zero viewport offset", exc_info=True)
 
+    return page_x, page_y
+
+
+async def _get_box_model_and_viewport_offset(
+    page: Any, node_id: Any, selector: str
+) -> tuple[list[float], float, float]:
+    """Shared pipeline: get box-model quad and visual-viewport offset for *node_id*.
+
+    Returns ``(quad_floats, page_x, page_y)`` where *page_x*/*page_y* are the
+    visual viewport origin (for converting page coords to viewport coords).
+    The two CDP reads are independent, so both are in flight at once.
+    """
+    uc = _nodriver_module()
+
+    # Scheduled now, first sent once the box-model request is on the wire.
+    offset_task = asyncio.ensure_future(_visual_viewport_offset(page, uc))
+    try:
+        quad_f = await _box_model_quad(page, uc, node_id, selector)
+    except BaseException:
+        offset_task.cancel()
+        raise
+    page_x, page_y = await offset_task
     return quad_f, page_x, page_y
 
 
+async def _required_node_id(page: Any, selector: str, within_selector: str | None) -> Any:
+    node_id = await dom_query_selector_node_id(page, selector, within_selector=within_selector)
+    if not node_id:
+        # Formatted only on the failure path.
+        if within_selector:
+            raise RuntimeError(f"DOM.querySelector returned no nodeId for selector: {selector} within {within_selector}")
+        raise RuntimeError(f"DOM.querySelector returned no nodeId for selector: {selector}")
+    return node_id
+
+
 async def selector_viewport_center(page: Any, selector: str, *, within_selector: str | None = None) -> ViewportPoint:
     """
     DOM-only fallback for getting an element's viewport center.
@@ -240,13 +496,7 @@ async def selector_viewport_center(page: Any, selector: str, *, within_selector:
     if not hasattr(page, "send"):
         raise AttributeError("page has no send() for CDP DOM fallback")
 
-    node_id = await dom_query_selector_node_id(page, selector, within_selector=within_selector)
-    if not node_id:
-        if within_selector:
-            raise RuntimeError(
-                f"DOM.querySelector returned no nodeId for selector: {selector} within {within_selector}"
-            )
-        raise RuntimeError(f"DOM.querySelector returned no nodeId for selector: {selector}")
+    node_id = await _required_node_id(page, selector, within_selector)
 
     quad_f, page_x, page_y = await _get_box_model_and_viewport_offset(page, node_id, selector)
     cx, cy = _quad_center_xy(quad_f)
@@ -264,13 +514,7 @@ async def selector_viewport_quad(page: Any, selector: str, *, within_selector: s
     if not hasattr(page, "send"):
         raise AttributeError("page has no send() for CDP DOM quad")
 
-    node_id = await dom_query_selector_node_id(page, selector, within_selector=within_selector)
-    if not node_id:
-        if within_selector:
-            raise RuntimeError(
-                f"DOM.querySelector returned no nodeId for selector: {selector} within {within_selector}"
-            )
-        raise RuntimeError(f"DOM.querySelector returned no nodeId for selector: {selector}")
+    node_id = await _required_node_id(page, selector, within_selector)
 
     quad_f, page_x, page_y = await _get_box_model_and_viewport_offset(page, node_id, selector)
 
@@ -287,12 +531,8 @@ def _gaussian_in_range(r: random.Random, lo: float, hi: float) -> float:
         return float(lo)
     mean = (lo + hi) / 2.0
     sigma = (hi - lo) / 6.0  # ~99.7% within range for a normal distribution
-    v = r.gauss(mean, sigma)
-    if v < lo:
-        return float(lo)
-    if v > hi:
-        return float(hi)
-    return float(v)
+    # Clamp the rare tail samples to the range.
+    return float(max(lo, min(hi, r.gauss(mean, sigma))))
 
 
 async def selector_viewport_gaussian_point(
@@ -307,12 +547,12 @@ async def selector_viewport_gaussian_point(
     """
     r = rng or random
     quad = await selector_viewport_quad(page, selector, within_selector=within_selector)
-    xs = quad[0::2]
-    ys = quad[1::2]
-    min_x = min(xs)
-    max_x = max(xs)
-    min_y = min(ys)
-    max_y = max(ys)
+    # Bounding box of the four corners (the quad may be rotated/skewed by CSS transforms).
+    x1, y1, x2, y2, x3, y3, x4, y4 = quad
+    min_x = min(x1, x2, x3, x4)
+    max_x = max(x1, x2, x3, x4)
+    min_y = min(y1, y2, y3, y4)
+    max_y = max(y1, y2, y3, y4)
 
     # Inner 50% box (25% margin on each side).
     inner_min_x = min_x + 0.25 * (max_x - min_x)
@@ -333,29 +573,26 @@ async def dom_query_selector_node_id(page: Any, selector: str, *, within_selecto
         raise AttributeError("page has no send() for CDP DOM query")
 
     # Prefer nodriver's generated CDP commands if available (page.send usually expects these).
-    uc = None
-    try:
-        import nodriver as uc  # type: ignore[assignment]
-    except Exception:
-        _LOG.debug("nodriver import failed in dom_query_selector_node_id", exc_info=True)
-        uc = None
+    uc = _nodriver_module()
 
     if uc is not None:
+        # Pages that cannot be cached get a throwaway scope, which never starts out cached.
+        scope = _dom_scope(page) or _DomScope()
+        cached = scope.root is not None
         try:
-            root_id_obj: Any = await _dom_get_root_node_id_obj_nodriver(page, uc)
-            if not root_id_obj:
-                return 0
-
-            # If a scope selector is provided, resolve it once under the document root and
-            # then query within that subtree.
-            if within_selector:
-                root_id_obj = await _dom_query_selector_nodriver(page, uc, root_id_obj, within_selector)
-                if not root_id_obj:
-                    return 0
-
-            q_resp = await _dom_query_selector_nodriver(page, uc, root_id_obj, selector)
-            return q_resp if q_resp else 0
+            found = await _dom_query_selector_scoped_nodriver(page, uc, scope, selector, within_selector)
+            if found or not cached:
+                return found
+            # A miss against cached ids may just mean the page moved on; confirm from a fresh document.
+            scope.reset()
+            return await _dom_query_selector_scoped_nodriver(page, uc, scope, selector, within_selector)
         except Exception:
+            scope.reset()
+            if cached:
+                try:
+                    return await _dom_query_selector_scoped_nodriver(page, uc, scope, selector, within_selector)
+                except Exception:
+                    scope.reset()
             # If this is not a real nodriver Tab (e.g., unit test fake), fall back to dict CDP.
             _LOG.debug("nodriver querySelector failed, falling back to dict CDP", exc_info=True)
 
@@ -373,6 +610,31 @@ async def dom_query_selector_node_id(page: Any, selector: str, *, within_selecto
     return await _dom_query_selector_int_dict(page, root_id, selector)
 
 
+@dataclass(slots=True)
+class _SelectorWait:
+    """A poll loop shared by concurrent waits for one selector, and how many are awaiting it."""
+
+    task: asyncio.Task[Any]
+    waiters: int = 0
+
+
+# Per page: one shared poll per (selector, within_selector).
+_SELECTOR_WAITS: weakref.WeakKeyDictionary[Any, dict[tuple[str, str | None], _SelectorWait]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _forget_selector_wait(
+    waits: dict[tuple[str, str | None], _SelectorWait],
+    key: tuple[str, str | None],
+    entry: _SelectorWait,
+    _task: asyncio.Task[Any],
+) -> None:
+    # Done callback: drop the entry unless a newer poll has already replaced it.
+    if waits.get(key) is entry:
+        del waits[key]
+
+
 async def wait_for_selector(
     page: Any,
     selector: str,
@@ -382,6 +644,87 @@ async def wait_for_selector(
     poll_s: float = 0.05,
     max_poll_s: float = 0.25,
     refresh_document_s: float = 1.0,
+) -> None:
+    """
+    Wait until `selector` (optionally inside `within_selector`) exists on `page`.
+
+    Concurrent waits for the same selector on the same page share one poll loop (run with the
+    first waiter's poll settings) instead of each sending their own CDP queries.
+    """
+    try:
+        waits = _SELECTOR_WAITS.get(page)
+        if waits is None:
+            waits = _SELECTOR_WAITS[page] = {}
+    except TypeError:
+        # Unhashable or not weak-referenceable page objects simply poll on their own.
+        waits = None
+
+    def _poll(remaining_s: float) -> Any:
+        return _poll_for_selector(
+            page,
+            selector,
+            timeout_s=remaining_s,
+            within_selector=within_selector,
+            poll_s=poll_s,
+            max_poll_s=max_poll_s,
+            refresh_document_s=refresh_document_s,
+        )
+
+    if waits is None:
+        await _poll(float(timeout_s))
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + float(timeout_s)
+    key = (selector, within_selector)
+    while True:
+        remaining = deadline - loop.time()
+        entry = waits.get(key)
+        if entry is None or entry.task.done() or entry.task.get_loop() is not loop:
+            owner = True
+            entry = waits[key] = _SelectorWait(loop.create_task(_poll(max(0.0, remaining))))
+            entry.task.add_done_callback(functools.partial(_forget_selector_wait, waits, key, entry))
+        elif remaining <= 0:
+            # Out of budget already: one check of our own, without disturbing the shared loop.
+            await _poll(0.0)
+            return
+        else:
+            owner = False
+        task = entry.task
+        entry.waiters += 1
+        try:
+            if owner:
+                # The shared loop runs on our deadline and raises its own TimeoutError.
+                await asyncio.shield(task)
+            else:
+                await asyncio.wait_for(asyncio.shield(task), remaining)
+            return
+        except TimeoutError:
+            # The shared loop may have belonged to a waiter with an earlier deadline; keep
+            # polling on our own budget until it runs out.
+            if loop.time() < deadline:
+                continue
+            if task.done():
+                raise
+            if within_selector:
+                raise TimeoutError(f"Timed out waiting for selector: {selector} within {within_selector}") from None
+            raise TimeoutError(f"Timed out waiting for selector: {selector}") from None
+        finally:
+            entry.waiters -= 1
+            if entry.waiters <= 0 and not task.done():
+                # Last waiter gone (timed out or cancelled): stop polling.
+                task.cancel()
+
+
+async def _poll_for_selector(
+    page: Any,
+    selector: str,
+    *,
+    timeout_s: float,
+    within_selector: str | None,
+    poll_s: float,
+    max_poll_s: float,
+    refresh_document_s: float,
 ) -> None:
     # Prefer a CDP DOM polling loop over driver-provided wait_for(), since some
     # stacks cache a stale document nodeId across navigations (observed in nodriver).
@@ -394,85 +737,133 @@ async def wait_for_selector(
 
         # Strategy: Prefer nodriver CDP message objects when possible; fall back to dict-based CDP
         # for unit-test fakes / alternative driver shims.
-        uc = None
+        uc = _nodriver_module()
         use_nodriver = False
-        try:
-            import nodriver as uc  # type: ignore[assignment]
-
-            # Probe once to avoid throwing on every poll when page.send() only supports dict CDP.
-            try:
-                _ = await _dom_get_root_node_id_obj_nodriver(page, uc)
+        probed_root: Any = None
+        scope: _DomScope | None = None
+        if uc is not None:
+            scope = _dom_scope(page)
+            if scope is not None and scope.root is not None:
+                # An earlier nodriver query on this page already worked; poll from its root.
                 use_nodriver = True
-            except Exception:
-                _LOG.debug("nodriver probe failed in wait_for_selector, using dict CDP", exc_info=True)
-                use_nodriver = False
-        except Exception:
-            _LOG.debug("nodriver import failed in wait_for_selector", exc_info=True)
-            uc = None
-            use_nodriver = False
-
-        root_id: Any = None
+            else:
+                # Probe once to avoid throwing on every poll when page.send() only supports dict CDP.
+                try:
+                    probed_root = await _dom_get_root_node_id_obj_nodriver(page, uc)
+                    use_nodriver = True
+                except Exception:
+                    _LOG.debug("nodriver probe failed in wait_for_selector, using dict CDP", exc_info=True)
+
+        if not use_nodriver:
+            scope = None
+        root_id: Any = probed_root or None
         within_id: Any = None
-        last_refresh = 0.0
-        while True:
-            now = loop.time()
-            try:
-                # Refresh the root node id occasionally (or after errors). This keeps polling fast
-                # without spamming DOM.getDocument on every iteration.
-                if (root_id is None) or ((now - last_refresh) >= float(refresh_document_s)):
-                    if use_nodriver and uc is not None:
-                        root_id = await _dom_get_root_node_id_obj_nodriver(page, uc)
-                    else:
-                        root_id = await _dom_get_root_node_id_int_dict(page)
-                    within_id = None
-                    last_refresh = now
-
-                query_root = root_id
-                found: Any = None
-
-                if within_selector:
-                    # Re-resolve the scope selector whenever it is missing/unmatched.
-                    if not within_id:
+        if scope is not None:
+            if probed_root:
+                # The probe already fetched a fresh document; poll from it instead of fetching another.
+                scope.reset(probed_root)
+            root_id = scope.root
+            if within_selector:
+                within_id = scope.within.get(within_selector)
+        # Stale cached ids raise and are refetched at once; the periodic refresh only guards
+        # against a root that silently stopped matching while the selector keeps missing.
+        last_refresh = loop.time()
+
+        def _on_document_updated() -> None:
+            nonlocal root_id, within_id
+            root_id = None
+            within_id = None
+            if scope is not None:
+                scope.reset()
+
+        # With DOM events, wake as soon as the page changes instead of waiting out the backoff.
+        watcher: DomChangeWatcher | None = None
+        if use_nodriver:
+            watcher = DomChangeWatcher(
+                page, uc, events=_SELECTOR_CHANGE_EVENTS, on_document_updated=_on_document_updated
+            )
+            if not watcher.start():
+                watcher = None
+        try:
+            while True:
+                now = loop.time()
+                if watcher is not None:
+                    watcher.changed.clear()
+                try:
+                    # Refresh the root node id occasionally (or after errors). This keeps polling fast
+                    # without spamming DOM.getDocument on every iteration. With DOM events, a new
+                    # document is announced (DocumentUpdated), so only errors trigger a refresh.
+                    stale = watcher is None and (now - last_refresh) >= float(refresh_document_s)
+                    if root_id is None or stale:
                         if use_nodriver and uc is not None:
-                            within_id = await _dom_query_selector_nodriver(page, uc, query_root, within_selector)
+                            root_id = await _dom_get_root_node_id_obj_nodriver(page, uc)
+                            # This getDocument invalidated every cached id; share the new root instead.
+                            if scope is not None:
+                                scope.reset(root_id or None)
                         else:
-                            within_id = await _dom_query_selector_int_dict(page, int(query_root), within_selector)
+                            root_id = await _dom_get_root_node_id_int_dict(page)
+                        within_id = None
+                        last_refresh = now
+
+                    query_root = root_id
+                    found: Any = None
 
+                    if within_selector:
+                        # Re-resolve the scope selector whenever it is missing/unmatched.
                         if not within_id:
-                            within_id = None
-                            found = None
-                        else:
+                            if use_nodriver and uc is not None:
+                                within_id = await _dom_query_selector_nodriver(page, uc, query_root, within_selector)
+                                if within_id and scope is not None and scope.root is root_id:
+                                    scope.within[within_selector] = within_id
+                            else:
+                                within_id = await _dom_query_selector_int_dict(page, int(query_root), within_selector)
+
+                            if not within_id:
+                                within_id = None
+                                found = None
+                            else:
+                                query_root = within_id
+
+                        if within_id:
                             query_root = within_id
 
-                    if within_id:
-                        query_root = within_id
+                    if query_root:
+                        if use_nodriver and uc is not None:
+                            found = await _dom_query_selector_nodriver(page, uc, query_root, selector)
+                        else:
+                            found = await _dom_query_selector_int_dict(page, int(query_root), selector)
 
-                if query_root:
-                    if use_nodriver and uc is not None:
-                        found = await _dom_query_selector_nodriver(page, uc, query_root, selector)
-                    else:
-                        found = await _dom_query_selector_int_dict(page, int(query_root), selector)
+                    if found:
+                        return
+                except Exception as e:
+                    # Not found yet (or transient DOM state); keep polling until timeout.
+                    last_exc = e
+                    # If the document changed under us, the cached nodeIds can become stale.
+                    root_id = None
+                    within_id = None
 
-                if found:
-                    return
-            except Exception as e:
-                # Not found yet (or transient DOM state); keep polling until timeout.
-                last_exc = e
-                # If the document changed under us, the cached nodeIds can become stale.
-                root_id = None
-                within_id = None
-
-            if now >= deadline:
-                if within_selector:
-                    raise TimeoutError(
-                        f"Timed out waiting for selector: {selector} within {within_selector}"
-                    ) from last_exc
-                raise TimeoutError(f"Timed out waiting for selector: {selector}") from last_exc
-
-            await asyncio.sleep(poll)
-            if poll > 0:
-                # Deterministic backoff to reduce CDP churn when elements take time to appear.
-                poll = min(max_poll, poll * 1.5)
+                if now >= deadline:
+                    if within_selector:
+                        raise TimeoutError(
+                            f"Timed out waiting for selector: {selector} within {within_selector}"
+                        ) from last_exc
+                    raise TimeoutError(f"Timed out waiting for selector: {selector}") from last_exc
+
+                if watcher is not None:
+                    if within_id:
+                        await watcher.watch(within_id)
+                    # Inside a watched container every change is reported, so the re-query only
+                    # backs up the events; elsewhere keep the usual backoff as the upper bound.
+                    watched = bool(within_id) and watcher.watched == within_id
+                    await watcher.wait(min(_EVENT_RECHECK_S if watched else poll, deadline - loop.time()))
+                else:
+                    await asyncio.sleep(poll)
+                if poll > 0:
+                    # Deterministic backoff to reduce CDP churn when elements take time to appear.
+                    poll = min(max_poll, poll * 1.5)
+        finally:
+            if watcher is not None:
+                watcher.stop()
 
     if hasattr(page, "wait_for_selector"):
         await page.wait_for_selector(selector, timeout=timeout_s)
@@ -490,12 +881,7 @@ async def dom_get_outer_html(page: Any, node_id: int) -> str:
         raise AttributeError("page has no send() for CDP DOM outerHTML")
 
     # Prefer nodriver's generated CDP commands if available (page.send usually expects these).
-    uc = None
-    try:
-        import nodriver as uc  # type: ignore[assignment]
-    except Exception:
-        _LOG.debug("nodriver import failed in dom_get_outer_html", exc_info=True)
-        uc = None
+    uc = _nodriver_module()
 
     resp: Any = None
     nodriver_exc: Exception | None = None
@@ -503,10 +889,7 @@ async def dom_get_outer_html(page: Any, node_id: int) -> str:
         try:
             fn = getattr(getattr(getattr(uc, "cdp", None), "dom", None), "get_outer_html", None)
             if callable(fn):
-                try:
-                    resp = await page.send(fn(node_id))
-                except TypeError:
-                    resp = await page.send(fn(node_id=node_id))
+                resp = await page.send(_cdp_caller(fn, "node_id")(node_id))
         except Exception as e:
             nodriver_exc = e
             resp = None
@@ -533,6 +916,58 @@ async def dom_get_outer_html(page: Any, node_id: int) -> str:
 
 
 _WS_RE = re.compile(r"\s+")
+# Markup a plain tag split cannot reproduce: comments/CDATA/doctype, processing instructions,
+# and elements whose content html_to_text drops.
+_COMPLEX_HTML_RE = re.compile(r"<(?:[!?]|/?(?:script|style|noscript)\b)", re.IGNORECASE)
+# A start or end tag; quoted attribute values may contain ">".
+_TAG_RE = re.compile(r"""</?[a-zA-Z][^\s/>]*(?:[^>"']|"[^"]*"|'[^']*')*>""")
+
+
+@functools.cache
+def _have_bs4() -> bool:
+    return importlib.util.find_spec("bs4") is not None
+
+
+def _flat_html_text_parts(html: str) -> list[str] | None:
+    """
+    Text runs of `html` in document order, or None if it needs a real parser.
+
+    Serialized DOM (DOM.getOuterHTML) escapes "<" and "&" in text, so for markup without
+    comments, scripts or styles the text between tags is exactly what a parser yields as text
+    nodes. This is the common case for chat message content.
+    """
+    if _COMPLEX_HTML_RE.search(html):
+        return None
+    parts = _TAG_RE.split(html)
+    if any("<" in p for p in parts):
+        return None
+    if "&" in html:
+        parts = [unescape(p) if "&" in p else p for p in parts]
+    return parts
+
+
+_PARSER_IGNORE_TAGS = frozenset({"script", "style"})
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._ignore_depth = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:  # type: ignore[override]
+        if tag in _PARSER_IGNORE_TAGS:
+            self._ignore_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:  # type: ignore[override]
+        if tag in _PARSER_IGNORE_TAGS and self._ignore_depth > 0:
+            self._ignore_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._ignore_depth:
+            return
+        if data:
+            self.parts.append(data)
 
 
 def html_to_text(html: str) -> str:
@@ -541,53 +976,37 @@ def html_to_text(html: str) -> str:
 
     This intentionally does not require Runtime evaluation/innerText.
     """
+    html = str(html)
+    parts = _flat_html_text_parts(html)
+    if parts is not None:
+        # Same output as the parser paths below, without building a tree.
+        if _have_bs4():
+            return " ".join(s for s in (p.strip() for p in parts) if s)
+        return _WS_RE.sub(" ", " ".join(parts)).strip()
+
     # Prefer BeautifulSoup when available (optional dependency).
     try:
         from bs4 import BeautifulSoup  # type: ignore
 
-        soup = BeautifulSoup(str(html), "html.parser")
+        soup = BeautifulSoup(html, "html.parser")
         for tag in soup(["script", "style", "noscript"]):
             try:
                 tag.decompose()
             except Exception:
                 _LOG.debug("tag.decompose() failed", exc_info=True)
-        txt = soup.get_text(" ", strip=True)
-        return str(txt or "").strip()
+        # strip=True already trims and drops whitespace-only strings.
+        return soup.get_text(" ", strip=True)
     except Exception:
         _LOG.debug("BeautifulSoup html_to_text failed, falling back to HTMLParser", exc_info=True)
 
-    class _Extractor(HTMLParser):
-        def __init__(self) -> None:
-            super().__init__(convert_charrefs=True)
-            self.parts: list[str] = []
-            self._ignore_depth = 0
-
-        def handle_starttag(self, tag: str, attrs) -> None:  # type: ignore[override]
-            if tag in {"script", "style"}:
-                self._ignore_depth += 1
-
-        def handle_endtag(self, tag: str) -> None:  # type: ignore[override]
-            if tag in {"script", "style"} and self._ignore_depth > 0:
-                self._ignore_depth -= 1
-
-        def handle_data(self, data: str) -> None:
-            if self._ignore_depth:
-                return
-            if data:
-                self.parts.append(data)
-
-    p = _Extractor()
-    p.feed(str(html))
-    txt = _WS_RE.sub(" ", " ".join(p.parts)).strip()
-    return txt
+    p = _TextExtractor()
+    p.feed(html)
+    # One C-level fold over the joined text beats a regex call per data fragment.
+    return _WS_RE.sub(" ", " ".join(p.parts)).strip()
 
 
 async def selector_text_content(page: Any, selector: str, *, within_selector: str | None = None) -> str:
-    node_id = await dom_query_selector_node_id(page, selector, within_selector=within_selector)
-    if not node_id:
-        if within_selector:
-            raise RuntimeError(f"DOM.querySelector returned no nodeId for selector: {selector} within {within_selector}")
-        raise RuntimeError(f"DOM.querySelector returned no nodeId for selector: {selector}")
+    node_id = await _required_node_id(page, selector, within_selector)
 
     html = await dom_get_outer_html(page, node_id)
     return html_to_text(html)
@@ -619,7 +1038,7 @@ async def element_viewport_center(element: Any) -> ViewportPoint:
     if bb is not None:
         try:
             box = bb() if callable(bb) else bb
-            if inspect.isawaitable(box):
+            if _isawaitable(box):
                 box = await box
 
             if box is not None:
@@ -644,7 +1063,7 @@ async def element_viewport_center(element: Any) -> ViewportPoint:
 
     if callable(quads):
         quads = quads()
-    if inspect.isawaitable(quads):
+    if _isawaitable(quads):
         quads = await quads
     if not quads:
         raise ValueError("element.quads is empty")
@@ -662,14 +1081,14 @@ async def maybe_maximize(browser: Any) -> None:
             fn = getattr(tab, "maximize", None)
             if callable(fn):
                 res = fn()
-                if inspect.isawaitable(res):
+                if _isawaitable(res):
                     await res
                 return
 
         fn = getattr(browser, "maximize", None)
         if callable(fn):
             res = fn()
-            if inspect.isawaitable(res):
+            if _isawaitable(res):
                 await res
     except Exception:
         _LOG.debug("maybe_maximize failed", exc_info=True)
@@ -681,7 +1100,7 @@ async def maybe_bring_to_front(browser: Any) -> None:
         fn = getattr(browser, "bring_to_front", None)
         if callable(fn):
             res = fn()
-            if inspect.isawaitable(res):
+            if _isawaitable(res):
                 await res
             return
 
@@ -690,7 +1109,7 @@ async def maybe_bring_to_front(browser: Any) -> None:
             fn = getattr(tab, "bring_to_front", None)
             if callable(fn):
                 res = fn()
-                if inspect.isawaitable(res):
+                if _isawaitable(res):
                     await res
     except Exception:
         _LOG.debug("maybe_bring_to_front failed", exc_info=True)
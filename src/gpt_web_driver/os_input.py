@@ -6,13 +6,13 @@ from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TypingProfile:
     min_delay_s: float = 0.05
     max_delay_s: float = 0.15
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MouseProfile:
     min_move_duration_s: float = 0.2
     max_move_duration_s: float = 0.6
@@ -56,9 +56,8 @@ class OsInput:
     def dry_run(self) -> bool:
         return self._dry_run
 
-    def move_to(self, x: float, y: float, *, profile: MouseProfile) -> None:
-        duration = self._rng.uniform(profile.min_move_duration_s, profile.max_move_duration_s)
-        ev = {
+    def _move_event(self, x: float, y: float, duration: float) -> dict[str, Any]:
+        return {
             "event": "os.move_to",
             "x": float(x),
             "y": float(y),
@@ -66,6 +65,10 @@ class OsInput:
             "dry_run": bool(self._dry_run),
         }
 
+    def move_to(self, x: float, y: float, *, profile: MouseProfile) -> None:
+        duration = self._rng.uniform(profile.min_move_duration_s, profile.max_move_duration_s)
+        ev = self._move_event(x, y, duration)
+
         if self._dry_run:
             if self._emit is not None:
                 self._emit(ev)
@@ -127,6 +130,48 @@ class OsInput:
         if self._emit is not None:
             self._emit(ev)
 
+    # Async variants: pyautogui blocks for the whole call (a move lasts its full duration, and
+    # every call then sleeps pyautogui.PAUSE), so run it in a worker thread and let the event
+    # loop keep serving CDP traffic. Randomness is drawn and events are emitted on the loop
+    # thread, in the same order as the sync methods. Dry runs never block and stay inline.
+
+    async def move_to_async(self, x: float, y: float, *, profile: MouseProfile) -> None:
+        if self._dry_run:
+            self.move_to(x, y, profile=profile)
+            return
+        duration = self._rng.uniform(profile.min_move_duration_s, profile.max_move_duration_s)
+        assert self._pag is not None
+        await asyncio.to_thread(self._pag.moveTo, x, y, duration=duration)
+        if self._emit is not None:
+            self._emit(self._move_event(x, y, duration))
+
+    async def click_async(self) -> None:
+        if self._dry_run:
+            self.click()
+            return
+        assert self._pag is not None
+        await asyncio.to_thread(self._pag.click)
+        if self._emit is not None:
+            self._emit({"event": "os.click", "dry_run": False})
+
+    async def write_char_async(self, char: str) -> None:
+        if self._dry_run:
+            self.write_char(char)
+            return
+        assert self._pag is not None
+        await asyncio.to_thread(self._pag.write, char)
+        if self._emit is not None and self._include_text_in_events:
+            self._emit({"event": "os.write_char", "dry_run": False, "char": str(char)})
+
+    async def press_async(self, key: str) -> None:
+        if self._dry_run:
+            self.press(key)
+            return
+        assert self._pag is not None
+        await asyncio.to_thread(self._pag.press, key)
+        if self._emit is not None:
+            self._emit({"event": "os.press", "key": str(key), "dry_run": False})
+
     def key_down(self, key: str) -> None:
         ev = {"event": "os.key_down", "key": str(key), "dry_run": bool(self._dry_run)}
         if self._dry_run:
@@ -231,7 +276,16 @@ class OsInput:
                 ev["text"] = str(text)
             self._emit(ev)
 
-        for ch in text:
-            self.write_char(ch)
-            await asyncio.sleep(self._rng.uniform(profile.min_delay_s, profile.max_delay_s))
+        # Draw the whole delay schedule up front (same rng sequence as drawing per character), so
+        # the loop below only writes and sleeps. Characters still go out one at a time with their
+        # own jittered gap; a fixed pyautogui `interval=` would drop the per-key variation.
+        uniform = self._rng.uniform
+        lo = profile.min_delay_s
+        hi = profile.max_delay_s
+        delays = [uniform(lo, hi) for _ in range(len(text))]
+        write_char = self.write_char_async
+        sleep = asyncio.sleep
+        for ch, delay_s in zip(text, delays):
+            await write_char(ch)
+            await sleep(delay_s)
 
@@ -15,6 +15,7 @@ from .demo_server import serve_directory
 from .geometry import Noise, apply_noise, viewport_to_screen
 from .nodriver_dom import (
     ViewportPoint,
+    forget_dom_scope,
     maybe_bring_to_front,
     maybe_maximize,
     selector_viewport_center,
@@ -44,7 +45,7 @@ def _no_gui_display(env: Mapping[str, str] = os.environ, *, sys_platform: str =
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RunConfig:
     url: str
     selector: str
@@ -283,6 +284,8 @@ class FlowRunner:
         assert self._browser is not None
         if self._emit is not None:
             self._emit({"event": "navigate", "url": str(url)})
+        if self._page is not None:
+            forget_dom_scope(self._page)
         self._page = await self._browser.get(url)
         await stealth_init(self._page)
         return self._page
@@ -305,13 +308,19 @@ class FlowRunner:
     def config(self) -> RunConfig:
         return self._cfg
 
-    async def locate_point(self, selector: str, *, within_selector: str | None = None) -> ViewportPoint:
+    async def locate_point(
+        self,
+        selector: str,
+        *,
+        within_selector: str | None = None,
+        timeout_s: float | None = None,
+    ) -> ViewportPoint:
         assert self._page is not None
         await wait_for_selector(
             self._page,
             selector,
             within_selector=within_selector,
-            timeout_s=self._cfg.timeout_s,
+            timeout_s=float(self._cfg.timeout_s if timeout_s is None else timeout_s),
         )
         # Always use the CDP DOM path to avoid relying on driver-specific element-handle
         # behaviors (which may internally evaluate JS depending on implementation/version).
@@ -387,15 +396,15 @@ class FlowRunner:
         await maybe_bring_to_front(self._browser)
         if self._cfg.pre_interact_delay_s > 0:
             await asyncio.sleep(self._cfg.pre_interact_delay_s)
-        os_in.move_to(fx, fy, profile=self._cfg.mouse)
-        os_in.click()
+        await os_in.move_to_async(fx, fy, profile=self._cfg.mouse)
+        await os_in.click_async()
 
         if text:
             if self._cfg.post_click_delay_s > 0:
                 await asyncio.sleep(self._cfg.post_click_delay_s)
             await os_in.human_type(text, profile=self._cfg.typing)
             if self._cfg.press_enter:
-                os_in.press("enter")
+                await os_in.press_async("enter")
 
     async def click(self, selector: str, *, within_selector: str | None = None) -> None:
         assert self._browser is not None
@@ -427,8 +436,10 @@ class FlowRunner:
         await maybe_bring_to_front(self._browser)
         if self._cfg.pre_interact_delay_s > 0:
             await asyncio.sleep(self._cfg.pre_interact_delay_s)
-        os_in.move_to(fx, fy, profile=self._cfg.mouse)
-        os_in.click()
+        await os_in.move_to_async(fx, fy, profile=self._cfg.mouse)
+        await os_in.click_async()
+        # The click may re-render the page; resolve `within` containers afresh next time.
+        forget_dom_scope(self._page)
 
     async def type(
         self,
@@ -457,7 +468,8 @@ class FlowRunner:
             await asyncio.sleep(delay)
         await os_in.human_type(str(text), profile=self._cfg.typing)
         if press_enter:
-            os_in.press("enter")
+            await os_in.press_async("enter")
+        forget_dom_scope(self._page)
 
     async def press(self, key: str) -> None:
         assert self._browser is not None
@@ -465,7 +477,9 @@ class FlowRunner:
         await maybe_bring_to_front(self._browser)
         if self._cfg.pre_interact_delay_s > 0:
             await asyncio.sleep(self._cfg.pre_interact_delay_s)
-        os_in.press(key)
+        await os_in.press_async(key)
+        if self._page is not None:
+            forget_dom_scope(self._page)
 
     async def wait_for_selector(
         self,
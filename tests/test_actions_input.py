@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import sys
+import types
+
+from gpt_web_driver.actions.input import _ClipboardHygiene
+
+
+class _FakeClipboard(types.ModuleType):
+    def __init__(self, name: str, initial) -> None:
+        super().__init__(name)
+        self.value = initial
+        self.copies: list[str | bytes] = []
+
+    def copy(self, text: str | bytes) -> None:
+        self.copies.append(text)
+        self.value = text
+
+    def paste(self):
+        return self.value
+
+
+def test_clipboard_hygiene_prefers_pyclip_and_restores_bytes_clipboard(monkeypatch):
+    pyclip = _FakeClipboard("pyclip", b"saved")
+    pyperclip = _FakeClipboard("pyperclip", "other")
+    monkeypatch.setitem(sys.modules, "pyclip", pyclip)
+    monkeypatch.setitem(sys.modules, "pyperclip", pyperclip)
+
+    with _ClipboardHygiene() as cb:
+        cb.copy("payload")
+
+    assert pyclip.copies == ["payload", b"saved"]
+    assert pyperclip.copies == []
+
+
+def test_clipboard_hygiene_restores_non_utf8_bytes_unchanged(monkeypatch):
+    raw = b"\x89PNG\r\n\x1a\n\xff\xfe"
+    pyclip = _FakeClipboard("pyclip", raw)
+    monkeypatch.setitem(sys.modules, "pyclip", pyclip)
+
+    with _ClipboardHygiene() as cb:
+        cb.copy("payload")
+
+    assert pyclip.copies == ["payload", raw]
+
+
+def test_clipboard_hygiene_falls_back_to_pyperclip(monkeypatch):
+    pyperclip = _FakeClipboard("pyperclip", "saved")
+    monkeypatch.setitem(sys.modules, "pyclip", None)
+    monkeypatch.setitem(sys.modules, "pyperclip", pyperclip)
+
+    with _ClipboardHygiene() as cb:
+        cb.copy("payload")
+
+    assert pyperclip.copies == ["payload", "saved"]
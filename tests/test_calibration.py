@@ -1,4 +1,7 @@
 import json
+import os
+import stat
+import sys
 from pathlib import Path
 
 import pytest
@@ -36,3 +39,259 @@ def test_load_raises_on_missing_keys(tmp_path: Path):
     with pytest.raises(CalibrationError):
         load_calibration(p)
 
+
+def test_load_missing_keys_error_names_the_first_missing_key(tmp_path: Path):
+    p = tmp_path / "cal.json"
+    p.write_text(json.dumps({"scale_x": 1}), encoding="utf-8")
+    with pytest.raises(CalibrationError, match="'scale_y'"):
+        load_calibration(p)
+
+
+def test_load_raises_on_non_numeric_values(tmp_path: Path):
+    p = tmp_path / "cal.json"
+    p.write_text(json.dumps({"scale_x": 1, "scale_y": "x", "offset_x": 0, "offset_y": None}), encoding="utf-8")
+    with pytest.raises(CalibrationError, match="must be numbers"):
+        load_calibration(p)
+
+
+
+def test_get_mouse_position_imports_pyautogui_once(monkeypatch):
+    import collections
+    import sys
+    import types
+
+    from gpt_web_driver import calibration
+
+    Point = collections.namedtuple("Point", "x y")
+    pag = types.ModuleType("pyautogui")
+    pag.position = lambda: Point(12, 34)
+    monkeypatch.setitem(sys.modules, "pyautogui", pag)
+    monkeypatch.setattr(calibration, "_pyautogui", None)
+
+    assert calibration._get_mouse_position() == (12.0, 34.0)
+    monkeypatch.delitem(sys.modules, "pyautogui")
+    assert calibration._get_mouse_position() == (12.0, 34.0)
+
+
+def test_stdin_reader_reads_lines_on_the_loop_and_restores_blocking(monkeypatch):
+    import asyncio
+    import os
+    import sys
+
+    from gpt_web_driver.calibration import _StdinReader
+
+    if sys.platform == "win32":
+        pytest.skip("POSIX pipe reader")
+
+    r, w = os.pipe()
+    stdin = os.fdopen(r, "r")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    try:
+        os.write(w, b"first\nsecond\n")
+
+        async def _read() -> list[str]:
+            reader = _StdinReader()
+            try:
+                return [await reader.readline(), await reader.readline()]
+            finally:
+                reader.close()
+
+        assert asyncio.run(_read()) == ["first\n", "second\n"]
+        assert os.get_blocking(r)
+        assert not stdin.closed
+    finally:
+        stdin.close()
+        os.close(w)
+
+
+def test_stdin_reader_reads_ttys_in_a_thread_without_touching_blocking(monkeypatch):
+    import asyncio
+
+    from gpt_web_driver.calibration import _StdinReader
+
+    if sys.platform == "win32":
+        pytest.skip("POSIX tty reader")
+
+    master, slave = os.openpty()
+    stdin = os.fdopen(slave, "r")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    try:
+        os.write(master, b"enter\n")
+
+        async def _read() -> tuple[str, bool, bool]:
+            reader = _StdinReader()
+            try:
+                line = await reader.readline()
+                return line, reader._reader is None, os.get_blocking(slave)
+            finally:
+                reader.close()
+
+        line, threaded, blocking = asyncio.run(_read())
+        assert line == "enter\n"
+        assert threaded and blocking
+    finally:
+        stdin.close()
+        os.close(master)
+
+
+def test_builtin_calibration_page_is_packaged():
+    from gpt_web_driver.calibration import _calibrate_html
+
+    html = _calibrate_html()
+    assert 'id="calibrate-a"' in html and 'id="calibrate-b"' in html
+
+
+def test_fit_axis_matches_two_point_solve_and_averages_extra_points():
+    from gpt_web_driver.calibration import _fit_axis
+
+    scale, offset = _fit_axis([100.0, 500.0], [210.0, 1010.0])
+    assert scale == pytest.approx(2.0)
+    assert offset == pytest.approx(10.0)
+
+    # A 1px error on one sample skews the two-point solve more than the five-point fit.
+    _scale2, offset2 = _fit_axis([100.0, 500.0], [211.0, 1010.0])
+    scale5, offset5 = _fit_axis([100.0, 500.0, 500.0, 100.0, 300.0], [211.0, 1010.0, 1010.0, 210.0, 610.0])
+    assert abs(offset5 - 10.0) < abs(offset2 - 10.0)
+    assert scale5 == pytest.approx(2.0, abs=0.002)
+
+
+def test_fit_axis_rejects_degenerate_points():
+    from gpt_web_driver.calibration import _fit_axis
+
+    with pytest.raises(CalibrationError):
+        _fit_axis([100.0, 100.0], [200.0, 300.0])
+
+
+def test_as_cli_args_is_cached_and_ignored_by_equality():
+    cal = Calibration(scale_x=1.5, scale_y=2.0, offset_x=-3.0, offset_y=4.0)
+    args = cal.as_cli_args
+    assert args == ("--scale-x", "1.5", "--scale-y", "2.0", "--offset-x", "-3.0", "--offset-y", "4.0")
+    assert cal.as_cli_args is args
+    assert cal == Calibration(scale_x=1.5, scale_y=2.0, offset_x=-3.0, offset_y=4.0)
+    assert not hasattr(cal, "__dict__")
+
+
+def test_int_values_are_written_as_floats(tmp_path: Path):
+    p = tmp_path / "cal.json"
+    write_calibration(Calibration(scale_x=1, scale_y=2, offset_x=3, offset_y=4), p)
+    obj = json.loads(p.read_text(encoding="utf-8"))
+    assert obj["scale_x"] == 1.0 and isinstance(obj["scale_x"], float)
+    assert isinstance(obj["created_at"], int)
+
+
+def test_write_replaces_existing_file_without_leftovers(tmp_path: Path):
+    p = tmp_path / "cal.json"
+    p.write_text("stale", encoding="utf-8")
+    write_calibration(Calibration(scale_x=1.0, scale_y=1.0, offset_x=0.0, offset_y=0.0), p)
+    assert load_calibration(p) == Calibration(scale_x=1.0, scale_y=1.0, offset_x=0.0, offset_y=0.0)
+    assert p.read_text(encoding="utf-8").endswith("}\n")
+    assert [c.name for c in tmp_path.iterdir()] == ["cal.json"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permission bits")
+def test_write_keeps_file_mode_and_follows_symlinks(tmp_path: Path):
+    cal = Calibration(scale_x=1.0, scale_y=1.0, offset_x=0.0, offset_y=0.0)
+    new = tmp_path / "new.json"
+    umask = os.umask(0o022)
+    try:
+        write_calibration(cal, new)
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(new.stat().st_mode) == 0o644
+
+    real = tmp_path / "real.json"
+    real.write_text("stale", encoding="utf-8")
+    real.chmod(0o640)
+    link = tmp_path / "calibration.json"
+    link.symlink_to(real)
+    write_calibration(cal, link)
+    assert link.is_symlink()
+    assert load_calibration(real) == cal
+    assert stat.S_IMODE(real.stat().st_mode) == 0o640
+
+
+def test_run_calibrate_skips_optional_targets_missing_from_the_page(monkeypatch):
+    import asyncio
+    import types
+
+    from gpt_web_driver import calibration as cal_mod
+    from gpt_web_driver.runner import RunConfig
+
+    # Viewport point -> screen point under scale 2, offset (10, 20).
+    viewport = {"a": (100.0, 100.0), "b": (500.0, 300.0), "e": (300.0, 200.0)}
+    located = []
+
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def navigate(self, url):
+            pass
+
+        async def locate_point(self, selector, *, timeout_s=None):
+            label = selector.rsplit("-", 1)[1]
+            located.append((label, timeout_s))
+            if label not in viewport:
+                raise TimeoutError(f"Timed out waiting for selector: {selector}")
+            x, y = viewport[label]
+            return types.SimpleNamespace(x=x, y=y)
+
+    class FakeStdin:
+        async def readline(self):
+            return "\n"
+
+        def close(self):
+            pass
+
+    screen = iter([(210.0, 220.0), (1010.0, 620.0), (610.0, 420.0)])
+    srv = types.SimpleNamespace(base_url="http://127.0.0.1:1", close=lambda: None)
+    monkeypatch.setattr(cal_mod, "FlowRunner", FakeRunner)
+    monkeypatch.setattr(cal_mod, "serve_html", lambda *_a: srv)
+    monkeypatch.setattr(cal_mod, "_StdinReader", FakeStdin)
+    monkeypatch.setattr(cal_mod, "_get_mouse_position", lambda: next(screen))
+    events = []
+
+    cal = asyncio.run(cal_mod.run_calibrate(RunConfig.defaults(url="", dry_run=True), emit=events.append))
+
+    # Optional targets are probed once instead of waiting out the full timeout.
+    assert located == [("a", None), ("b", None), ("c", 0.0), ("d", 0.0), ("e", 0.0)]
+    assert [e["point"] for e in events if e["event"] == "calibrate.point"] == ["A", "B", "E"]
+    assert cal.scale_x == pytest.approx(2.0) and cal.offset_x == pytest.approx(10.0)
+    assert cal.scale_y == pytest.approx(2.0) and cal.offset_y == pytest.approx(20.0)
+
+
+def test_run_calibrate_fails_when_a_required_target_is_missing(monkeypatch):
+    import asyncio
+    import types
+
+    from gpt_web_driver import calibration as cal_mod
+    from gpt_web_driver.runner import RunConfig
+
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def navigate(self, url):
+            pass
+
+        async def locate_point(self, selector, *, timeout_s=None):
+            raise TimeoutError(f"Timed out waiting for selector: {selector}")
+
+    srv = types.SimpleNamespace(base_url="http://127.0.0.1:1", close=lambda: None)
+    monkeypatch.setattr(cal_mod, "FlowRunner", FakeRunner)
+    monkeypatch.setattr(cal_mod, "serve_html", lambda *_a: srv)
+
+    with pytest.raises(TimeoutError, match="#calibrate-a"):
+        asyncio.run(cal_mod.run_calibrate(RunConfig.defaults(url="", dry_run=True)))
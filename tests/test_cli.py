@@ -12,3 +12,288 @@ def test_serve_has_longer_default_timeout_than_run():
     ns_serve = p.parse_args(["serve", "--url", "https://example.com/"])
     assert ns_serve.timeout == 90.0
 
+
+
+def test_parser_build_does_not_import_subcommand_modules():
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    src = Path(__file__).resolve().parents[1] / "src"
+    code = (
+        "import sys; from gpt_web_driver.cli import build_parser; build_parser(); "
+        "heavy = ('gpt_web_driver.runner', 'gpt_web_driver.flow', 'gpt_web_driver.calibration', "
+        "'gpt_web_driver.os_input', 'gpt_web_driver.nodriver_dom', 'gpt_web_driver.browser'); "
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(src)}
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, env=env).stdout
+    assert out.strip() == ""
+
+
+def test_dry_run_and_write_calibration_resolve_lazily(monkeypatch):
+    from gpt_web_driver.cli import _make_config, build_parser
+
+    p = build_parser()
+    ns = p.parse_args(["run", "--url", "https://example.com/"])
+    assert ns.dry_run is None
+    monkeypatch.setenv("GWD_DRY_RUN", "1")
+    assert _make_config(ns).dry_run is True
+    assert _make_config(p.parse_args(["run", "--url", "https://example.com/", "--no-dry-run"])).dry_run is False
+
+    assert p.parse_args(["calibrate", "--write-calibration"]).write_calibration is True
+    assert p.parse_args(["calibrate", "--write-calibration", "x.json"]).write_calibration == "x.json"
+
+
+def test_sniff_subcommand_builds_only_the_invoked_parser():
+    from gpt_web_driver.cli import _sniff_subcommand, build_parser
+
+    assert _sniff_subcommand(["run", "--url", "x"]) == "run"
+    assert _sniff_subcommand(["--help"]) is None
+    assert _sniff_subcommand(["bogus"]) is None
+    assert _sniff_subcommand([]) is None
+    assert _sniff_subcommand(["run", "-h"]) == "run"
+
+    sub = next(a for a in build_parser(only="doctor")._actions if a.dest == "cmd")
+    assert list(sub.choices) == ["doctor"]
+    sub = next(a for a in build_parser()._actions if a.dest == "cmd")
+    assert list(sub.choices) == ["run", "demo", "flow", "serve", "doctor", "calibrate"]
+
+
+def test_main_reuses_cached_parser(capsys):
+    from gpt_web_driver.cli import _build_parser_cached, main
+
+    _build_parser_cached.cache_clear()
+    assert main(["doctor", "--output", "jsonl"]) == 0
+    assert main(["doctor", "--output", "jsonl"]) == 0
+    info = _build_parser_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    _build_parser_cached.cache_clear()
+
+
+def test_browser_defaults_come_from_the_environment_at_run_time(monkeypatch):
+    from gpt_web_driver.cli import _make_config, build_parser
+
+    p = build_parser(only="run")
+    ns = p.parse_args(["run", "--url", "https://example.com/"])
+    assert (ns.browser_channel, ns.download_browser, ns.sandbox) == (None, None, None)
+
+    monkeypatch.setenv("GWD_BROWSER_CHANNEL", "beta")
+    monkeypatch.setenv("GWD_BROWSER_DOWNLOAD", "0")
+    monkeypatch.setenv("GWD_SANDBOX", "0")
+    cfg = _make_config(ns)
+    assert (cfg.browser_channel, cfg.download_browser, cfg.sandbox) == ("beta", False, False)
+
+    ns = p.parse_args(["run", "--url", "u", "--browser-channel", "dev", "--download-browser", "--sandbox"])
+    cfg = _make_config(ns)
+    assert (cfg.browser_channel, cfg.download_browser, cfg.sandbox) == ("dev", True, True)
+
+
+def test_make_config_converts_fields_and_keeps_none(monkeypatch):
+    from pathlib import Path
+
+    from gpt_web_driver import cli
+
+    monkeypatch.setenv("HOME", "/home/tester")
+    cli._expand_path.cache_clear()
+    ns = cli.build_parser().parse_args(
+        ["run", "--url", "http://x", "--selector", "#a", "--browser-path", "~/chrome", "--offset-y", "5"]
+    )
+    cfg = cli._make_config(ns)
+
+    assert cfg.browser_path == Path("/home/tester/chrome")
+    assert cfg.browser_cache_dir is None and cfg.seed is None
+    assert cfg.offset_y == 5.0 and cfg.scale_x == 1.0
+    assert isinstance(cfg.timeout_s, float)
+
+
+def test_main_top_level_paths_skip_subcommand_options(monkeypatch, capsys):
+    import pytest
+
+    from gpt_web_driver import __version__, cli
+
+    built = []
+
+    def _record(only=None):
+        built.append(only)
+        return cli.build_parser(only)
+
+    monkeypatch.setattr(cli, "_build_parser_cached", _record)
+
+    assert cli.main(["--version"]) == 0
+    assert capsys.readouterr().out == f"gpt-web-driver {__version__}\n"
+    assert built == []
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["--help"])
+    assert exc.value.code == 0
+    assert capsys.readouterr().out == cli.build_parser().format_help()
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main([])
+    assert exc.value.code == 2
+    assert "error: the following arguments are required: cmd" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["bogus"])
+    assert exc.value.code == 2
+    assert "invalid choice: 'bogus'" in capsys.readouterr().err
+    assert built == ["", "", ""]
+
+
+def test_top_level_help_before_a_subcommand_lists_every_subcommand(capsys):
+    import pytest
+
+    from gpt_web_driver import cli
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["-h", "run"])
+    assert exc.value.code == 0
+    assert capsys.readouterr().out == cli.build_parser().format_help()
+
+
+def test_jsonl_emitter_batches_until_terminal_event():
+    import io
+    import json
+
+    from gpt_web_driver import cli
+
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(io.BufferedWriter(raw), encoding="utf-8")
+    emit, flush = cli._jsonl_emitter(stream, batch=3)
+
+    emit({"event": "step", "text": "héllo"})
+    emit({"event": "step", "ts": 1.0})
+    assert raw.getvalue() == b""  # still buffered
+    emit({"event": "result", "value": "x"})
+    lines = [json.loads(line) for line in raw.getvalue().splitlines()]
+    assert [ev["event"] for ev in lines] == ["step", "step", "result"]
+    assert lines[0]["text"] == "héllo" and "ts" in lines[0]
+    assert lines[1]["ts"] == 1.0
+
+    emit({"event": "step", 1: "non-str key"})
+    flush()
+    assert json.loads(raw.getvalue().splitlines()[-1])["1"] == "non-str key"
+
+
+def test_jsonl_emitter_timestamps_follow_monotonic_clock(monkeypatch):
+    import io
+    import json
+
+    from gpt_web_driver import cli
+
+    clock = {"wall": 1_700_000_000_000_000_000, "mono": 5_000_000_000}
+    monkeypatch.setattr(cli.time, "time_ns", lambda: clock["wall"])
+    monkeypatch.setattr(cli.time, "monotonic_ns", lambda: clock["mono"])
+
+    raw = io.BytesIO()
+    emit, flush = cli._jsonl_emitter(io.TextIOWrapper(io.BufferedWriter(raw), encoding="utf-8"))
+    clock["wall"] -= 60_000_000_000  # wall clock stepped back; must not affect ts
+    clock["mono"] += 1_500_000_000
+    emit({"event": "step"})
+    flush()
+
+    assert json.loads(raw.getvalue())["ts"] == 1_700_000_001.5
+
+
+def test_logging_left_unconfigured_for_default_jsonl(monkeypatch):
+    import logging
+
+    from gpt_web_driver import cli
+
+    calls = []
+    monkeypatch.setattr(logging, "basicConfig", lambda **kw: calls.append(kw))
+    monkeypatch.setattr(cli, "_doctor", lambda ns, *, emit=None: None)
+
+    assert cli.main(["doctor", "--output", "jsonl"]) == 0
+    assert calls == []
+
+    assert cli.main(["doctor", "--output", "jsonl", "--log-level", "debug"]) == 0
+    assert cli.main(["doctor"]) == 0
+    assert [kw["level"] for kw in calls] == [logging.DEBUG, logging.INFO]
+
+
+def test_doctor_text_output(monkeypatch, capsys):
+    from gpt_web_driver import browser, cli
+
+    monkeypatch.setenv("DISPLAY", ":7")
+    monkeypatch.setattr(browser, "resolve_browser_executable_path", lambda **kw: "/opt/chrome")
+
+    assert cli.main(["doctor", "--cdp-host", "127.0.0.1", "--cdp-port", "9222"]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("gpt-web-driver doctor\n")
+    assert "display:  DISPLAY=':7'" in out
+    assert "cdp:      127.0.0.1:9222\n" in out
+    assert out.endswith("browser:  /opt/chrome\n")
+
+
+def test_doctor_and_calibrate_share_option_groups():
+    from gpt_web_driver.cli import build_parser
+
+    def options(cmd):
+        sub = next(a for a in build_parser(only=cmd)._actions if a.dest == "cmd")
+        return {s for a in sub.choices[cmd]._actions for s in a.option_strings}
+
+    shared = {"--browser-path", "--browser-channel", "--sandbox", "--cdp-host", "--cdp-port", "--output", "--log-level"}
+    for cmd in ("run", "doctor", "calibrate"):
+        assert shared <= options(cmd)
+    assert "--dry-run" in options("doctor") and "--dry-run" not in options("calibrate")
+
+
+def test_run_async_uses_uvloop_when_installed(monkeypatch):
+    import asyncio
+    import sys
+    import types
+
+    from gpt_web_driver import cli
+
+    created = []
+
+    def new_event_loop():
+        loop = asyncio.new_event_loop()
+        created.append(loop)
+        return loop
+
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setitem(sys.modules, "uvloop", types.SimpleNamespace(new_event_loop=new_event_loop))
+
+    async def _answer():
+        return asyncio.get_running_loop()
+
+    loop = cli._run_async(_answer())
+    assert created == [loop] and loop.is_closed()
+
+    monkeypatch.setitem(sys.modules, "uvloop", None)  # import fails -> default loop
+    assert cli._event_loop_factory() is None
+
+
+def test_parse_vars():
+    import pytest
+
+    from gpt_web_driver.cli import _parse_vars
+
+    assert _parse_vars(None) == {}
+    assert _parse_vars([" a =1", "b=x=y", "c="]) == {"a": "1", "b": "x=y", "c": ""}
+    for bad in ("novalue", "=1", " =1"):
+        with pytest.raises(SystemExit):
+            _parse_vars([bad])
+
+
+def test_write_stdout_keeps_order_with_text_layer(monkeypatch):
+    import io
+    import sys
+
+    from gpt_web_driver import cli
+
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(io.BufferedWriter(raw), encoding="utf-8")
+    monkeypatch.setattr(sys, "stdout", stream)
+    stream.write("first\n")
+    cli._write_stdout("scale_x:  1.000000 ✓\n")
+    assert raw.getvalue().decode("utf-8") == "first\nscale_x:  1.000000 ✓\n"
+
+    text_only = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", text_only)
+    cli._write_stdout("plain\n")
+    assert text_only.getvalue() == "plain\n"
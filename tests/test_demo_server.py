@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from gpt_web_driver.demo_server import serve_html
+
+
+def test_serve_html_serves_only_the_named_page():
+    srv = serve_html("<p>héllo</p>", "calibrate.html")
+    try:
+        with urllib.request.urlopen(f"{srv.base_url}/calibrate.html?x=1", timeout=5) as r:
+            assert r.headers["Content-Type"] == "text/html; charset=utf-8"
+            assert r.read().decode("utf-8") == "<p>héllo</p>"
+
+        with pytest.raises(urllib.error.HTTPError) as ei:
+            urllib.request.urlopen(f"{srv.base_url}/other.html", timeout=5)
+        assert ei.value.code == 404
+    finally:
+        srv.close()
+
+
+def test_close_is_idempotent():
+    srv = serve_html("<p>x</p>", "a.html")
+    srv.close()
+    srv.close()
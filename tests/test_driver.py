@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from gpt_web_driver.core.driver import origin_from_url
+
+
+def test_origin_from_url():
+    assert origin_from_url("https://chat.example.com:8443/c/123?x=1") == "https://chat.example.com:8443"
+    assert origin_from_url("about:blank") is None
+    assert origin_from_url("not a url") is None
+
+
+def test_origin_from_url_is_cached():
+    origin_from_url.cache_clear()
+    origin_from_url("http://127.0.0.1:8000/index.html")
+    origin_from_url("http://127.0.0.1:8000/index.html")
+    assert origin_from_url.cache_info().hits == 1
+
+
+def test_grant_permissions_probes_calling_convention_once():
+    import asyncio
+    import types
+
+    from gpt_web_driver.core import driver
+
+    calls = []
+
+    def grant_permissions(*, permissions, origin):
+        calls.append((permissions, origin))
+        return ("grant", origin)
+
+    uc = types.SimpleNamespace(cdp=types.SimpleNamespace(browser=types.SimpleNamespace(grant_permissions=grant_permissions)))
+    sent = []
+
+    class Page:
+        async def send(self, msg):
+            sent.append(msg)
+
+    async def _go():
+        for _ in range(3):
+            await driver.grant_permissions(Page(), origin="https://a.test", permissions=["x"], uc_module=uc)
+
+    asyncio.run(_go())
+
+    assert sent == [("grant", "https://a.test")] * 3
+    assert len(calls) == 3
+    assert driver._GRANT_CALL == (grant_permissions, True)
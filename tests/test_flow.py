@@ -122,3 +122,250 @@ def test_run_flow_vars_override(monkeypatch):
     res = asyncio.run(flow_mod.run_flow(cfg, spec, vars={"q": "OVR"}))
     assert res.value == ""
 
+
+
+def test_compile_obj_matches_render_obj():
+    obj = {
+        "action": "type",
+        "text": "Hi {{ name }}, {{greeting}}{{name}}!",
+        "nested": [{"x": "{{name}}"}, 3, None, "static", "{{ not a var }}"],
+        "flag": True,
+    }
+    vars = {"name": "Ada", "greeting": None}
+
+    assert flow_mod.compile_obj(obj)(vars) == flow_mod.render_obj(obj, vars)
+
+
+def test_compiled_template_unknown_var_raises_on_render():
+    render = flow_mod.compile_template("hi {{missing}}")
+    with pytest.raises(flow_mod.FlowSpecError):
+        render({"x": 1})
+
+
+@pytest.mark.parametrize(
+    ("step", "message"),
+    [
+        ({"action": "navigate"}, "step 0 navigate requires 'url'"),
+        ({"action": "click", "selector": "#a", "within": ""}, "step 0 click 'within' must be a non-empty string"),
+        ({"action": "type", "selector": "#a", "press_enter": "yes"}, "step 0 type 'press_enter' must be a boolean"),
+        ({"action": "wait_for_selector", "selector": "#a", "timeout_s": "5"}, "'timeout_s' must be a number"),
+        ({"action": "bogus"}, "step 0 has unknown action: 'bogus'"),
+    ],
+)
+def test_run_flow_step_validation_messages(monkeypatch, step, message):
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+    monkeypatch.setattr(flow_mod, "FlowRunner", FakeRunner)
+    cfg = RunConfig.defaults(url="about:blank", dry_run=True)
+
+    with pytest.raises(flow_mod.FlowSpecError, match=message):
+        asyncio.run(flow_mod.run_flow(cfg, {"steps": [step]}))
+
+
+def test_run_flow_overlaps_consecutive_read_only_steps(monkeypatch):
+    active = 0
+    peak = 0
+    calls = []
+
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def _poll(self, name):
+            nonlocal active, peak
+            calls.append(name)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        async def wait_for_selector(self, selector, *, within_selector=None, timeout_s=None):
+            await self._poll(selector)
+
+        async def wait_for_text(self, selector, *, contains, within_selector=None, timeout_s=None, poll_s=None):
+            await self._poll(selector)
+            return f"{selector}:{contains}"
+
+        async def press(self, key):
+            assert active == 0
+            calls.append(key)
+
+    monkeypatch.setattr(flow_mod, "FlowRunner", FakeRunner)
+    cfg = RunConfig.defaults(url="about:blank", dry_run=True)
+    spec = {
+        "parallel": True,
+        "steps": [
+            {"action": "wait_for_selector", "selector": "#a"},
+            {"action": "wait_for_text", "selector": "#b", "contains": "x", "into": "b"},
+            {"action": "wait_for_selector", "selector": "#c"},
+            # Reads a variable stored by the window above, so it must start a new one.
+            {"action": "wait_for_text", "selector": "#d", "contains": "{{b}}", "into": "result"},
+            {"action": "press", "key": "Enter"},
+        ],
+    }
+
+    res = asyncio.run(flow_mod.run_flow(cfg, spec))
+
+    assert peak == 3
+    assert calls == ["#a", "#b", "#c", "#d", "Enter"]
+    assert res.value == "#d:#b:x"
+
+
+def test_run_flow_read_only_window_surfaces_first_error(monkeypatch):
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def wait_for_selector(self, selector, *, within_selector=None, timeout_s=None):
+            if selector == "#missing":
+                raise TimeoutError(f"Timed out waiting for selector: {selector}")
+            await asyncio.sleep(1.0)
+
+    monkeypatch.setattr(flow_mod, "FlowRunner", FakeRunner)
+    cfg = RunConfig.defaults(url="about:blank", dry_run=True)
+    spec = {
+        "steps": [
+            {"action": "wait_for_selector", "selector": "#slow"},
+            {"action": "wait_for_selector", "selector": "#missing", "parallel": True},
+        ],
+    }
+
+    with pytest.raises(TimeoutError, match="#missing"):
+        asyncio.run(flow_mod.run_flow(cfg, spec))
+
+
+def test_run_flow_read_only_window_raises_earliest_step_failure(monkeypatch):
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def wait_for_selector(self, selector, *, within_selector=None, timeout_s=None):
+            # Both steps fail, the later one first in time; #first fails as it is cancelled.
+            if selector == "#first":
+                try:
+                    await asyncio.sleep(1.0)
+                except asyncio.CancelledError:
+                    raise TimeoutError(f"Timed out waiting for selector: {selector}") from None
+            raise TimeoutError(f"Timed out waiting for selector: {selector}")
+
+    monkeypatch.setattr(flow_mod, "FlowRunner", FakeRunner)
+    cfg = RunConfig.defaults(url="about:blank", dry_run=True)
+    spec = {
+        "parallel": True,
+        "steps": [
+            {"action": "wait_for_selector", "selector": "#first"},
+            {"action": "wait_for_selector", "selector": "#second"},
+        ],
+    }
+
+    with pytest.raises(TimeoutError, match="#first"):
+        asyncio.run(flow_mod.run_flow(cfg, spec))
+
+
+def test_run_flow_waits_are_sequential_by_default(monkeypatch):
+    # `#answer` only appears after `#spinner` is gone; its timeout must start once the
+    # previous wait has finished, not when the flow reaches the first wait.
+    calls = []
+
+    class FakeRunner:
+        def __init__(self, cfg, **_kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def wait_for_selector(self, selector, *, within_selector=None, timeout_s=None):
+            calls.append(("start", selector))
+            await asyncio.sleep(0.05)
+            calls.append(("end", selector))
+
+        async def wait_for_text(self, selector, *, contains, within_selector=None, timeout_s=None, poll_s=None):
+            calls.append(("start", selector))
+            if ("end", "#spinner-gone") not in calls:
+                raise TimeoutError(f"Timed out waiting for text in {selector}")
+            return "done"
+
+    monkeypatch.setattr(flow_mod, "FlowRunner", FakeRunner)
+    cfg = RunConfig.defaults(url="about:blank", dry_run=True)
+    spec = {
+        "steps": [
+            {"action": "wait_for_selector", "selector": "#spinner-gone", "timeout_s": 60},
+            {"action": "wait_for_text", "selector": "#answer", "contains": "d", "timeout_s": 30, "into": "result"},
+        ],
+    }
+
+    res = asyncio.run(flow_mod.run_flow(cfg, spec))
+
+    assert calls == [("start", "#spinner-gone"), ("end", "#spinner-gone"), ("start", "#answer")]
+    assert res.value == "done"
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_load_flow_parses_and_reports_errors(monkeypatch, tmp_path, fast):
+    import json
+    import types
+
+    if fast:
+        seen = []
+
+        def _loads(data):
+            seen.append(type(data))
+            return json.loads(bytes(data))
+
+        # Stand-in for orjson: accepts bytes-like input, raises a json.JSONDecodeError subclass.
+        monkeypatch.setattr(flow_mod, "_orjson", types.SimpleNamespace(loads=_loads))
+    else:
+        monkeypatch.setattr(flow_mod, "_orjson", None)
+
+    good = tmp_path / "flow.json"
+    good.write_text('{"steps": [{"action": "press", "key": "é"}]}', encoding="utf-8")
+    assert flow_mod.load_flow(good) == {"steps": [{"action": "press", "key": "é"}]}
+    if fast:
+        assert seen == [memoryview]
+
+    bad = tmp_path / "bad.json"
+    bad.write_text("{", encoding="utf-8")
+    with pytest.raises(flow_mod.FlowSpecError, match="invalid JSON"):
+        flow_mod.load_flow(bad)
+
+    empty = tmp_path / "empty.json"
+    empty.write_bytes(b"")
+    with pytest.raises(flow_mod.FlowSpecError, match="invalid JSON"):
+        flow_mod.load_flow(empty)
+
+    with pytest.raises(flow_mod.FlowSpecError, match="not found"):
+        flow_mod.load_flow(tmp_path / "missing.json")
+
+    listing = tmp_path / "list.json"
+    listing.write_text("[]", encoding="utf-8")
+    with pytest.raises(flow_mod.FlowSpecError, match="must be a JSON object"):
+        flow_mod.load_flow(listing)
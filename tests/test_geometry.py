@@ -1,6 +1,6 @@
 import random
 
-from gpt_web_driver.geometry import Noise, apply_noise, quad_center, rect_center, viewport_to_screen
+from gpt_web_driver.geometry import Noise, apply_noise, quad_center, rect_center, viewport_to_screen, viewport_to_screen_fast
 
 
 def test_quad_center():
@@ -9,6 +9,14 @@ def test_quad_center():
     assert (x, y) == (5.0, 5.0)
 
 
+def test_quad_center_ignores_extra_points_and_rejects_short_quads():
+    import pytest
+
+    assert quad_center([1, 2, 3, 4, 5, 6, 7, 8, 100, 100]) == (4.0, 5.0)
+    with pytest.raises(ValueError):
+        quad_center([0, 0, 1, 1])
+
+
 def test_rect_center():
     assert rect_center(10, 20, 4, 6) == (12.0, 23.0)
 
@@ -16,9 +24,33 @@ def test_rect_center():
 def test_viewport_to_screen():
     assert viewport_to_screen(1.5, 2.5, offset_x=10, offset_y=20) == (11.5, 22.5)
     assert viewport_to_screen(1.5, 2.5, scale_x=2.0, scale_y=3.0, offset_x=10, offset_y=20) == (13.0, 27.5)
+    assert viewport_to_screen_fast(1.5, 2.5, 2.0, 3.0, 10, 20) == (13.0, 27.5)
 
 
 def test_apply_noise_deterministic():
     rng = random.Random(0)
     x, y = apply_noise(100, 200, noise=Noise(x_px=3, y_px=2), rng=rng)
     assert (x, y) == (103, 201)
+
+
+def test_apply_noise_matches_randint_sequence():
+    noise = Noise(x_px=12, y_px=5)
+    fast = random.Random(42)
+    ref = random.Random(42)
+    for _ in range(200):
+        x, y = apply_noise(0, 0, noise=noise, rng=fast)
+        assert (x, y) == (ref.randint(-12, 12), ref.randint(-5, 5))
+
+
+def test_apply_noise_zero_noise_draws_nothing():
+    rng = random.Random(1)
+    state = rng.getstate()
+    assert apply_noise(7.5, 8.5, noise=Noise(x_px=0, y_px=0), rng=rng) == (7.5, 8.5)
+    assert rng.getstate() == state
+
+
+def test_noise_rejects_negative_amplitude():
+    import pytest
+
+    with pytest.raises(ValueError, match="y_px"):
+        Noise(x_px=1, y_px=-1)
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import subprocess
+import sys
 import types
+from pathlib import Path
 
 import pytest
 
@@ -9,7 +13,13 @@ from gpt_web_driver.nodriver_dom import ViewportPoint
 
 
 def test_nibs_chat_completion_does_not_mask_errors_with_cancelled_error(monkeypatch):
+    import gpt_web_driver.actions.input as actions_input
+    import gpt_web_driver.core.observer as observer
+    import gpt_web_driver.core.physics as physics
     import gpt_web_driver.nibs as nibs
+    import gpt_web_driver.nodriver_dom as nodriver_dom
+
+    scrolls: list[int] = []
 
     class FakeOsInput:
         def position(self) -> tuple[float, float]:
@@ -19,11 +29,17 @@ def test_nibs_chat_completion_does_not_mask_errors_with_cancelled_error(monkeypa
             return None
 
         def scroll(self, clicks: int) -> None:
-            return None
+            scrolls.append(clicks)
 
         def press(self, key: str) -> None:
             return None
 
+        async def click_async(self) -> None:
+            self.click()
+
+        async def press_async(self, key: str) -> None:
+            self.press(key)
+
     class FakeRunner:
         def __init__(self) -> None:
             self.page = object()
@@ -54,7 +70,7 @@ def test_nibs_chat_completion_does_not_mask_errors_with_cancelled_error(monkeypa
     async def fake_maybe_bring_to_front(*_a, **_k):
         return None
 
-    def fake_viewport_to_screen(x: float, y: float, **_k):
+    def fake_viewport_to_screen(x: float, y: float, *_a):
         return (x, y)
 
     def fake_apply_noise(x: float, y: float, **_k):
@@ -75,22 +91,21 @@ def test_nibs_chat_completion_does_not_mask_errors_with_cancelled_error(monkeypa
             return None
 
     async def fake_wait_for_assistant_reply(*_a, on_poll=None, **_k) -> str:
-        # Wait long enough to trigger a flick via on_poll(), then fail.
-        if on_poll is not None:
-            await asyncio.sleep(0.25)
-            on_poll()
-            await asyncio.sleep(0)
+        # Flicks are timer-driven, not tied to reply polls. Wait past the latest first flick
+        # (0.6s) so one is in flight or done, then fail.
+        assert on_poll is None
+        await asyncio.sleep(0.65)
         raise RuntimeError("boom")
 
-    monkeypatch.setattr(nibs, "last_assistant_message_text", fake_last_assistant_message_text)
-    monkeypatch.setattr(nibs, "wait_for_selector", fake_wait_for_selector)
-    monkeypatch.setattr(nibs, "selector_viewport_gaussian_point", fake_selector_viewport_gaussian_point)
-    monkeypatch.setattr(nibs, "maybe_bring_to_front", fake_maybe_bring_to_front)
-    monkeypatch.setattr(nibs, "viewport_to_screen", fake_viewport_to_screen)
+    monkeypatch.setattr(observer, "last_assistant_message_text", fake_last_assistant_message_text)
+    monkeypatch.setattr(nodriver_dom, "wait_for_selector", fake_wait_for_selector)
+    monkeypatch.setattr(nodriver_dom, "selector_viewport_gaussian_point", fake_selector_viewport_gaussian_point)
+    monkeypatch.setattr(nodriver_dom, "maybe_bring_to_front", fake_maybe_bring_to_front)
+    monkeypatch.setattr(nibs, "viewport_to_screen_fast", fake_viewport_to_screen)
     monkeypatch.setattr(nibs, "apply_noise", fake_apply_noise)
-    monkeypatch.setattr(nibs, "NeuromotorMouse", FakeMouse)
-    monkeypatch.setattr(nibs, "HybridInput", FakeHybrid)
-    monkeypatch.setattr(nibs, "wait_for_assistant_reply", fake_wait_for_assistant_reply)
+    monkeypatch.setattr(physics, "NeuromotorMouse", FakeMouse)
+    monkeypatch.setattr(actions_input, "HybridInput", FakeHybrid)
+    monkeypatch.setattr(observer, "wait_for_assistant_reply", fake_wait_for_assistant_reply)
 
     cfg = nibs.NibsConfig(run=types.SimpleNamespace(seed=15), ui=nibs.ChatUIConfig(url="https://example.com/"))
     s = nibs.NibsSession(cfg)
@@ -98,4 +113,134 @@ def test_nibs_chat_completion_does_not_mask_errors_with_cancelled_error(monkeypa
 
     with pytest.raises(RuntimeError, match="boom"):
         asyncio.run(s.chat_completion("hi"))
+    assert scrolls and scrolls[0] == -520
+
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_draw_mouse_params_ranges_and_seeding(use_numpy):
+    from gpt_web_driver.nibs import ChatUIConfig, NibsConfig, NibsSession, _FLICK_BATCH
+    from gpt_web_driver.runner import RunConfig
+
+    if use_numpy:
+        pytest.importorskip("numpy")
+    cfg = NibsConfig(
+        run=RunConfig.defaults(url="about:blank", dry_run=True, seed=7),
+        ui=ChatUIConfig(url="about:blank"),
+    )
+
+    def _draws():
+        session = NibsSession(cfg)
+        if not use_numpy:
+            session._mouse_np = None
+        return [session._draw_mouse_params() for _ in range(20)]
+
+    turns = _draws()
+    assert turns == _draws()
+    assert 0 < sum(t.hover for t in turns) < len(turns)
+    for t in turns:
+        assert 0.25 <= t.hover_t <= 0.65
+        assert -60.0 <= t.hover_bend <= 60.0
+        assert 0.18 <= t.hover_duration_s <= 0.35
+        assert 0.03 <= t.hover_pause_s <= 0.12
+        assert 0.2 <= t.first_flick_s <= 0.6
+        assert len(t.flick_gaps_s) == _FLICK_BATCH
+        assert all(1.2 <= g <= 2.4 for g in t.flick_gaps_s)
+
+
+def test_hover_waypoint_offsets_perpendicular_to_the_path():
+    from gpt_web_driver.nibs import _hover_waypoint
+
+    # Path along +x: the bend moves the point along +y.
+    assert _hover_waypoint(0.0, 0.0, 100.0, 0.0, 0.5, 10.0) == pytest.approx((50.0, 10.0))
+    x, y = _hover_waypoint(10.0, 20.0, 40.0, 60.0, 0.25, -30.0)
+    # 3-4-5 triangle: unit perpendicular is (-0.8, 0.6).
+    assert (x, y) == pytest.approx((10.0 + 7.5 + 24.0, 20.0 + 10.0 - 18.0))
+    # Zero-length path: no direction to bend along.
+    assert _hover_waypoint(5.0, 5.0, 5.0, 5.0, 0.5, 40.0) == (5.0, 5.0)
+
+
+def test_page_snapshot_text_parses_off_the_event_loop(monkeypatch):
+    import threading
+
+    import gpt_web_driver.nibs as nibs
+    import gpt_web_driver.nodriver_dom as nodriver_dom
+    from gpt_web_driver.runner import RunConfig
+
+    async def fake_query(page, selector):
+        assert selector == "body"
+        return 3
+
+    async def fake_outer_html(page, node_id):
+        assert node_id == 3
+        return "<body><p>Please verify you are human</p></body>"
+
+    parsed_on = []
+
+    def fake_html_to_text(html):
+        parsed_on.append(threading.current_thread())
+        return "Please verify you are human"
+
+    monkeypatch.setattr(nodriver_dom, "dom_query_selector_node_id", fake_query)
+    monkeypatch.setattr(nodriver_dom, "dom_get_outer_html", fake_outer_html)
+    monkeypatch.setattr(nodriver_dom, "html_to_text", fake_html_to_text)
+
+    cfg = nibs.NibsConfig(
+        run=RunConfig.defaults(url="about:blank", dry_run=True),
+        ui=nibs.ChatUIConfig(url="about:blank"),
+    )
+    session = nibs.NibsSession(cfg)
+    session._runner = types.SimpleNamespace(page=object())
+
+    assert asyncio.run(session._page_snapshot_text()) == "Please verify you are human"
+    assert parsed_on and parsed_on[0] is not threading.main_thread()
+
+
+def test_flick_steps_match_the_decay_recurrence():
+    from gpt_web_driver.nibs import _FLICK_STEPS
+
+    assert [m for m, _ in _FLICK_STEPS] == [-520, -286, -157, -86, -47, -25, -13]
+    assert _FLICK_STEPS[0][1] == 0.02
+    assert all(b[1] == pytest.approx(a[1] * 1.35) for a, b in zip(_FLICK_STEPS, _FLICK_STEPS[1:]))
+
+
+def test_configs_and_session_are_slotted():
+    from dataclasses import replace
+
+    from gpt_web_driver.nibs import ChatUIConfig, NibsConfig, NibsSession
+    from gpt_web_driver.runner import RunConfig
+
+    ui = ChatUIConfig(url="about:blank")
+    cfg = NibsConfig(run=RunConfig.defaults(url="about:blank", dry_run=True), ui=ui)
+    session = NibsSession(cfg)
+
+    for obj in (ui, cfg, session):
+        assert not hasattr(obj, "__dict__")
+    assert replace(ui, poll_s=0.5).poll_s == 0.5
+    assert replace(cfg, paste_threshold_chars=10).ui is ui
+
+
+def test_nibs_import_defers_session_dependencies():
+    src = Path(__file__).resolve().parents[1] / "src"
+    code = (
+        "import sys; from gpt_web_driver.nibs import ChatUIConfig, NibsConfig; "
+        "ChatUIConfig(url='about:blank'); "
+        "heavy = ('gpt_web_driver.runner', 'gpt_web_driver.core.physics', 'gpt_web_driver.nodriver_dom', 'numpy'); "
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(src)},
+    ).stdout.strip()
+    assert out == ""
+
+
+def test_nibs_config_default_mouse_config():
+    from gpt_web_driver.core.physics import NeuromotorMouseConfig
+    from gpt_web_driver.nibs import ChatUIConfig, NibsConfig
 
+    cfg = NibsConfig(run=types.SimpleNamespace(seed=None), ui=ChatUIConfig(url="about:blank"))
+    assert cfg.mouse == NeuromotorMouseConfig()
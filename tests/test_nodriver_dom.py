@@ -1,5 +1,7 @@
 import asyncio
 
+import pytest
+
 from gpt_web_driver.nodriver_dom import (
     ViewportPoint,
     dom_get_outer_html,
@@ -100,6 +102,43 @@ def test_wait_for_selector_prefers_cdp_polling_over_wait_for():
     assert calls == ["DOM.getDocument", "DOM.querySelector"]
 
 
+def test_concurrent_waits_for_the_same_selector_share_one_poll_loop():
+    from gpt_web_driver.nodriver_dom import wait_for_selector
+
+    queries = []
+
+    class Page:
+        async def send(self, msg):
+            m = msg.get("method")
+            if m == "DOM.getDocument":
+                return {"root": {"nodeId": 1}}
+            queries.append(msg["params"]["selector"])
+            # "#late" shows up on the third poll.
+            found = msg["params"]["selector"] == "#late" and queries.count("#late") >= 3
+            return {"nodeId": 2 if found else 0}
+
+    page = Page()
+
+    async def _go():
+        await asyncio.gather(
+            wait_for_selector(page, "#late", timeout_s=1.0, poll_s=0.01),
+            wait_for_selector(page, "#late", timeout_s=1.0, poll_s=0.01),
+            wait_for_selector(page, "#late", timeout_s=1.0, poll_s=0.01),
+        )
+        # A waiter with a shorter budget times out alone; the longer one keeps polling.
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        longer = asyncio.ensure_future(wait_for_selector(page, "#never", timeout_s=0.2, poll_s=0.01))
+        with pytest.raises(TimeoutError, match="#never"):
+            await wait_for_selector(page, "#never", timeout_s=0.02, poll_s=0.01)
+        with pytest.raises(TimeoutError, match="#never"):
+            await longer
+        assert loop.time() - start >= 0.2
+
+    asyncio.run(_go())
+    assert queries.count("#late") == 3
+
+
 def test_dom_query_selector_node_id_within_selector_scopes_query():
     calls: list[dict] = []
 
@@ -142,3 +181,356 @@ def test_html_to_text_strips_tags_and_ignores_script_style():
     html = "<div> A <span>B</span> C <script>bad()</script><style>.x{}</style></div>"
     assert html_to_text(html) == "A B C"
 
+
+
+def _fake_nodriver():
+    import types
+
+    dom = types.SimpleNamespace(
+        get_document=lambda depth, pierce: ("getDocument",),
+        query_selector=lambda node_id, selector: ("querySelector", node_id, selector),
+    )
+    return types.SimpleNamespace(cdp=types.SimpleNamespace(dom=dom))
+
+
+class _ScopedPage:
+    """nodriver-style page: every getDocument hands out a new root id and invalidates older ids."""
+
+    def __init__(self):
+        self.calls = []
+        self.doc = 0
+
+    async def send(self, msg):
+        import types
+
+        self.calls.append(msg[0] if msg[0] == "getDocument" else msg[1:])
+        if msg[0] == "getDocument":
+            self.doc += 1
+            return types.SimpleNamespace(node_id=self.doc * 100)
+        node_id, selector = msg[1], msg[2]
+        if node_id // 100 != self.doc:
+            raise RuntimeError("Could not find node with given id")
+        return node_id + (1 if selector == "#box" else 2)
+
+
+def test_within_container_is_resolved_once_per_document(monkeypatch):
+    import sys
+
+    from gpt_web_driver.nodriver_dom import wait_for_selector
+
+    monkeypatch.setitem(sys.modules, "nodriver", _fake_nodriver())
+    page = _ScopedPage()
+
+    async def _go():
+        await wait_for_selector(page, ".child", within_selector="#box", timeout_s=1.0)
+        first = await dom_query_selector_node_id(page, ".child", within_selector="#box")
+        second = await dom_query_selector_node_id(page, ".other", within_selector="#box")
+        return first, second
+
+    assert asyncio.run(_go()) == (103, 103)
+    # One document and one container lookup shared by the wait and both queries.
+    assert page.calls == ["getDocument", (100, "#box"), (101, ".child"), (101, ".child"), (101, ".other")]
+
+
+def test_scoped_query_recovers_from_stale_ids(monkeypatch):
+    import sys
+
+    from gpt_web_driver.nodriver_dom import forget_dom_scope
+
+    monkeypatch.setitem(sys.modules, "nodriver", _fake_nodriver())
+    page = _ScopedPage()
+
+    assert asyncio.run(dom_query_selector_node_id(page, ".child", within_selector="#box")) == 103
+    # Someone else fetched the document: the cached ids now fail and are replaced.
+    page.doc += 1
+    assert asyncio.run(dom_query_selector_node_id(page, ".child", within_selector="#box")) == 303
+    assert page.calls.count("getDocument") == 2
+
+    forget_dom_scope(page)
+    page.calls.clear()
+    assert asyncio.run(dom_query_selector_node_id(page, ".child", within_selector="#box")) == 403
+    assert page.calls == ["getDocument", (400, "#box"), (401, ".child")]
+
+
+def test_wait_for_selector_reuses_cached_root_across_calls(monkeypatch):
+    import sys
+
+    from gpt_web_driver.nodriver_dom import wait_for_selector
+
+    monkeypatch.setitem(sys.modules, "nodriver", _fake_nodriver())
+    page = _ScopedPage()
+
+    async def _go():
+        await wait_for_selector(page, ".child", within_selector="#box", timeout_s=1.0)
+        await wait_for_selector(page, ".other", within_selector="#box", timeout_s=1.0)
+        # The page moved on: the cached root now raises and is replaced straight away.
+        page.doc += 1
+        await wait_for_selector(page, ".child", within_selector="#box", timeout_s=1.0, poll_s=0.0)
+
+    asyncio.run(_go())
+    assert page.calls == [
+        "getDocument",
+        (100, "#box"),
+        (101, ".child"),
+        (101, ".other"),
+        (101, ".child"),
+        "getDocument",
+        (300, "#box"),
+        (301, ".child"),
+    ]
+
+
+_FLAT_HTML_SAMPLES = [
+    "<div class=\"markdown prose\"><p>Hello <b>world</b>!</p>\n<p>Second   line</p></div>",
+    "<div><pre><code class=\"language-py\">if a &lt; b &amp;&amp; c:\n    pass</code></pre></div>",
+    "<div title=\"a > b\" data-x='1>0'><span>x</span>y&nbsp;z &eacute;</div>",
+    "<p>hel<em>lo</em></p><br><ul><li>one</li><li> two </li></ul>",
+    "",
+    "plain text",
+]
+
+
+@pytest.mark.parametrize("html", _FLAT_HTML_SAMPLES)
+@pytest.mark.parametrize("bs4", [True, False])
+def test_flat_html_fast_path_matches_parser(monkeypatch, html, bs4):
+    import gpt_web_driver.nodriver_dom as nd
+
+    if bs4:
+        pytest.importorskip("bs4")
+    else:
+        import builtins
+
+        real_import = builtins.__import__
+
+        def _no_bs4(name, *a, **kw):
+            if name == "bs4":
+                raise ImportError("no bs4")
+            return real_import(name, *a, **kw)
+
+        monkeypatch.setattr(builtins, "__import__", _no_bs4)
+    monkeypatch.setattr(nd, "_have_bs4", lambda: bs4)
+
+    assert nd._flat_html_text_parts(html) is not None
+    # A trailing comment forces the parser path without changing the text.
+    assert nd._flat_html_text_parts(html + "<!-- x -->") is None
+    assert html_to_text(html) == html_to_text(html + "<!-- x -->")
+
+
+def test_gaussian_point_stays_in_inner_box_of_rotated_quad(monkeypatch):
+    import random
+
+    import gpt_web_driver.nodriver_dom as nd
+
+    # A diamond: corners on the axes, bounding box [0, 100] x [0, 40].
+    async def fake_quad(*_a, **_k):
+        return [50.0, 0.0, 100.0, 20.0, 50.0, 40.0, 0.0, 20.0]
+
+    monkeypatch.setattr(nd, "selector_viewport_quad", fake_quad)
+    rng = random.Random(3)
+    for _ in range(50):
+        pt = asyncio.run(nd.selector_viewport_gaussian_point(object(), "#x", rng=rng))
+        assert 25.0 <= pt.x <= 75.0
+        assert 10.0 <= pt.y <= 30.0
+    assert nd._quad_center_xy([50.0, 0.0, 100.0, 20.0, 50.0, 40.0, 0.0, 20.0]) == (50.0, 20.0)
+
+
+def test_nodriver_module_remembers_failed_import(monkeypatch):
+    import sys
+
+    import gpt_web_driver.nodriver_dom as nd
+
+    monkeypatch.setattr(nd, "_NODRIVER_UNAVAILABLE", False)
+    # A None entry in sys.modules makes `import nodriver` raise ImportError.
+    monkeypatch.setitem(sys.modules, "nodriver", None)
+    assert nd._nodriver_module() is None
+    assert nd._NODRIVER_UNAVAILABLE
+
+    fake = _fake_nodriver()
+    monkeypatch.setitem(sys.modules, "nodriver", fake)
+    assert nd._nodriver_module() is fake
+
+
+def test_cdp_caller_resolves_the_calling_convention_once():
+    from gpt_web_driver.nodriver_dom import _cdp_caller
+
+    def positional(node_id, selector):
+        return ("pos", node_id, selector)
+
+    def keyword_only(*, node_id, selector):
+        return ("kw", node_id, selector)
+
+    def no_args():
+        return ("none",)
+
+    assert _cdp_caller(positional, "node_id", "selector")(1, "a") == ("pos", 1, "a")
+    assert _cdp_caller(keyword_only, "node_id", "selector")(1, "a") == ("kw", 1, "a")
+    assert _cdp_caller(no_args, "depth", "pierce", args_optional=True)(1, True) == ("none",)
+    kw = _cdp_caller(keyword_only, "node_id", "selector")
+    assert _cdp_caller(keyword_only, "node_id", "selector") is kw
+
+
+def test_isawaitable_matches_inspect_for_driver_return_shapes():
+    import inspect
+
+    from gpt_web_driver.nodriver_dom import _isawaitable
+
+    async def coro():
+        return None
+
+    class Custom:
+        def __await__(self):
+            return iter(())
+
+    async def _go():
+        c = coro()
+        fut = asyncio.get_running_loop().create_future()
+        for obj in (c, fut, Custom(), None, 1, [1.0, 2.0], {"x": 1}):
+            assert _isawaitable(obj) == inspect.isawaitable(obj)
+        fut.cancel()
+        await c
+
+    asyncio.run(_go())
+
+
+def test_box_model_and_layout_metrics_are_in_flight_together(monkeypatch):
+    import gpt_web_driver.nodriver_dom as nd
+
+    # Exercise the dict-CDP path whether or not nodriver is installed.
+    monkeypatch.setattr(nd, "_nodriver_module", lambda: None)
+
+    class Page:
+        def __init__(self):
+            self.metrics_sent = asyncio.Event()
+            self.fail_box = False
+            self.metrics_cancelled = False
+
+        async def send(self, msg):
+            m = msg.get("method")
+            if m == "DOM.getDocument":
+                return {"root": {"nodeId": 1}}
+            if m == "DOM.querySelector":
+                return {"nodeId": 2}
+            if m == "DOM.getBoxModel":
+                # Only answers once the metrics request has been sent as well.
+                await asyncio.wait_for(self.metrics_sent.wait(), 1.0)
+                if self.fail_box:
+                    raise RuntimeError("box gone")
+                return {"model": {"content": [0, 0, 10, 0, 10, 10, 0, 10]}}
+            if m == "Page.getLayoutMetrics":
+                self.metrics_sent.set()
+                try:
+                    await asyncio.sleep(0.01 if not self.fail_box else 1.0)
+                except asyncio.CancelledError:
+                    self.metrics_cancelled = True
+                    raise
+                return {"visualViewport": {"pageX": 2, "pageY": 3}}
+            raise AssertionError(f"unexpected CDP method: {m}")
+
+    page = Page()
+    assert asyncio.run(selector_viewport_center(page, "#x")) == ViewportPoint(3.0, 2.0)
+
+    page = Page()
+    page.fail_box = True
+    with pytest.raises(RuntimeError, match="box gone"):
+        asyncio.run(selector_viewport_center(page, "#x"))
+    assert page.metrics_cancelled
+
+
+def test_missing_node_errors_name_the_selector_and_scope():
+    from gpt_web_driver.nodriver_dom import selector_text_content, selector_viewport_quad
+
+    class Page:
+        async def send(self, msg):
+            if msg.get("method") == "DOM.getDocument":
+                return {"root": {"nodeId": 1}}
+            return {"nodeId": 2 if msg["params"]["selector"] == "#box" else 0}
+
+    with pytest.raises(RuntimeError, match=r"selector: #x within #box$"):
+        asyncio.run(selector_viewport_quad(Page(), "#x", within_selector="#box"))
+    with pytest.raises(RuntimeError, match=r"selector: #x$"):
+        asyncio.run(selector_text_content(Page(), "#x"))
+
+
+def test_wait_for_selector_wakes_on_dom_events(monkeypatch):
+    import sys
+    import types
+
+    from gpt_web_driver.nodriver_dom import wait_for_selector
+
+    class ChildNodeInserted:
+        pass
+
+    class DocumentUpdated:
+        pass
+
+    dom = types.SimpleNamespace(
+        get_document=lambda depth, pierce: ("getDocument",),
+        query_selector=lambda node_id, selector: ("querySelector", node_id, selector),
+        request_child_nodes=lambda node_id, depth: ("requestChildNodes", node_id, depth),
+        ChildNodeInserted=ChildNodeInserted,
+        DocumentUpdated=DocumentUpdated,
+    )
+    monkeypatch.setitem(sys.modules, "nodriver", types.SimpleNamespace(cdp=types.SimpleNamespace(dom=dom)))
+
+    class EventPage:
+        def __init__(self):
+            self.handlers = {}
+            self.calls = []
+            self.child_present = False
+
+        def add_handler(self, event_type, handler):
+            self.handlers.setdefault(event_type, []).append(handler)
+
+        def remove_handler(self, event_type, handler):
+            self.handlers[event_type].remove(handler)
+
+        def fire(self, event_type):
+            for h in list(self.handlers.get(event_type, ())):
+                h(event_type())
+
+        async def send(self, msg):
+            self.calls.append(msg[0])
+            if msg[0] == "getDocument":
+                return types.SimpleNamespace(node_id=1)
+            if msg[0] == "requestChildNodes":
+                return None
+            _, _node_id, selector = msg
+            if selector == "#box":
+                return 2
+            return 3 if self.child_present else 0
+
+    page = EventPage()
+
+    async def _go():
+        loop = asyncio.get_running_loop()
+
+        def _insert():
+            page.child_present = True
+            page.fire(ChildNodeInserted)
+
+        loop.call_later(0.3, _insert)
+        start = loop.time()
+        await wait_for_selector(page, ".child", within_selector="#box", timeout_s=5.0)
+        return loop.time() - start
+
+    elapsed = asyncio.run(_go())
+    # Woken by the insert event rather than the 1s re-query inside the watched container.
+    assert 0.3 <= elapsed < 0.8
+    assert "requestChildNodes" in page.calls
+    assert page.calls.count("querySelector") <= 4
+    assert all(not hs for hs in page.handlers.values())
+
+
+def test_gaussian_in_range_clamps_and_keeps_the_seeded_sequence():
+    import random
+
+    from gpt_web_driver.nodriver_dom import _gaussian_in_range
+
+    r = random.Random(11)
+    ref = random.Random(11)
+    for _ in range(200):
+        v = _gaussian_in_range(r, 10.0, 20.0)
+        expected = ref.gauss(15.0, 10.0 / 6.0)
+        assert v == min(20.0, max(10.0, expected))
+    assert _gaussian_in_range(r, 5.0, 5.0) == 5.0
+    assert _gaussian_in_range(r, 5.0, 4.0) == 5.0
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+
+from gpt_web_driver.core.observer import ChatMessage, extract_chat_messages
+
+
+def _fake_uc():
+    # Minimal stand-in for nodriver's generated CDP helpers: each helper returns a
+    # tuple describing the command, and FakePage.send() dispatches on it.
+    dom = types.SimpleNamespace(
+        get_document=lambda depth, pierce: ("getDocument", depth, pierce),
+        query_selector_all=lambda node_id, selector: ("querySelectorAll", node_id, selector),
+        query_selector=lambda node_id, selector: ("querySelector", node_id, selector),
+        get_attributes=lambda node_id: ("getAttributes", node_id),
+    )
+    return types.SimpleNamespace(cdp=types.SimpleNamespace(dom=dom))
+
+
+class FakePage:
+    def __init__(self, messages: dict[int, tuple[str, str, str]]) -> None:
+        # node_id -> (role, message_id, html)
+        self._messages = messages
+
+    async def send(self, msg):
+        if isinstance(msg, dict):
+            assert msg["method"] == "DOM.getOuterHTML"
+            node_id = int(msg["params"]["nodeId"])
+            # Inner content nodes are message node ids + 100.
+            _role, _mid, html = self._messages[node_id - 100]
+            # Finish out of order to make sure result ordering does not depend on timing.
+            await asyncio.sleep(0.001 * (len(self._messages) - node_id))
+            return {"outerHTML": html}
+
+        kind = msg[0]
+        if kind == "getDocument":
+            return types.SimpleNamespace(node_id=1)
+        if kind == "querySelectorAll":
+            if msg[2].startswith(":is("):
+                # Combined message + content query: document order, content right after its message.
+                return [n for node_id in self._messages for n in (node_id, node_id + 100)]
+            return list(self._messages)
+        if kind == "getAttributes":
+            role, mid, _html = self._messages[msg[1]]
+            return ["data-message-author-role", role, "data-message-id", mid]
+        if kind == "querySelector":
+            return msg[1] + 100
+        raise AssertionError(f"unexpected CDP message: {msg!r}")
+
+
+def test_extract_chat_messages_preserves_document_order(monkeypatch):
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    page = FakePage(
+        {
+            1: ("user", "m1", "<div>hello</div>"),
+            2: ("assistant", "m2", "<div><p>hi <b>there</b></p></div>"),
+            3: ("assistant", "m3", "<div></div>"),
+            4: ("user", "m4", "<div>bye</div>"),
+        }
+    )
+
+    msgs = asyncio.run(extract_chat_messages(page, timeout_s=0.0, uc_module=uc))
+
+    assert msgs == [
+        ChatMessage(role="user", message_id="m1", text="hello"),
+        ChatMessage(role="assistant", message_id="m2", text="hi there"),
+        ChatMessage(role="user", message_id="m4", text="bye"),
+    ]
+
+
+def test_extract_chat_messages_never_requests_full_document(monkeypatch):
+    calls: list[tuple[int, bool]] = []
+
+    def get_document(*, depth: int, pierce: bool):
+        # Keyword-only, like some nodriver versions: the positional call raises TypeError.
+        calls.append((depth, pierce))
+        return ("getDocument", depth, pierce)
+
+    uc = _fake_uc()
+    uc.cdp.dom.get_document = get_document
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    page = FakePage({1: ("assistant", "m1", "<div>ok</div>")})
+
+    msgs = asyncio.run(extract_chat_messages(page, timeout_s=0.0, uc_module=uc))
+
+    assert [m.text for m in msgs] == ["ok"]
+    assert calls == [(1, True)]
+
+
+def test_attrs_list_to_dict_pairs_names_and_values():
+    from gpt_web_driver.core.observer import _attrs_list_to_dict
+
+    assert _attrs_list_to_dict(["a", "1", "b", "2"]) == {"a": "1", "b": "2"}
+    assert _attrs_list_to_dict(["a", "1", "dangling"]) == {"a": "1"}
+    assert _attrs_list_to_dict([]) == {}
+
+
+def test_extract_chat_messages_skips_nodes_that_vanish(monkeypatch):
+    import pytest
+
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+
+    class VanishingPage(FakePage):
+        def __init__(self, messages, gone):
+            super().__init__(messages)
+            self._gone = gone
+
+        async def send(self, msg):
+            if isinstance(msg, tuple) and msg[0] == "getAttributes" and msg[1] in self._gone:
+                raise RuntimeError("No node with given id found")
+            return await super().send(msg)
+
+    messages = {1: ("user", "m1", "<div>hello</div>"), 2: ("assistant", "m2", "<div>partial</div>")}
+    msgs = asyncio.run(extract_chat_messages(VanishingPage(messages, {2}), timeout_s=0.0, uc_module=uc))
+    assert [m.message_id for m in msgs] == ["m1"]
+
+    with pytest.raises(RuntimeError, match="No node"):
+        asyncio.run(extract_chat_messages(VanishingPage(messages, {1, 2}), timeout_s=0.0, uc_module=uc))
+
+
+def test_extract_chat_messages_logs_dropped_nodes(monkeypatch, caplog):
+    import logging
+
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+
+    class VanishingPage(FakePage):
+        async def send(self, msg):
+            if isinstance(msg, tuple) and msg[0] == "getAttributes" and msg[1] == 2:
+                raise RuntimeError("No node with given id found")
+            return await super().send(msg)
+
+    page = VanishingPage({1: ("user", "m1", "<div>hello</div>"), 2: ("assistant", "m2", "<div>partial</div>")})
+    with caplog.at_level(logging.DEBUG, logger="gpt_web_driver.core.observer"):
+        msgs = asyncio.run(extract_chat_messages(page, timeout_s=0.0, uc_module=uc))
+
+    assert [m.message_id for m in msgs] == ["m1"]
+    dropped = [r for r in caplog.records if r.name == "gpt_web_driver.core.observer"]
+    assert len(dropped) == 1
+    assert dropped[0].exc_info and "No node" in str(dropped[0].exc_info[1])
+
+
+def test_content_nodes_come_from_one_bulk_query(monkeypatch):
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    sent = []
+
+    class RecordingPage(FakePage):
+        async def send(self, msg):
+            sent.append(msg[0] if isinstance(msg, tuple) else msg["method"])
+            return await super().send(msg)
+
+    page = RecordingPage({1: ("user", "m1", "<div>a</div>"), 2: ("assistant", "m2", "<div>b</div>")})
+    msgs = asyncio.run(extract_chat_messages(page, timeout_s=0.0, uc_module=uc))
+
+    assert [m.text for m in msgs] == ["a", "b"]
+    assert sent.count("querySelectorAll") == 2
+    assert "querySelector" not in sent
+
+
+def test_content_node_ids_pairs_by_document_order():
+    from gpt_web_driver.core.observer import _content_node_ids
+
+    class Page:
+        async def send(self, msg):
+            assert msg[2] == ":is(.m), :is(.m) :is(.c, .d)"
+            # m1 has two content matches (first wins), m2 has none, m3 has one.
+            return [1, 11, 12, 2, 3, 31]
+
+    out = asyncio.run(_content_node_ids(Page(), _fake_uc(), 0, [1, 2, 3], ".m", ".c, .d"))
+    assert out == {1: 11, 3: 31}
+
+
+def test_attributes_and_html_are_read_concurrently(monkeypatch):
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+
+    class Page(FakePage):
+        html_requested = None
+
+        async def send(self, msg):
+            if self.html_requested is None:
+                self.html_requested = asyncio.Event()
+            if isinstance(msg, dict):
+                self.html_requested.set()
+            elif msg[0] == "getAttributes":
+                # Only completes once the HTML read is in flight too.
+                await self.html_requested.wait()
+            return await super().send(msg)
+
+    page = Page({1: ("assistant", "m1", "<div>ok</div>")})
+
+    async def _go():
+        return await asyncio.wait_for(extract_chat_messages(page, timeout_s=0.0, uc_module=uc), 1.0)
+
+    assert [m.text for m in asyncio.run(_go())] == ["ok"]
+
+
+def test_wait_for_assistant_reply_reuses_dom_state_between_polls(monkeypatch):
+    from gpt_web_driver.core.observer import wait_for_assistant_reply
+
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    sent = []
+
+    class RecordingPage(FakePage):
+        async def send(self, msg):
+            sent.append(msg[0] if isinstance(msg, tuple) else msg["method"])
+            return await super().send(msg)
+
+    page = RecordingPage(
+        {
+            1: ("user", "m1", "<div>q1</div>"),
+            2: ("assistant", "m2", "<div>a1</div>"),
+            3: ("user", "m3", "<div>q2</div>"),
+            4: ("assistant", "m4", "<div>a2</div>"),
+        }
+    )
+
+    reply = asyncio.run(
+        wait_for_assistant_reply(page, baseline_text=None, stable_s=0.01, poll_s=0.02, timeout_s=5.0, uc_module=uc)
+    )
+
+    assert reply == "a2"
+    assert sent.count("getDocument") == 1
+    # Only the newest message is inspected; its role is read once across both polls.
+    assert sent.count("getAttributes") == 1
+    assert sent.count("querySelectorAll") == 2
+
+
+def test_wait_for_assistant_reply_refetches_document_after_stale_ids(monkeypatch):
+    from gpt_web_driver.core.observer import wait_for_assistant_reply
+
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    sent = []
+
+    class StalePage(FakePage):
+        async def send(self, msg):
+            kind = msg[0] if isinstance(msg, tuple) else msg["method"]
+            sent.append(kind)
+            if kind == "querySelectorAll" and sent.count("getDocument") == 1 and sent.count(kind) == 2:
+                raise RuntimeError("Could not find node with given id")
+            return await super().send(msg)
+
+    page = StalePage({1: ("assistant", "m1", "<div>hi</div>")})
+    reply = asyncio.run(
+        wait_for_assistant_reply(page, stable_s=0.01, poll_s=0.02, timeout_s=5.0, uc_module=uc)
+    )
+
+    assert reply == "hi"
+    assert sent.count("getDocument") == 2
+
+
+def test_wait_for_assistant_reply_rereads_on_dom_events(monkeypatch):
+    from gpt_web_driver.core.observer import wait_for_assistant_reply
+
+    uc = _fake_uc()
+    for name in ("ChildNodeInserted", "ChildNodeRemoved", "ChildNodeCountUpdated", "CharacterDataModified"):
+        setattr(uc.cdp.dom, name, type(name, (), {}))
+    uc.cdp.dom.request_child_nodes = lambda node_id, depth: ("requestChildNodes", node_id, depth)
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    sent = []
+
+    class EventPage(FakePage):
+        def __init__(self, messages):
+            super().__init__(messages)
+            self.handlers = {}
+
+        def add_handler(self, event_type, handler):
+            self.handlers.setdefault(event_type, []).append(handler)
+
+        def remove_handler(self, event_type, handler):
+            self.handlers[event_type].remove(handler)
+
+        def fire(self, event_type):
+            for h in list(self.handlers.get(event_type, ())):
+                h(event_type())
+
+        async def send(self, msg):
+            kind = msg[0] if isinstance(msg, tuple) else msg["method"]
+            sent.append(kind)
+            if kind == "requestChildNodes":
+                assert msg[1:] == (1, -1)
+                return None
+            if kind == "DOM.getOuterHTML" and sent.count(kind) == 1:
+                # The reply keeps streaming shortly after the first read.
+                def _stream():
+                    self._messages[1] = ("assistant", "m1", "<div>hello world</div>")
+                    self.fire(uc.cdp.dom.CharacterDataModified)
+
+                asyncio.get_running_loop().call_later(0.05, _stream)
+            return await super().send(msg)
+
+    page = EventPage({1: ("assistant", "m1", "<div>hello</div>")})
+    reply = asyncio.run(wait_for_assistant_reply(page, stable_s=0.2, poll_s=0.01, timeout_s=5.0, uc_module=uc))
+
+    assert reply == "hello world"
+    # First read, re-read on the mutation, final read at the stability deadline; polling every
+    # 10ms would have read ~25 times.
+    assert sent.count("DOM.getOuterHTML") == 3
+    assert sent.count("requestChildNodes") == 1
+    assert all(not hs for hs in page.handlers.values())
+
+
+def test_dom_reads_share_a_per_page_inflight_window(monkeypatch):
+    import gpt_web_driver.core.observer as observer
+
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    monkeypatch.setattr(observer, "_MAX_INFLIGHT_CDP", 2)
+    inflight = 0
+    peak = 0
+
+    class Page(FakePage):
+        async def send(self, msg):
+            nonlocal inflight, peak
+            if isinstance(msg, dict):
+                return await super().send(msg)
+            inflight += 1
+            peak = max(peak, inflight)
+            try:
+                await asyncio.sleep(0.001)
+                return await super().send(msg)
+            finally:
+                inflight -= 1
+
+    page = Page({n: ("user", f"m{n}", f"<div>{n}</div>") for n in range(1, 9)})
+    msgs = asyncio.run(extract_chat_messages(page, timeout_s=0.0, uc_module=uc))
+    # A second loop gets its own window for the same page.
+    again = asyncio.run(extract_chat_messages(page, timeout_s=0.0, uc_module=uc))
+
+    assert [m.text for m in msgs] == [str(n) for n in range(1, 9)] == [m.text for m in again]
+    assert peak == 2
+
+
+def test_wait_for_assistant_reply_scans_each_distinct_text_once(monkeypatch):
+    from gpt_web_driver.core.observer import wait_for_assistant_reply
+    from gpt_web_driver.core.safety import DeadManSwitch
+
+    uc = _fake_uc()
+    monkeypatch.setitem(sys.modules, "nodriver", uc)
+    scanned = []
+
+    class CountingSwitch(DeadManSwitch):
+        def triggered_by(self, text):
+            scanned.append(text)
+            return super().triggered_by(text)
+
+    page = FakePage({1: ("assistant", "m1", "<div>steady</div>")})
+    reply = asyncio.run(
+        wait_for_assistant_reply(
+            page, stable_s=0.05, poll_s=0.01, timeout_s=5.0, uc_module=uc, deadman=CountingSwitch()
+        )
+    )
+
+    assert reply == "steady"
+    assert scanned == ["steady"]
@@ -42,3 +42,57 @@ def test_human_type_uses_profile_and_writes_chars():
     asyncio.run(os_in.human_type("hi", profile=TypingProfile(min_delay_s=0.0, max_delay_s=0.0)))
     assert ("write", "h") in pag.calls
     assert ("write", "i") in pag.calls
+
+
+def test_human_type_delay_schedule_matches_seeded_draws(monkeypatch):
+    import asyncio
+
+    slept = []
+
+    async def fake_sleep(s):
+        slept.append(s)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    pag = FakePyAutoGUI()
+    os_in = OsInput(dry_run=False, pyautogui_module=pag, rng=random.Random(7))
+    asyncio.run(os_in.human_type("abc", profile=TypingProfile(min_delay_s=0.02, max_delay_s=0.09)))
+
+    ref = random.Random(7)
+    assert slept == [ref.uniform(0.02, 0.09) for _ in range(3)]
+    assert [c for c in pag.calls if c[0] == "write"] == [("write", "a"), ("write", "b"), ("write", "c")]
+
+
+def test_async_variants_run_pyautogui_off_the_event_loop_thread():
+    import asyncio
+    import threading
+
+    threads = []
+
+    class ThreadRecordingPyAutoGUI(FakePyAutoGUI):
+        def moveTo(self, x, y, duration):
+            threads.append(threading.current_thread())
+            super().moveTo(x, y, duration)
+
+        def click(self):
+            threads.append(threading.current_thread())
+            super().click()
+
+        def press(self, key):
+            threads.append(threading.current_thread())
+            super().press(key)
+
+    pag = ThreadRecordingPyAutoGUI()
+    events = []
+    os_in = OsInput(dry_run=False, pyautogui_module=pag, rng=random.Random(0), emit=events.append)
+
+    async def _run():
+        await os_in.move_to_async(10, 20, profile=MouseProfile(min_move_duration_s=0.2, max_move_duration_s=0.2))
+        await os_in.click_async()
+        await os_in.press_async("enter")
+
+    asyncio.run(_run())
+
+    assert pag.calls == [("moveTo", 10, 20, 0.2), ("click",), ("press", "enter")]
+    assert threads and all(t is not threading.main_thread() for t in threads)
+    assert [e["event"] for e in events] == ["os.move_to", "os.click", "os.press"]
+    assert events[0]["duration_s"] == 0.2
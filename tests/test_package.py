@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+_SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def test_public_names_resolve_lazily():
+    import gpt_web_driver
+
+    for name in gpt_web_driver.__all__:
+        assert getattr(gpt_web_driver, name) is not None
+    assert gpt_web_driver.Driver is gpt_web_driver.FlowRunner
+
+
+def test_package_import_does_not_load_submodules():
+    code = (
+        "import sys, gpt_web_driver; "
+        "loaded = sorted(m for m in sys.modules if m.startswith('gpt_web_driver.')); "
+        "print(','.join(loaded))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(_SRC)},
+    ).stdout.strip()
+    assert out == ""
@@ -156,30 +156,16 @@ class TestNeuromotorMouse:
 
     def test_pink_noise_fallback(self, monkeypatch):
         """Ensure the fallback (no numpy) path works."""
-        # Force the numpy import to fail inside _generate_pink_noise
+        import gpt_web_driver.core.physics as physics
+
+        monkeypatch.setattr(physics, "_np", None)
         mouse = NeuromotorMouse(
             OsInput(dry_run=True),
             rng=random.Random(77),
         )
-        orig = mouse._generate_pink_noise
-
-        def _no_numpy(n: int) -> list[float]:
-            import builtins
-
-            real_import = builtins.__import__
-
-            def fake_import(name, *a, **kw):
-                if name == "numpy":
-                    raise ImportError("no numpy")
-                return real_import(name, *a, **kw)
 
-            monkeypatch.setattr(builtins, "__import__", fake_import)
-            try:
-                return orig(n)
-            finally:
-                monkeypatch.setattr(builtins, "__import__", real_import)
-
-        samples = _no_numpy(200)
+        samples = mouse._generate_pink_noise(200)
+        assert isinstance(samples, list)
         assert len(samples) == 200
         mean = sum(samples) / len(samples)
         assert abs(mean) < 0.3
@@ -256,3 +242,104 @@ class TestCognitiveTyper:
         # Every key_down should have a corresponding key_up
         for k in fake.keys_down:
             assert k in fake.keys_up
+
+
+def test_pink_noise_channels_are_independent_unit_rows():
+    np = pytest.importorskip("numpy")
+    mouse = NeuromotorMouse(OsInput(dry_run=True), rng=random.Random(5))
+
+    pink = mouse._pink_noise_channels(256, 2)
+
+    assert pink.shape == (2, 256)
+    assert np.allclose(pink.mean(axis=1), 0.0)
+    assert np.allclose(pink.std(axis=1), 1.0)
+    assert not np.allclose(pink[0], pink[1])
+
+
+def test_pink_noise_reuses_generator_and_filter_gains():
+    np = pytest.importorskip("numpy")
+    mouse = NeuromotorMouse(OsInput(dry_run=True), rng=random.Random(5))
+
+    first = mouse._pink_noise_channels(64, 2)
+    np_rng = mouse._np_rng
+    scale = mouse._scale_cache[64]
+    second = mouse._pink_noise_channels(64, 2)
+
+    assert mouse._np_rng is np_rng
+    assert mouse._scale_cache[64] is scale
+    # The generator keeps advancing, so consecutive moves do not repeat their noise.
+    assert not np.allclose(first, second)
+
+    again = NeuromotorMouse(OsInput(dry_run=True), rng=random.Random(5))
+    assert np.allclose(again._pink_noise_channels(64, 2), first)
+
+
+def test_trajectory_numpy_matches_python_fallback():
+    np = pytest.importorskip("numpy")
+    mouse = NeuromotorMouse(OsInput(dry_run=True), rng=random.Random(8))
+    noise = mouse._pink_noise_channels(40, 2)
+
+    fast = mouse._trajectory(40, 10.0, 20.0, 300.0, -50.0, noise[0], noise[1])
+    slow = mouse._trajectory(40, 10.0, 20.0, 300.0, -50.0, noise[0].tolist(), noise[1].tolist())
+
+    assert np.allclose(fast, slow)
+    assert fast[0][0] == pytest.approx(10.0 + 0.35 * noise[0][0])
+    assert all(type(v) is float for v in fast[0])
+
+
+def test_char_table_matches_per_char_lookup():
+    typer = CognitiveTyper(OsInput(dry_run=True))
+    for ch in "aZ!;\n ":
+        mods, key, xy, use_write = typer._char_table[ch]
+        assert (list(mods), key) == typer._char_to_key(ch)
+        assert xy == typer._key_xy.get(key)
+        assert use_write is False
+    # Not in the table: computed on the fly and typed via write_char.
+    assert "é" not in typer._char_table
+    assert typer._char_entry("é")[3] is True
+
+
+def test_unknown_characters_use_write_char():
+    fake = FakeOsInput()
+    typer = CognitiveTyper(
+        OsInput(dry_run=True),
+        rng=random.Random(1),
+        cfg=CognitiveTyperConfig(base_delay_s=0.0, dist_coeff_s=0.0, lognormal_scale_s=0.0, hold_s=0.0),
+    )
+    typer._os = fake
+    asyncio.run(typer.type_text("aé"))
+    assert fake.chars == ["é"]
+    assert fake.keys_down == ["a"]
+
+
+def test_type_text_bounds_outstanding_release_tasks(monkeypatch):
+    from gpt_web_driver.core import physics
+
+    monkeypatch.setattr(physics, "_MAX_PENDING_RELEASES", 4)
+    fake = FakeOsInput()
+    typer = CognitiveTyper(
+        OsInput(dry_run=True),
+        rng=random.Random(3),
+        # Releases outlive many keystrokes, so without a bound the task count would grow per char.
+        cfg=CognitiveTyperConfig(base_delay_s=0.0, dist_coeff_s=0.0, lognormal_scale_s=0.0, hold_s=0.02),
+    )
+    typer._os = fake
+    live: list[int] = []
+    real_create_task = asyncio.create_task
+
+    async def _go():
+        tasks = []
+
+        def create_task(coro):
+            t = real_create_task(coro)
+            tasks.append(t)
+            live.append(sum(not x.done() for x in tasks))
+            return t
+
+        monkeypatch.setattr(physics.asyncio, "create_task", create_task)
+        await typer.type_text("Hello World " * 5)
+
+    asyncio.run(_go())
+
+    assert max(live) <= 4 + 2
+    assert sorted(fake.keys_up) == sorted(fake.keys_down)
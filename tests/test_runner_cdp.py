@@ -1,4 +1,5 @@
 import asyncio
+import dataclasses
 import os
 import sys
 import types
@@ -39,7 +40,7 @@ def _base_config(**overrides):
         pre_interact_delay_s=0.0,
         post_click_delay_s=0.0,
     )
-    return cfg.__class__(**{**cfg.__dict__, **overrides})
+    return dataclasses.replace(cfg, **overrides)
 
 
 def test_runner_uses_cdp_host_port(monkeypatch):
@@ -134,3 +135,11 @@ def test_runner_no_dry_run_no_display_errors(monkeypatch):
     cfg = _base_config(dry_run=False)
     with pytest.raises(RuntimeError, match="No GUI display detected"):
         asyncio.run(FlowRunner(cfg).start())
+
+
+def test_config_objects_are_slotted_and_hashable():
+    noise = Noise(x_px=1, y_px=2)
+    assert not hasattr(noise, "__dict__")
+    assert hash(noise) == hash(Noise(x_px=1, y_px=2))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        noise.x_px = 3  # type: ignore[misc]
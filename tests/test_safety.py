@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from gpt_web_driver.core.safety import DeadManSwitch
+
+
+def test_deadman_switch_matches_keywords_case_insensitively():
+    sw = DeadManSwitch()
+    assert sw.triggered_by("Please VERIFY you are human") == "verify"
+    assert sw.triggered_by("We noticed Unusual Traffic from your network") == "unusual traffic"
+    assert sw.triggered_by("all good") is None
+    assert sw.triggered_by("") is None
+
+
+def test_deadman_switch_escapes_and_skips_empty_keywords():
+    sw = DeadManSwitch(keywords=("a.b", "", "(x)"))
+    assert sw.triggered_by("axb") is None
+    assert sw.triggered_by("see a.b") == "a.b"
+    assert sw.triggered_by("f(x)") == "(x)"
+    assert DeadManSwitch(keywords=()).triggered_by("anything") is None
+    assert DeadManSwitch() == DeadManSwitch()